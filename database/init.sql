@@ -7,10 +7,29 @@ CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 CREATE EXTENSION IF NOT EXISTS "btree_gin";
 CREATE EXTENSION IF NOT EXISTS "unaccent";
 CREATE EXTENSION IF NOT EXISTS "postgis";
+CREATE EXTENSION IF NOT EXISTS "pgcrypto";
 
 -- Create schemas for multi-tenant isolation
 CREATE SCHEMA IF NOT EXISTS tenant_management;
 CREATE SCHEMA IF NOT EXISTS laas_core;
+CREATE SCHEMA IF NOT EXISTS app;
+
+-- Time-ordered UUIDv7 ids (48-bit Unix ms timestamp + random bits); used as
+-- the id column default so raw inserts match the application's uuid7()
+CREATE OR REPLACE FUNCTION app.uuidv7()
+RETURNS UUID AS $$
+DECLARE
+    bytes BYTEA := gen_random_bytes(16);
+BEGIN
+    bytes := overlay(bytes placing substring(
+        int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::BIGINT)
+        FROM 3
+    ) FROM 1 FOR 6);
+    bytes := set_byte(bytes, 6, (get_byte(bytes, 6) & 15) | 112);
+    bytes := set_byte(bytes, 8, (get_byte(bytes, 8) & 63) | 128);
+    RETURN encode(bytes, 'hex')::UUID;
+END;
+$$ LANGUAGE plpgsql VOLATILE;
 
 -- Set up Row Level Security (RLS) for multi-tenant isolation
 -- This will be applied to tables after they are created by SQLAlchemy
@@ -67,8 +86,8 @@ BEGIN
         TG_OP,
         TG_TABLE_NAME,
         COALESCE(NEW.id::TEXT, OLD.id::TEXT),
-        CASE WHEN TG_OP = 'DELETE' THEN row_to_json(OLD) ELSE NULL END,
-        CASE WHEN TG_OP IN ('INSERT', 'UPDATE') THEN row_to_json(NEW) ELSE NULL END,
+        CASE WHEN TG_OP = 'DELETE' THEN to_jsonb(OLD) ELSE NULL END,
+        CASE WHEN TG_OP IN ('INSERT', 'UPDATE') THEN to_jsonb(NEW) ELSE NULL END,
         current_setting('app.client_ip', true),
         current_setting('app.user_agent', true),
         current_setting('app.request_id', true)
@@ -87,32 +106,62 @@ CREATE TEXT SEARCH CONFIGURATION IF NOT EXISTS laas_search (COPY = english);
 -- Add custom dictionary for better search results
 -- This can be customized per tenant/industry
 
--- Create function to update search vector for listings
-CREATE OR REPLACE FUNCTION app.update_listing_search_vector()
-RETURNS TRIGGER AS $$
+-- listings.search_vector is a generated TSVECTOR column with its GIN index
+-- (idx_listing_search_vector), both declared on the SQLAlchemy model
+
+-- Create monthly range partitions for the partitioned log/metric tables
+-- (audit_logs, metrics). Run periodically, e.g.
+-- SELECT app.create_monthly_partitions('audit_logs'); rows outside the
+-- created months go to the <table>_default partition. Refresh the metric
+-- roll-ups on the same schedule:
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY metrics_daily;
+CREATE OR REPLACE FUNCTION app.create_monthly_partitions(
+    parent TEXT,
+    months_ahead INTEGER DEFAULT 3
+) RETURNS VOID AS $$
+DECLARE
+    month_start DATE;
 BEGIN
-    NEW.search_vector := to_tsvector('laas_search', 
-        COALESCE(NEW.title, '') || ' ' || 
-        COALESCE(NEW.description, '') || ' ' ||
-        COALESCE(NEW.address, '') || ' ' ||
-        COALESCE(NEW.city, '') || ' ' ||
-        COALESCE(NEW.state, '') || ' ' ||
-        COALESCE(NEW.country, '') || ' ' ||
-        COALESCE(array_to_string(NEW.tags, ' '), '')
-    );
-    RETURN NEW;
+    FOR i IN 0..months_ahead LOOP
+        month_start := (date_trunc('month', NOW()) + make_interval(months => i))::DATE;
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            parent || '_' || to_char(month_start, 'YYYY_MM'),
+            parent,
+            month_start,
+            (month_start + INTERVAL '1 month')::DATE
+        );
+    END LOOP;
 END;
 $$ LANGUAGE plpgsql;
 
--- Create trigger for search vector updates
-CREATE TRIGGER update_listing_search_vector_trigger
-    BEFORE INSERT OR UPDATE ON listings
-    FOR EACH ROW
-    EXECUTE FUNCTION app.update_listing_search_vector();
-
--- Create GIN index for full-text search
-CREATE INDEX IF NOT EXISTS idx_listings_search_vector 
-ON listings USING GIN(search_vector);
+-- Retention: drop monthly partitions that end before the cutoff, e.g.
+-- SELECT app.drop_monthly_partitions('audit_logs', 12); a DROP TABLE per
+-- month instead of DELETE + VACUUM. The default partition is never dropped.
+CREATE OR REPLACE FUNCTION app.drop_monthly_partitions(
+    parent TEXT,
+    keep_months INTEGER
+) RETURNS INTEGER AS $$
+DECLARE
+    cutoff DATE := (date_trunc('month', NOW()) - make_interval(months => keep_months))::DATE;
+    child RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    FOR child IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = parent::regclass
+          AND c.relname ~ ('^' || parent || '_[0-9]{4}_[0-9]{2}$')
+    LOOP
+        IF to_date(right(child.relname, 7), 'YYYY_MM') < cutoff THEN
+            EXECUTE format('DROP TABLE %I', child.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
 
 -- Create function for geospatial distance calculation
 CREATE OR REPLACE FUNCTION app.calculate_distance(
@@ -149,8 +198,8 @@ INSERT INTO tenants (
     'general',
     'active',
     'enterprise',
-    '{"debug": true, "features": ["all"]}'::JSON,
-    '{"primary_color": "#3B82F6", "logo_url": null}'::JSON
+    '{"debug": true, "features": ["all"]}'::JSONB,
+    '{"primary_color": "#3B82F6", "logo_url": null}'::JSONB
 ) ON CONFLICT (subdomain) DO NOTHING;
 
 -- Create default admin user for development
@@ -227,10 +276,10 @@ INSERT INTO industry_schemas (
             "description": "Listing category",
             "options": ["general", "services", "products", "events"]
         }
-    ]'::JSON,
-    '["title", "description", "category"]'::TEXT[],
-    '["title"]'::TEXT[],
-    '{"max_title_length": 255, "max_description_length": 5000}'::JSON,
+    ]'::JSONB,
+    '["title", "description", "category"]'::JSONB,
+    '["title"]'::JSONB,
+    '{"max_title_length": 255, "max_description_length": 5000}'::JSONB,
     true,
     true
 ) ON CONFLICT (tenant_id, industry, version) DO NOTHING;
@@ -253,7 +302,7 @@ INSERT INTO categories (
     ('00000000-0000-0000-0000-000000000005'::UUID, '00000000-0000-0000-0000-000000000001'::UUID, 'Services', 'services', 'Service listings', 'briefcase', '#10B981', 0, 2, true, true),
     ('00000000-0000-0000-0000-000000000006'::UUID, '00000000-0000-0000-0000-000000000001'::UUID, 'Products', 'products', 'Product listings', 'shopping-bag', '#F59E0B', 0, 3, true, true),
     ('00000000-0000-0000-0000-000000000007'::UUID, '00000000-0000-0000-0000-000000000001'::UUID, 'Events', 'events', 'Event listings', 'calendar', '#EF4444', 0, 4, true, true)
-ON CONFLICT (tenant_id, slug) DO NOTHING;
+ON CONFLICT (tenant_id, digest(CAST(slug AS TEXT), 'sha1')) DO NOTHING;
 
 -- Create default tags
 INSERT INTO tags (
@@ -270,7 +319,7 @@ INSERT INTO tags (
     ('00000000-0000-0000-0000-000000000009'::UUID, '00000000-0000-0000-0000-000000000001'::UUID, 'New', 'new', 'New listings', '#10B981', 0, true),
     ('00000000-0000-0000-0000-000000000010'::UUID, '00000000-0000-0000-0000-000000000001'::UUID, 'Popular', 'popular', 'Popular listings', '#EF4444', 0, true),
     ('00000000-0000-0000-0000-000000000011'::UUID, '00000000-0000-0000-0000-000000000001'::UUID, 'Verified', 'verified', 'Verified listings', '#3B82F6', 0, true)
-ON CONFLICT (tenant_id, slug) DO NOTHING;
+ON CONFLICT (tenant_id, digest(CAST(slug AS TEXT), 'sha1')) DO NOTHING;
 
 -- Create default API key for development
 INSERT INTO api_keys (
@@ -288,9 +337,9 @@ INSERT INTO api_keys (
     '00000000-0000-0000-0000-000000000001'::UUID,
     '00000000-0000-0000-0000-000000000002'::UUID,
     'Development API Key',
-    '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj4J/8KzKzqK', -- Hash of 'dev-key-123'
-    'dev_',
-    '["read", "write", "admin"]'::TEXT[],
+    '2dbb1975f68cb93c13324c10459a5741b1dad22fbbfc06b5e6bc8cf39a1ec72b', -- SHA-256 of 'laas_dev.dev-key-123'
+    'laas_dev',
+    '["read", "write", "admin"]'::JSONB,
     10000,
     true
 ) ON CONFLICT DO NOTHING;
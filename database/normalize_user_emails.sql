@@ -0,0 +1,31 @@
+-- LAAS Platform one-off data fix: lowercase stored user emails
+-- The API lowercases emails on register, login and password reset and
+-- matches them exactly, so users stored with capital letters cannot log in
+-- until this has run. Safe to run more than once.
+
+BEGIN;
+
+-- Refuse to merge accounts: stop if two users in one tenant differ only by
+-- the case of their email. Resolve those by hand, then re-run.
+DO $$
+DECLARE
+    duplicates TEXT;
+BEGIN
+    SELECT string_agg(tenant_id::TEXT || ': ' || lower(email), ', ')
+    INTO duplicates
+    FROM (
+        SELECT tenant_id, lower(email) AS email
+        FROM users
+        GROUP BY tenant_id, lower(email)
+        HAVING count(*) > 1
+    ) AS clashes;
+
+    IF duplicates IS NOT NULL THEN
+        RAISE EXCEPTION 'Case-only duplicate user emails: %', duplicates;
+    END IF;
+END;
+$$;
+
+UPDATE users SET email = lower(email) WHERE email <> lower(email);
+
+COMMIT;
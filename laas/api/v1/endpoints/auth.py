@@ -2,17 +2,31 @@
 Authentication endpoints
 """
 
-from typing import Dict
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    status,
+)
+from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from laas.auth.dependencies import get_current_user
+from laas.auth.dependencies import get_current_user, invalidate_user_cache, security
 from laas.auth.jwt_handler import auth_manager
 from laas.auth.password import PasswordManager
-from laas.database.connection import get_db
-from laas.database.models import User
+from laas.auth.perm_cache import permission_cache
+from laas.auth.revocation import is_token_revoked, revoke_token
+from laas.core.timeutils import utcnow_aware
+from laas.database.connection import get_async_session, get_db
+from laas.database.models import User, get_stmt
+from laas.middleware.audit import record_audit
 from laas.schemas.auth import (
     PasswordReset,
     PasswordResetConfirm,
@@ -25,18 +39,36 @@ from laas.schemas.auth import (
 router = APIRouter()
 
 
+async def record_login(
+    user_id: Any, last_login: datetime, password_hash: Optional[str] = None
+) -> None:
+    """Persist login bookkeeping in its own session after the response is sent"""
+    values: Dict[str, Any] = {"last_login": last_login}
+    if password_hash:
+        values["password_hash"] = password_hash
+
+    async with get_async_session() as db:
+        await db.execute(update(User).where(User.id == user_id).values(**values))
+        await db.commit()
+
+
 @router.post(
     "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
-async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register_user(
+    user_data: UserRegister, request: Request, db: AsyncSession = Depends(get_db)
+):
     """Register a new user"""
 
+    record_audit(request, user_data, exclude={"password"})
+
+    email = user_data.email.lower()
+
     # Check if user already exists
-    existing_user = (
-        db.query(User)
-        .filter(User.email == user_data.email, User.tenant_id == user_data.tenant_id)
-        .first()
+    result = await db.execute(
+        select(User).where(User.email == email, User.tenant_id == user_data.tenant_id)
     )
+    existing_user = result.scalar_one_or_none()
 
     if existing_user:
         raise HTTPException(
@@ -56,53 +88,63 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
         )
 
     # Create new user
-    hashed_password = PasswordManager.get_password_hash(user_data.password)
-
-    new_user = User(
-        tenant_id=user_data.tenant_id,
-        email=user_data.email,
-        password_hash=hashed_password,
-        first_name=user_data.first_name,
-        last_name=user_data.last_name,
-        role=user_data.role or "user",
-        status="active",
-        email_verified=False,
+    hashed_password = await PasswordManager.ahash_password(user_data.password)
+
+    # INSERT ... RETURNING hands back server defaults without a refresh SELECT
+    result = await db.execute(
+        insert(User)
+        .values(
+            tenant_id=user_data.tenant_id,
+            email=email,
+            password_hash=hashed_password,
+            first_name=user_data.first_name,
+            last_name=user_data.last_name,
+            role=user_data.role or "user",
+            status="active",
+            email_verified=False,
+        )
+        .returning(User)
     )
+    new_user = result.scalar_one()
+    await db.commit()
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-
-    return UserResponse.from_orm(new_user)
+    return UserResponse.model_validate(new_user)
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login_user(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db),
 ):
     """Login user and return JWT tokens"""
 
-    # Get user by email
-    user = (
-        db.query(User)
-        .filter(User.email == form_data.username, User.status == "active")
-        .first()
+    # Get user by email (unique per tenant only; there is no tenant context
+    # here, so take the first match rather than fail on duplicates)
+    result = await db.execute(
+        select(User).where(
+            User.email == form_data.username.lower(), User.status == "active"
+        )
     )
+    user = result.scalars().first()
 
-    if not user or not PasswordManager.verify_password(
-        form_data.password, user.password_hash
-    ):
+    if user:
+        verified, new_hash = await PasswordManager.averify_and_update(
+            form_data.password, user.password_hash
+        )
+    else:
+        # Match the cost of a real verification to avoid user enumeration
+        verified = await PasswordManager.averify_dummy(form_data.password)
+        new_hash = None
+    if not user or not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Update last login
-    from datetime import datetime
-
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login (and upgrade legacy bcrypt hashes) off the response path
+    background_tasks.add_task(record_login, user.id, utcnow_aware(), new_hash)
 
     # Create tokens
     tokens = auth_manager.create_token_pair(user)
@@ -111,7 +153,7 @@ async def login_user(
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
     """Refresh access token using refresh token"""
 
     # Verify refresh token
@@ -119,21 +161,22 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
     user_id = payload.get("sub")
     tenant_id = payload.get("tenant_id")
 
-    if not user_id or not tenant_id:
+    if not user_id or not tenant_id or await is_token_revoked(payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
 
     # Get user
-    user = (
-        db.query(User)
-        .filter(
-            User.id == user_id, User.tenant_id == tenant_id, User.status == "active"
-        )
-        .first()
-    )
-
-    if not user:
+    try:
+        user_pk = uuid.UUID(user_id)
+    except ValueError:
+        user_pk = None
+    user = None
+    if user_pk is not None:
+        result = await db.execute(get_stmt(User, "get"), {"id": user_pk})
+        user = result.scalar_one_or_none()
+
+    if not user or str(user.tenant_id) != tenant_id or user.status != "active":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
         )
@@ -147,12 +190,18 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
-    return UserResponse.from_orm(current_user)
+    return UserResponse.model_validate(current_user)
 
 
 @router.post("/logout")
-async def logout_user(current_user: User = Depends(get_current_user)):
-    """Logout user (client should discard tokens)"""
+async def logout_user(
+    current_user: User = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    """Logout user and revoke the presented access token and its refresh token"""
+    await revoke_token(auth_manager.verify_token(credentials.credentials))
+    invalidate_user_cache(current_user.id, current_user.tenant_id)
+    await permission_cache.invalidate(current_user.tenant_id, current_user.id)
     return {"message": "Successfully logged out"}
 
 
@@ -161,12 +210,14 @@ async def change_password(
     old_password: str,
     new_password: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Change user password"""
 
     # Verify old password
-    if not PasswordManager.verify_password(old_password, current_user.password_hash):
+    if not await PasswordManager.averify_password(
+        old_password, current_user.password_hash
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect old password"
         )
@@ -183,18 +234,23 @@ async def change_password(
         )
 
     # Update password
-    current_user.password_hash = PasswordManager.get_password_hash(new_password)
-    db.commit()
+    current_user.password_hash = await PasswordManager.ahash_password(new_password)
+    await db.commit()
+    invalidate_user_cache(current_user.id, current_user.tenant_id)
+    await permission_cache.invalidate(current_user.tenant_id, current_user.id)
 
     return {"message": "Password changed successfully"}
 
 
 @router.post("/forgot-password")
-async def forgot_password(email: str, db: Session = Depends(get_db)):
+async def forgot_password(email: str, db: AsyncSession = Depends(get_db)):
     """Request password reset"""
 
     # Check if user exists
-    user = db.query(User).filter(User.email == email, User.status == "active").first()
+    result = await db.execute(
+        select(User).where(User.email == email.lower(), User.status == "active")
+    )
+    user = result.scalars().first()
 
     if not user:
         # Don't reveal if user exists or not
@@ -208,7 +264,7 @@ async def forgot_password(email: str, db: Session = Depends(get_db)):
 
 @router.post("/reset-password")
 async def reset_password(
-    reset_data: PasswordResetConfirm, db: Session = Depends(get_db)
+    reset_data: PasswordResetConfirm, db: AsyncSession = Depends(get_db)
 ):
     """Reset password using reset token"""
 
@@ -1,28 +1,67 @@
 """
 Authentication and authorization package for LAAS Platform
+
+Public names are resolved lazily (PEP 562) so importing one submodule
+doesn't pull in the JWT, hashing and database stacks of the others.
 """
 
-from .dependencies import get_current_active_user, get_current_user
-from .jwt_handler import AuthManager, create_access_token, verify_token
-from .password import PasswordManager
-from .rbac import (
-    Permission,
-    UserRole,
-    get_user_permissions,
-    has_permission,
-    require_permission,
-)
-
-__all__ = [
-    "AuthManager",
-    "create_access_token",
-    "verify_token",
-    "Permission",
-    "UserRole",
-    "has_permission",
-    "get_user_permissions",
-    "get_current_user",
-    "get_current_active_user",
-    "require_permission",
-    "PasswordManager",
-]
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from .api_keys import generate_api_key, hash_api_key, verify_api_key
+    from .dependencies import (
+        UserSnapshot,
+        get_current_active_user,
+        get_current_principal,
+        get_current_user,
+        invalidate_user_cache,
+    )
+    from .jwt_handler import AuthManager, create_access_token, verify_token
+    from .loader import UserLoader
+    from .password import PasswordManager
+    from .rbac import (
+        Permission,
+        UserRole,
+        get_user_permissions,
+        has_permission,
+        invalidate_user_permissions,
+        require_permission,
+    )
+
+_EXPORTS: Dict[str, str] = {
+    "AuthManager": ".jwt_handler",
+    "create_access_token": ".jwt_handler",
+    "verify_token": ".jwt_handler",
+    "Permission": ".rbac",
+    "UserRole": ".rbac",
+    "has_permission": ".rbac",
+    "get_user_permissions": ".rbac",
+    "invalidate_user_permissions": ".rbac",
+    "require_permission": ".rbac",
+    "get_current_user": ".dependencies",
+    "get_current_active_user": ".dependencies",
+    "get_current_principal": ".dependencies",
+    "invalidate_user_cache": ".dependencies",
+    "UserSnapshot": ".dependencies",
+    "PasswordManager": ".password",
+    "UserLoader": ".loader",
+    "generate_api_key": ".api_keys",
+    "hash_api_key": ".api_keys",
+    "verify_api_key": ".api_keys",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
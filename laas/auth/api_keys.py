@@ -0,0 +1,57 @@
+"""
+API key generation and verification
+"""
+
+import hashlib
+import hmac
+import secrets
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from laas.core.timeutils import utcnow_aware
+from laas.database.models import APIKey
+
+# Keys look like "laas_<8 hex>.<secret>"; the part before the dot is stored
+# in key_prefix and used to find the row
+KEY_PREFIX = "laas_"
+_SEPARATOR = "."
+
+
+def hash_api_key(key: str) -> str:
+    """SHA-256 hex digest of a full API key.
+
+    Keys carry 256 bits of randomness, so a fast hash is enough; slow
+    password hashes are reserved for user passwords.
+    """
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def generate_api_key() -> Tuple[str, str, str]:
+    """Create a new key; returns (key, key_prefix, key_hash).
+
+    Only the prefix and hash are stored; the key is shown to the user once.
+    """
+    prefix = f"{KEY_PREFIX}{secrets.token_hex(4)}"
+    key = f"{prefix}{_SEPARATOR}{secrets.token_urlsafe(32)}"
+    return key, prefix, hash_api_key(key)
+
+
+async def verify_api_key(db: AsyncSession, key: str) -> Optional[APIKey]:
+    """Return the active, unexpired key matching ``key``, or None"""
+    prefix, separator, _ = key.partition(_SEPARATOR)
+    if not separator or not prefix:
+        return None
+
+    result = await db.execute(
+        select(APIKey).where(APIKey.key_prefix == prefix, APIKey.is_active == True)
+    )
+    digest = hash_api_key(key)
+    for api_key in result.scalars():
+        if not hmac.compare_digest(digest, api_key.key_hash):
+            continue
+        if api_key.expires_at is not None and api_key.expires_at <= utcnow_aware():
+            return None
+        return api_key
+    return None
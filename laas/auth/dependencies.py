@@ -2,29 +2,119 @@
 Authentication dependencies for FastAPI
 """
 
-from typing import Any, Callable, List, Optional
+import threading
+import uuid
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple
 
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
-
-from laas.auth.jwt_handler import verify_token
-from laas.auth.rbac import Permission, has_permission
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from laas.auth.jwt_handler import verify_token, verify_token_quiet
+from laas.auth.perm_cache import permission_cache
+from laas.auth.rbac import (
+    PERMISSION_BITS,
+    Permission,
+    get_user_permission_mask,
+    permissions_mask,
+)
+from laas.auth.revocation import is_token_revoked
+from laas.core.config import get_settings
 from laas.database.connection import get_db
-from laas.database.models import User
+from laas.database.models import User, UserRole
 
-# Security scheme
+# Security schemes
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+class UserSnapshot(NamedTuple):
+    """Detached, immutable view of the user fields needed for authorization"""
+
+    id: str
+    tenant_id: str
+    role: UserRole
+    status: str
+    email_verified: bool
+    permissions: Tuple[str, ...]
+    permission_mask: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=str(user.id),
+            tenant_id=str(user.tenant_id),
+            role=UserRole(user.role),
+            status=str(user.status),
+            email_verified=bool(user.email_verified),
+            permissions=tuple(user.permissions or ()),
+            permission_mask=get_user_permission_mask(user),
+        )
 
+    @classmethod
+    def from_shared(
+        cls, user_id: str, tenant_id: str, fields: Sequence[Any]
+    ) -> "UserSnapshot":
+        role, user_status, email_verified, permissions, permission_mask = fields
+        return cls(
+            id=user_id,
+            tenant_id=tenant_id,
+            role=UserRole(role),
+            status=user_status,
+            email_verified=email_verified,
+            permissions=tuple(permissions),
+            permission_mask=permission_mask,
+        )
 
-async def get_current_user(
-    request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Get current authenticated user"""
+    def shared_fields(self) -> List[Any]:
+        """Fields stored in the shared permission cache"""
+        return [
+            self.role.value,
+            self.status,
+            self.email_verified,
+            list(self.permissions),
+            self.permission_mask,
+        ]
+
+
+_settings = get_settings()
 
-    # Verify token
+# Authorization snapshots keyed by (user_id, tenant_id); disabled when size is 0
+_user_cache: Optional[TTLCache[Tuple[str, str], UserSnapshot]] = (
+    TTLCache(maxsize=_settings.user_cache_size, ttl=_settings.user_cache_ttl)
+    if _settings.user_cache_size > 0 and _settings.user_cache_ttl > 0
+    else None
+)
+_user_cache_lock = threading.Lock()
+
+
+def _store_snapshot(snapshot: UserSnapshot) -> None:
+    if _user_cache is not None:
+        with _user_cache_lock:
+            _user_cache[(snapshot.id, snapshot.tenant_id)] = snapshot
+
+
+def cache_user_snapshot(user: User) -> UserSnapshot:
+    """Build a snapshot for the user and store it in the cache"""
+    snapshot = UserSnapshot.from_user(user)
+    _store_snapshot(snapshot)
+    return snapshot
+
+
+def invalidate_user_cache(user_id: Any, tenant_id: Any) -> None:
+    """Drop a cached snapshot after password, role or session changes"""
+    if _user_cache is not None:
+        with _user_cache_lock:
+            _user_cache.pop((str(user_id), str(tenant_id)), None)
+
+
+async def _get_token_identity(
+    credentials: HTTPAuthorizationCredentials,
+) -> Tuple[str, str]:
+    """Verify the bearer token and return its (user_id, tenant_id)"""
     try:
         payload = verify_token(credentials.credentials)
         user_id: Optional[str] = payload.get("sub")
@@ -46,11 +136,56 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
-    user = (
-        db.query(User).filter(User.id == user_id, User.tenant_id == tenant_id).first()
-    )
+    if await is_token_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return user_id, tenant_id
 
+
+# Columns needed to build a UserSnapshot; skips profile fields and timestamps
+_AUTH_COLUMNS = (
+    User.id,
+    User.tenant_id,
+    User.role,
+    User.status,
+    User.email_verified,
+    User.permissions,
+)
+
+
+async def _find_user(
+    db: AsyncSession, user_id: str, tenant_id: str, auth_only: bool = False
+) -> Optional[User]:
+    """Look up a user by token identity; None if missing or malformed"""
+    try:
+        user_pk = uuid.UUID(user_id)
+        tenant_pk = uuid.UUID(tenant_id)
+    except ValueError:
+        return None
+
+    if auth_only:
+        result = await db.execute(
+            select(User)
+            .options(load_only(*_AUTH_COLUMNS))
+            .where(User.id == user_pk, User.tenant_id == tenant_pk)
+        )
+        return result.scalar_one_or_none()
+
+    # Primary-key load goes through the identity map first
+    user = await db.get(User, user_pk)
+    if user is not None and user.tenant_id != tenant_pk:
+        return None
+    return user
+
+
+async def _load_user(
+    db: AsyncSession, user_id: str, tenant_id: str, auth_only: bool = False
+) -> User:
+    user = await _find_user(db, user_id, tenant_id, auth_only)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,13 +193,80 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    return user
+
+
+def _bind_user_to_request(
+    request: Request, user: User, user_id: str, tenant_id: str
+) -> None:
+    """Cache the user and expose it to the rest of the request"""
+    cache_user_snapshot(user)
+
     # Set tenant context for database queries
     request.state.tenant_id = tenant_id
     request.state.user_id = user_id
 
+
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Get current authenticated user"""
+    user_id, tenant_id = await _get_token_identity(credentials)
+
+    # Get user from database
+    user = await _load_user(db, user_id, tenant_id)
+    _bind_user_to_request(request, user, user_id, tenant_id)
+
     return user
 
 
+async def get_current_principal(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> UserSnapshot:
+    """Get a cached authorization snapshot of the current user.
+
+    Checks the in-process cache, then the shared Redis cache, and only
+    queries the user on a miss in both; use get_current_user when the
+    endpoint needs the ORM instance.
+    """
+    user_id, tenant_id = await _get_token_identity(credentials)
+
+    snapshot = None
+    if _user_cache is not None:
+        with _user_cache_lock:
+            snapshot = _user_cache.get((user_id, tenant_id))
+    if snapshot is None:
+        fields = await permission_cache.get(tenant_id, user_id)
+        if fields is not None:
+            snapshot = UserSnapshot.from_shared(user_id, tenant_id, fields)
+            _store_snapshot(snapshot)
+    if snapshot is None:
+        user = await _load_user(db, user_id, tenant_id, auth_only=True)
+        snapshot = cache_user_snapshot(user)
+        await permission_cache.set(tenant_id, user_id, snapshot.shared_fields())
+
+    # Set tenant context for database queries
+    request.state.tenant_id = tenant_id
+    request.state.user_id = user_id
+
+    return snapshot
+
+
+async def get_current_active_principal(
+    principal: UserSnapshot = Depends(get_current_principal),
+) -> UserSnapshot:
+    """Get current active user snapshot"""
+    if principal.status != "active":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
+        )
+    return principal
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -89,29 +291,44 @@ async def get_current_verified_user(
 
 async def get_optional_current_user(
     request: Request,
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_db),
 ) -> Optional[User]:
     """Get current user if authenticated, otherwise return None"""
     if not credentials:
         return None
 
-    try:
-        return await get_current_user(request, credentials, db)
-    except HTTPException:
+    # Branch on results instead of raising, so anonymous or stale tokens
+    # never pay for HTTPException construction and unwinding
+    payload = verify_token_quiet(credentials.credentials)
+    if payload is None:
         return None
 
+    user_id: Optional[str] = payload.get("sub")
+    tenant_id: Optional[str] = payload.get("tenant_id")
+    if user_id is None or tenant_id is None or await is_token_revoked(payload):
+        return None
+
+    user = await _find_user(db, user_id, tenant_id)
+    if user is None:
+        return None
+
+    _bind_user_to_request(request, user, user_id, tenant_id)
+    return user
+
 
 def require_permission_dependency(permission: Permission) -> Callable[[], Any]:
     """Create a dependency that requires a specific permission"""
+    required = PERMISSION_BITS[permission]
+    denied_detail = f"Permission '{permission.value}' required"
 
     async def permission_checker(
-        current_user: User = Depends(get_current_active_user),
-    ) -> User:
-        if not has_permission(current_user, permission):
+        current_user: UserSnapshot = Depends(get_current_active_principal),
+    ) -> UserSnapshot:
+        if not current_user.permission_mask & required:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Permission '{permission.value}' required",
+                detail=denied_detail,
             )
         return current_user
 
@@ -122,17 +339,19 @@ def require_any_permission_dependency(
     permissions: List[Permission],
 ) -> Callable[[], Any]:
     """Create a dependency that requires any of the specified permissions"""
+    required = permissions_mask(permissions)
+    denied_detail = (
+        "One of the following permissions required: "
+        f"{[p.value for p in permissions]}"
+    )
 
     async def permission_checker(
-        current_user: User = Depends(get_current_active_user),
-    ) -> User:
-        if not any(has_permission(current_user, perm) for perm in permissions):
+        current_user: UserSnapshot = Depends(get_current_active_principal),
+    ) -> UserSnapshot:
+        if not current_user.permission_mask & required:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=(
-                    "One of the following permissions required: "
-                    f"{[p.value for p in permissions]}"
-                ),
+                detail=denied_detail,
             )
         return current_user
 
@@ -143,17 +362,19 @@ def require_all_permissions_dependency(
     permissions: List[Permission],
 ) -> Callable[[], Any]:
     """Create a dependency that requires all of the specified permissions"""
+    required = permissions_mask(permissions)
+    denied_detail = (
+        "All of the following permissions required: "
+        f"{[p.value for p in permissions]}"
+    )
 
     async def permission_checker(
-        current_user: User = Depends(get_current_active_user),
-    ) -> User:
-        if not all(has_permission(current_user, perm) for perm in permissions):
+        current_user: UserSnapshot = Depends(get_current_active_principal),
+    ) -> UserSnapshot:
+        if current_user.permission_mask & required != required:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=(
-                    "All of the following permissions required: "
-                    f"{[p.value for p in permissions]}"
-                ),
+                detail=denied_detail,
             )
         return current_user
 
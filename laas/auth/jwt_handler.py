@@ -2,13 +2,21 @@
 JWT token handling and management
 """
 
+import hashlib
+import secrets
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
+import jwt
+from cachetools import TTLCache
+from cryptography.hazmat.primitives import serialization
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
+from jwt import ExpiredSignatureError, InvalidTokenError
 
 from laas.core.config import get_settings
+from laas.core.timeutils import utcnow_aware
 from laas.database.models import User
 
 
@@ -22,42 +30,122 @@ class AuthManager:
         self.access_token_expire_minutes = self.settings.jwt_access_token_expire_minutes
         self.refresh_token_expire_days = self.settings.jwt_refresh_token_expire_days
 
-    def create_access_token(
-        self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None
-    ) -> str:
-        """Create JWT access token"""
-        to_encode = data.copy()
+        # Parse keys once; the JWT library accepts key objects directly
+        self._signing_key, self._verification_key = self._load_keys()
+
+        # Precomputed per-call arguments for the encode/decode hot paths
+        self._access_token_ttl = timedelta(minutes=self.access_token_expire_minutes)
+        self._refresh_token_ttl = timedelta(days=self.refresh_token_expire_days)
+        self._encode_kwargs: Dict[str, Any] = {
+            "key": self._signing_key,
+            "algorithm": self.algorithm,
+        }
+        self._decode_kwargs: Dict[str, Any] = {
+            "key": self._verification_key,
+            "algorithms": [self.algorithm],
+            "options": {"require": ["exp"]},
+        }
+
+        # Verified payloads keyed by token digest; disabled when size is 0
+        self._token_cache: Optional[TTLCache[bytes, Dict[str, Any]]] = None
+        self._token_cache_lock = threading.Lock()
+        if self.settings.jwt_cache_size > 0 and self.settings.jwt_cache_ttl > 0:
+            self._token_cache = TTLCache(
+                maxsize=self.settings.jwt_cache_size,
+                ttl=self.settings.jwt_cache_ttl,
+            )
+
+    def _load_keys(self) -> Tuple[Any, Any]:
+        """Return (signing key, verification key) for the configured algorithm"""
+        if self.algorithm.startswith("HS"):
+            return self.secret_key, self.secret_key
 
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(
-                minutes=self.access_token_expire_minutes
+        private_pem = self.settings.jwt_private_key
+        public_pem = self.settings.jwt_public_key
+        if not private_pem and not public_pem:
+            raise ValueError(
+                f"JWT_PRIVATE_KEY or JWT_PUBLIC_KEY is required for {self.algorithm}"
             )
 
-        to_encode.update({"exp": expire, "type": "access"})
+        private_key = (
+            serialization.load_pem_private_key(private_pem.encode(), password=None)
+            if private_pem
+            else None
+        )
+        public_key = (
+            serialization.load_pem_public_key(public_pem.encode())
+            if public_pem
+            else private_key.public_key()  # type: ignore[union-attr]
+        )
+        return private_key, public_key
+
+    def _encode(self, to_encode: Dict[str, Any]) -> str:
+        if self._signing_key is None:
+            raise RuntimeError("No JWT signing key configured (verify-only mode)")
+        return jwt.encode(to_encode, **self._encode_kwargs)
+
+    def _mint(
+        self,
+        base: Dict[str, Any],
+        token_type: str,
+        lifetime: timedelta,
+        now: Optional[datetime] = None,
+        jti: Optional[str] = None,
+    ) -> str:
+        """Encode claims plus exp/type/jti in a single dict merge"""
+        expire = (now or utcnow_aware()) + lifetime
+        return self._encode(
+            {
+                **base,
+                "exp": expire,
+                "type": token_type,
+                "jti": jti or secrets.token_hex(16),
+            }
+        )
 
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+    def create_access_token(
+        self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None
+    ) -> str:
+        """Create JWT access token"""
+        return self._mint(data, "access", expires_delta or self._access_token_ttl)
 
     def create_refresh_token(
         self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None
     ) -> str:
         """Create JWT refresh token"""
-        to_encode = data.copy()
-
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(days=self.refresh_token_expire_days)
+        return self._mint(data, "refresh", expires_delta or self._refresh_token_ttl)
+
+    def _decode(self, token: str) -> Dict[str, Any]:
+        """Verify signature and expiry (raises ExpiredSignatureError)"""
+        return jwt.decode(token, **self._decode_kwargs)
+
+    def _decode_token(self, token: str) -> Dict[str, Any]:
+        """Decode a token, reusing recently verified payloads when cached"""
+        if self._token_cache is None:
+            return self._decode(token)
+
+        # Never keep raw tokens in memory; key on a short digest instead
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        with self._token_cache_lock:
+            payload = self._token_cache.get(key)
+        if payload is not None and payload.get("exp", 0) > time.time():
+            return payload
 
-        to_encode.update({"exp": expire, "type": "refresh"})
+        payload = self._decode(token)
+        with self._token_cache_lock:
+            self._token_cache[key] = payload
+        return payload
 
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+    def clear_token_cache(self) -> None:
+        """Drop all cached token payloads"""
+        if self._token_cache is not None:
+            with self._token_cache_lock:
+                self._token_cache.clear()
 
     def verify_token(self, token: str, token_type: str = "access") -> Dict[str, Any]:
         """Verify and decode JWT token"""
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = self._decode_token(token)
 
             # Check token type
             if payload.get("type") != token_type:
@@ -67,24 +155,33 @@ class AuthManager:
                     headers={"WWW-Authenticate": "Bearer"},
                 )
 
-            # Check expiration
-            exp = payload.get("exp")
-            if exp is None or datetime.utcnow() > datetime.fromtimestamp(exp):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token has expired",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-
             return payload
 
-        except JWTError:
+        except ExpiredSignatureError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has expired",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        except InvalidTokenError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+    def verify_token_quiet(
+        self, token: str, token_type: str = "access"
+    ) -> Optional[Dict[str, Any]]:
+        """Verify and decode JWT token, returning None instead of raising"""
+        try:
+            payload = self._decode_token(token)
+        except InvalidTokenError:
+            return None
+        if payload.get("type") != token_type:
+            return None
+        return payload
+
     def create_token_pair(self, user: User) -> Dict[str, str]:
         """Create both access and refresh tokens for a user"""
         token_data: Dict[str, Any] = {
@@ -95,8 +192,18 @@ class AuthManager:
             "permissions": user.permissions or [],
         }
 
-        access_token = self.create_access_token(token_data)
-        refresh_token = self.create_refresh_token(token_data)
+        now = utcnow_aware()
+        # The access token names its refresh token so logout can revoke both
+        refresh_jti = secrets.token_hex(16)
+        access_token = self._mint(
+            {**token_data, "refresh_jti": refresh_jti},
+            "access",
+            self._access_token_ttl,
+            now,
+        )
+        refresh_token = self._mint(
+            token_data, "refresh", self._refresh_token_ttl, now, jti=refresh_jti
+        )
 
         return {
             "access_token": access_token,
@@ -109,16 +216,8 @@ class AuthManager:
 auth_manager = AuthManager()
 
 
-def create_access_token(data: Dict[str, Any]) -> str:
-    """Create access token"""
-    return auth_manager.create_access_token(data)
-
-
-def create_refresh_token(data: Dict[str, Any]) -> str:
-    """Create refresh token"""
-    return auth_manager.create_refresh_token(data)
-
-
-def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
-    """Verify token"""
-    return auth_manager.verify_token(token, token_type)
+# Module-level shortcuts bound once to the global instance
+create_access_token = auth_manager.create_access_token
+create_refresh_token = auth_manager.create_refresh_token
+verify_token = auth_manager.verify_token
+verify_token_quiet = auth_manager.verify_token_quiet
@@ -0,0 +1,92 @@
+"""
+Request-scoped batching loader for users
+"""
+
+import asyncio
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from laas.database.models import User
+
+UserKey = Tuple[str, str]  # (tenant_id, user_id)
+
+
+class UserLoader:
+    """DataLoader-style user fetcher that coalesces lookups into IN queries.
+
+    Keys requested during the same event loop tick are batched into one
+    ``WHERE tenant_id = ... AND id IN (...)`` query per tenant, and results
+    are memoized for the lifetime of the loader (one request). Batches run
+    one at a time, since an AsyncSession allows a single operation at once.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self._cache: Dict[UserKey, Optional[User]] = {}
+        self._pending: Dict[UserKey, "asyncio.Future[Optional[User]]"] = {}
+        self._dispatch_task: Optional["asyncio.Task[None]"] = None
+        self._dispatch_lock = asyncio.Lock()
+
+    @staticmethod
+    def _key(tenant_id: Any, user_id: Any) -> UserKey:
+        return str(tenant_id), str(user_id)
+
+    def prime(self, key: Tuple[Any, Any], user: Optional[User]) -> None:
+        """Seed the loader with an already-fetched user"""
+        self._cache[self._key(*key)] = user
+
+    async def load(self, key: Tuple[Any, Any]) -> Optional[User]:
+        """Load one user, batching with other loads issued in the same tick"""
+        normalized = self._key(*key)
+        if normalized in self._cache:
+            return self._cache[normalized]
+
+        future = self._pending.get(normalized)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[normalized] = future
+            if self._dispatch_task is None:
+                # Runs after the other loads queued in this tick register
+                self._dispatch_task = asyncio.get_running_loop().create_task(
+                    self._dispatch()
+                )
+        return await future
+
+    async def load_many(self, keys: List[Tuple[Any, Any]]) -> List[Optional[User]]:
+        """Load several users with a single query per tenant"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    async def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._dispatch_task = None
+
+        by_tenant: Dict[str, List[str]] = defaultdict(list)
+        for tenant_id, user_id in pending:
+            by_tenant[tenant_id].append(user_id)
+
+        try:
+            # Loads queued while an earlier batch awaits the session wait here
+            async with self._dispatch_lock:
+                for tenant_id, user_ids in by_tenant.items():
+                    result = await self.db.execute(
+                        select(User).where(
+                            User.tenant_id == uuid.UUID(tenant_id),
+                            User.id.in_([uuid.UUID(u) for u in user_ids]),
+                        )
+                    )
+                    users = result.scalars().all()
+                    for user in users:
+                        self._cache[self._key(user.tenant_id, user.id)] = user
+        except Exception as exc:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(self._cache.setdefault(key, None))
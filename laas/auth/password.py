@@ -2,12 +2,57 @@
 Password management utilities
 """
 
-from typing import Any, Dict, List
-
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio.to_thread
+from anyio import CapacityLimiter
+from cachetools import LRUCache
 from passlib.context import CryptContext
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from laas.core.config import get_settings
+
+_settings = get_settings()
+
+# Password hashing context: new hashes use Argon2id, legacy bcrypt hashes
+# still verify and are flagged for rehash on the next successful login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    default="argon2",
+    deprecated=["bcrypt"],
+    argon2__type="ID",
+    argon2__memory_cost=_settings.password_argon2_memory_cost,
+    argon2__time_cost=_settings.password_argon2_time_cost,
+    argon2__parallelism=_settings.password_argon2_parallelism,
+)
+
+# KDF calls get their own worker-thread budget: a login storm queues here
+# instead of occupying every thread in the shared default threadpool
+_kdf_limiter = CapacityLimiter(
+    _settings.password_hash_concurrency or os.cpu_count() or 1
+)
+
+
+async def _run_kdf(func: Any, *args: Any) -> Any:
+    return await anyio.to_thread.run_sync(func, *args, limiter=_kdf_limiter)
+
+
+# Hash verified when no user matches, so unknown accounts cost the same
+# time as known ones and login timing doesn't reveal which emails exist
+_DUMMY_HASH = pwd_context.hash("dummy-do-not-match")
+
+# Special characters accepted by the strength check, matched in C by the
+# regex engine; letters and digits use the Unicode-aware str predicates
+_SPECIAL = re.compile(r"[!@#$%^&*()_+\-=\[\]{}|;:,.<>?]")
+
+# Process-local, bounded memo of strength results keyed by password digest
+_strength_cache: LRUCache[bytes, Tuple[bool, Tuple[str, ...], int]] = LRUCache(
+    maxsize=1024
+)
+_strength_cache_lock = threading.Lock()
 
 
 class PasswordManager:
@@ -23,55 +68,94 @@ class PasswordManager:
         """Generate password hash"""
         return pwd_context.hash(password)
 
+    @staticmethod
+    def verify_and_update(
+        plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify a password and return a replacement hash if it is outdated"""
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+
+    @staticmethod
+    async def averify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in a worker thread so the KDF doesn't block the loop"""
+        return await _run_kdf(pwd_context.verify, plain_password, hashed_password)
+
+    @staticmethod
+    async def averify_and_update(
+        plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify and rehash-check a password in a worker thread"""
+        return await _run_kdf(
+            pwd_context.verify_and_update, plain_password, hashed_password
+        )
+
+    @staticmethod
+    async def averify_dummy(plain_password: str) -> bool:
+        """Spend one verification on a dummy hash; always returns False"""
+        await _run_kdf(pwd_context.verify, plain_password, _DUMMY_HASH)
+        return False
+
+    @staticmethod
+    async def ahash_password(password: str) -> str:
+        """Generate password hash in a worker thread"""
+        return await _run_kdf(pwd_context.hash, password)
+
     @staticmethod
     def validate_password_strength(password: str) -> Dict[str, Any]:
         """Validate password strength and return validation result"""
-        result: Dict[str, Any] = {"is_valid": True, "errors": [], "score": 0}
-        errors: List[str] = []
-
-        # Length check
-        if len(password) < 8:
-            errors.append("Password must be at least 8 characters long")
-            result["is_valid"] = False
-
-        # Character variety checks
-        has_upper = any(c.isupper() for c in password)
-        has_lower = any(c.islower() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_special = any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password)
-
-        if not has_upper:
-            errors.append("Password must contain at least one uppercase letter")
-            result["is_valid"] = False
-
-        if not has_lower:
-            errors.append("Password must contain at least one lowercase letter")
-            result["is_valid"] = False
-
-        if not has_digit:
-            errors.append("Password must contain at least one digit")
-            result["is_valid"] = False
-
-        if not has_special:
-            errors.append("Password must contain at least one special character")
-            result["is_valid"] = False
-
-        # Calculate strength score
-        score = 0
-        if len(password) >= 8:
-            score += 1
-        if len(password) >= 12:
-            score += 1
-        if has_upper:
-            score += 1
-        if has_lower:
-            score += 1
-        if has_digit:
-            score += 1
-        if has_special:
-            score += 1
-
-        result["score"] = score
-        result["errors"] = errors
-
-        return result
+        # Form retries re-validate the same candidates; key on a digest so
+        # plaintext passwords are never retained
+        key = hashlib.blake2b(password.encode(), digest_size=16).digest()
+        with _strength_cache_lock:
+            cached = _strength_cache.get(key)
+        if cached is None:
+            cached = _check_password_strength(password)
+            with _strength_cache_lock:
+                _strength_cache[key] = cached
+
+        is_valid, errors, score = cached
+        return {"is_valid": is_valid, "errors": list(errors), "score": score}
+
+
+def _check_password_strength(password: str) -> Tuple[bool, Tuple[str, ...], int]:
+    """Return (is_valid, errors, score) for a password"""
+    errors: List[str] = []
+
+    # Length check
+    if len(password) < 8:
+        errors.append("Password must be at least 8 characters long")
+
+    # Character variety checks (each search stops at the first match)
+    has_upper = any(c.isupper() for c in password)
+    has_lower = any(c.islower() for c in password)
+    has_digit = any(c.isdigit() for c in password)
+    has_special = _SPECIAL.search(password) is not None
+
+    if not has_upper:
+        errors.append("Password must contain at least one uppercase letter")
+
+    if not has_lower:
+        errors.append("Password must contain at least one lowercase letter")
+
+    if not has_digit:
+        errors.append("Password must contain at least one digit")
+
+    if not has_special:
+        errors.append("Password must contain at least one special character")
+
+    # Calculate strength score
+    score = 0
+    if len(password) >= 8:
+        score += 1
+    if len(password) >= 12:
+        score += 1
+    if has_upper:
+        score += 1
+    if has_lower:
+        score += 1
+    if has_digit:
+        score += 1
+    if has_special:
+        score += 1
+
+    return not errors, tuple(errors), score
@@ -0,0 +1,70 @@
+"""
+Shared authorization cache backed by Redis
+"""
+
+import logging
+from typing import Any, Optional, Sequence
+
+import orjson
+
+from laas.core.config import get_settings
+from laas.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class PermissionCache:
+    """Cross-worker cache of resolved authorization data per user.
+
+    Entries live at ``perm:tenant:{tenant_id}:{user_id}`` for
+    ``permission_cache_ttl`` seconds, so every worker converges on a change
+    within one TTL even if an explicit invalidation is missed. Redis errors
+    are logged and treated as a miss; callers fall back to the database.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.enabled = self.settings.permission_cache_enabled
+        self.ttl = max(self.settings.permission_cache_ttl, 1)
+
+    @staticmethod
+    def _key(tenant_id: Any, user_id: Any) -> str:
+        return f"perm:tenant:{tenant_id}:{user_id}"
+
+    async def get(self, tenant_id: Any, user_id: Any) -> Optional[Sequence[Any]]:
+        """Return the cached authorization fields, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        try:
+            raw = await get_redis().get(self._key(tenant_id, user_id))
+        except Exception as e:
+            logger.warning("Permission cache lookup failed: %s", e)
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, tenant_id: Any, user_id: Any, fields: Sequence[Any]) -> None:
+        """Store authorization fields for the user"""
+        if not self.enabled:
+            return
+
+        try:
+            await get_redis().set(
+                self._key(tenant_id, user_id), orjson.dumps(fields), ex=self.ttl
+            )
+        except Exception as e:
+            logger.warning("Permission cache write failed: %s", e)
+
+    async def invalidate(self, tenant_id: Any, user_id: Any) -> None:
+        """Drop the cached entry after role, permission or status changes"""
+        if not self.enabled:
+            return
+
+        try:
+            await get_redis().delete(self._key(tenant_id, user_id))
+        except Exception as e:
+            logger.warning("Permission cache invalidation failed: %s", e)
+
+
+# Global permission cache instance
+permission_cache = PermissionCache()
@@ -3,8 +3,8 @@ Role-Based Access Control (RBAC) system
 """
 
 from enum import Enum
-from functools import wraps
-from typing import Any, Callable, Dict, List, Set
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Tuple
 
 from fastapi import HTTPException, status
 
@@ -52,117 +52,202 @@ class Permission(str, Enum):
 
 
 # Role-Permission mapping
-ROLE_PERMISSIONS: Dict[UserRole, Set[Permission]] = {
-    UserRole.SUPERADMIN: {
-        # Superadmin has all permissions
-        Permission.MANAGE_USERS,
-        Permission.VIEW_USERS,
-        Permission.CREATE_USERS,
-        Permission.UPDATE_USERS,
-        Permission.DELETE_USERS,
-        Permission.MANAGE_LISTINGS,
-        Permission.VIEW_LISTINGS,
-        Permission.CREATE_LISTINGS,
-        Permission.UPDATE_LISTINGS,
-        Permission.DELETE_LISTINGS,
-        Permission.PUBLISH_LISTINGS,
-        Permission.MANAGE_SCHEMAS,
-        Permission.VIEW_SCHEMAS,
-        Permission.CREATE_SCHEMAS,
-        Permission.UPDATE_SCHEMAS,
-        Permission.DELETE_SCHEMAS,
-        Permission.MANAGE_TENANT,
-        Permission.VIEW_TENANT,
-        Permission.UPDATE_TENANT,
-        Permission.VIEW_ANALYTICS,
-        Permission.EXPORT_DATA,
-        Permission.MANAGE_SYSTEM,
-        Permission.VIEW_LOGS,
-        Permission.MANAGE_INTEGRATIONS,
-    },
-    UserRole.ADMIN: {
-        # Tenant admin has most permissions within their tenant
-        Permission.MANAGE_USERS,
-        Permission.VIEW_USERS,
-        Permission.CREATE_USERS,
-        Permission.UPDATE_USERS,
-        Permission.DELETE_USERS,
-        Permission.MANAGE_LISTINGS,
-        Permission.VIEW_LISTINGS,
-        Permission.CREATE_LISTINGS,
-        Permission.UPDATE_LISTINGS,
-        Permission.DELETE_LISTINGS,
-        Permission.PUBLISH_LISTINGS,
-        Permission.MANAGE_SCHEMAS,
-        Permission.VIEW_SCHEMAS,
-        Permission.CREATE_SCHEMAS,
-        Permission.UPDATE_SCHEMAS,
-        Permission.DELETE_SCHEMAS,
-        Permission.VIEW_TENANT,
-        Permission.UPDATE_TENANT,
-        Permission.VIEW_ANALYTICS,
-        Permission.EXPORT_DATA,
-        Permission.VIEW_LOGS,
-        Permission.MANAGE_INTEGRATIONS,
-    },
-    UserRole.USER: {
-        # Regular users have basic permissions
-        Permission.VIEW_LISTINGS,
-        Permission.CREATE_LISTINGS,
-        Permission.UPDATE_LISTINGS,
-        Permission.DELETE_LISTINGS,
-        Permission.VIEW_SCHEMAS,
-    },
-    UserRole.GUEST: {
-        # Guests have read-only permissions
-        Permission.VIEW_LISTINGS,
-        Permission.VIEW_SCHEMAS,
-    },
+ROLE_PERMISSIONS: Dict[UserRole, FrozenSet[Permission]] = {
+    UserRole.SUPERADMIN: frozenset(
+        {
+            # Superadmin has all permissions
+            Permission.MANAGE_USERS,
+            Permission.VIEW_USERS,
+            Permission.CREATE_USERS,
+            Permission.UPDATE_USERS,
+            Permission.DELETE_USERS,
+            Permission.MANAGE_LISTINGS,
+            Permission.VIEW_LISTINGS,
+            Permission.CREATE_LISTINGS,
+            Permission.UPDATE_LISTINGS,
+            Permission.DELETE_LISTINGS,
+            Permission.PUBLISH_LISTINGS,
+            Permission.MANAGE_SCHEMAS,
+            Permission.VIEW_SCHEMAS,
+            Permission.CREATE_SCHEMAS,
+            Permission.UPDATE_SCHEMAS,
+            Permission.DELETE_SCHEMAS,
+            Permission.MANAGE_TENANT,
+            Permission.VIEW_TENANT,
+            Permission.UPDATE_TENANT,
+            Permission.VIEW_ANALYTICS,
+            Permission.EXPORT_DATA,
+            Permission.MANAGE_SYSTEM,
+            Permission.VIEW_LOGS,
+            Permission.MANAGE_INTEGRATIONS,
+        }
+    ),
+    UserRole.ADMIN: frozenset(
+        {
+            # Tenant admin has most permissions within their tenant
+            Permission.MANAGE_USERS,
+            Permission.VIEW_USERS,
+            Permission.CREATE_USERS,
+            Permission.UPDATE_USERS,
+            Permission.DELETE_USERS,
+            Permission.MANAGE_LISTINGS,
+            Permission.VIEW_LISTINGS,
+            Permission.CREATE_LISTINGS,
+            Permission.UPDATE_LISTINGS,
+            Permission.DELETE_LISTINGS,
+            Permission.PUBLISH_LISTINGS,
+            Permission.MANAGE_SCHEMAS,
+            Permission.VIEW_SCHEMAS,
+            Permission.CREATE_SCHEMAS,
+            Permission.UPDATE_SCHEMAS,
+            Permission.DELETE_SCHEMAS,
+            Permission.VIEW_TENANT,
+            Permission.UPDATE_TENANT,
+            Permission.VIEW_ANALYTICS,
+            Permission.EXPORT_DATA,
+            Permission.VIEW_LOGS,
+            Permission.MANAGE_INTEGRATIONS,
+        }
+    ),
+    # Moderators held no role permissions before this table covered every
+    # role; they rely on per-user grants until a moderator set is agreed
+    UserRole.MODERATOR: frozenset(),
+    UserRole.USER: frozenset(
+        {
+            # Regular users have basic permissions
+            Permission.VIEW_LISTINGS,
+            Permission.CREATE_LISTINGS,
+            Permission.UPDATE_LISTINGS,
+            Permission.DELETE_LISTINGS,
+            Permission.VIEW_SCHEMAS,
+        }
+    ),
+    UserRole.GUEST: frozenset(
+        {
+            # Guests have read-only permissions
+            Permission.VIEW_LISTINGS,
+            Permission.VIEW_SCHEMAS,
+        }
+    ),
 }
 
+# Fail loudly at import if a role is added without a permission set
+if set(ROLE_PERMISSIONS) != set(UserRole):
+    raise RuntimeError(
+        "ROLE_PERMISSIONS is out of sync with UserRole: "
+        f"{sorted(set(UserRole) ^ set(ROLE_PERMISSIONS))}"
+    )
+# The permission decorators let superadmins through without resolving
+if ROLE_PERMISSIONS[UserRole.SUPERADMIN] != frozenset(Permission):
+    raise RuntimeError("UserRole.SUPERADMIN must hold every Permission")
+
+_EMPTY_PERMISSIONS: FrozenSet[Permission] = frozenset()
+
+# Lookup table for custom permission strings; avoids Permission(value) raising
+_PERMISSION_VALUES: Dict[str, Permission] = {p.value: p for p in Permission}
+
+# Permissions form a closed enum, so each one gets a bit in an int mask
+PERMISSION_BITS: Dict[Permission, int] = {p: 1 << i for i, p in enumerate(Permission)}
+_PERMISSION_VALUE_BITS: Dict[str, int] = {
+    p.value: bit for p, bit in PERMISSION_BITS.items()
+}
 
-def get_user_permissions(user: User) -> Set[Permission]:
-    """Get all permissions for a user based on their role and custom permissions"""
-    permissions = set()
 
-    # Add role-based permissions
-    user_role = UserRole(user.role) if isinstance(user.role, str) else user.role
-    if user_role in ROLE_PERMISSIONS:
-        permissions.update(ROLE_PERMISSIONS[user_role])
+def permissions_mask(permissions: Iterable[Permission]) -> int:
+    """OR together the bits of the given permissions"""
+    mask = 0
+    for permission in permissions:
+        mask |= PERMISSION_BITS[permission]
+    return mask
 
-    # Add custom permissions if any
-    if user.permissions:
-        for perm in user.permissions:
-            try:
-                permissions.add(Permission(perm))
-            except ValueError:
-                # Skip invalid permissions
-                continue
 
+@lru_cache(maxsize=256)
+def _required_mask(permissions: Tuple[Permission, ...]) -> int:
+    return permissions_mask(permissions)
+
+
+ROLE_PERMISSION_MASKS: Dict[UserRole, int] = {
+    role: permissions_mask(perms) for role, perms in ROLE_PERMISSIONS.items()
+}
+
+
+def get_user_permissions(user: User) -> FrozenSet[Permission]:
+    """Get all permissions for a user based on their role and custom permissions
+
+    The result is memoized on the user instance, which lives for one request;
+    call invalidate_user_permissions after changing role or permissions.
+    """
+    cached = getattr(user, "_cached_permissions", None)
+    if cached is not None:
+        return cached
+
+    # The Enum column loads UserRole members; unknown roles get nothing
+    permissions = ROLE_PERMISSIONS.get(user.role, _EMPTY_PERMISSIONS)
+
+    if user.permissions:
+        # Skip invalid custom permissions
+        custom = (_PERMISSION_VALUES.get(perm) for perm in user.permissions)
+        permissions = permissions | frozenset(p for p in custom if p is not None)
+
+    try:
+        object.__setattr__(user, "_cached_permissions", permissions)
+    except AttributeError:
+        # Immutable principals (e.g. UserSnapshot) are simply not memoized
+        pass
     return permissions
 
 
+def get_user_permission_mask(user: User) -> int:
+    """Get the user's permissions as a bitmask (see PERMISSION_BITS)
+
+    Memoized on the user instance like get_user_permissions.
+    """
+    cached = getattr(user, "_cached_permission_mask", None)
+    if cached is not None:
+        return cached
+
+    mask = ROLE_PERMISSION_MASKS.get(user.role, 0)
+    for perm in user.permissions or ():
+        # Invalid custom permissions contribute no bits
+        mask |= _PERMISSION_VALUE_BITS.get(perm, 0)
+
+    try:
+        object.__setattr__(user, "_cached_permission_mask", mask)
+    except AttributeError:
+        pass
+    return mask
+
+
+def invalidate_user_permissions(user: User) -> None:
+    """Forget memoized permissions after the user's role or permissions change"""
+    state = getattr(user, "__dict__", {})
+    for attr in ("_cached_permissions", "_cached_permission_mask"):
+        if attr in state:
+            object.__delattr__(user, attr)
+
+
 def has_permission(user: User, permission: Permission) -> bool:
     """Check if user has a specific permission"""
-    user_permissions = get_user_permissions(user)
-    return permission in user_permissions
+    return get_user_permission_mask(user) & PERMISSION_BITS[permission] != 0
 
 
 def has_any_permission(user: User, permissions: List[Permission]) -> bool:
     """Check if user has any of the specified permissions"""
-    user_permissions = get_user_permissions(user)
-    return any(perm in user_permissions for perm in permissions)
+    return get_user_permission_mask(user) & _required_mask(tuple(permissions)) != 0
 
 
 def has_all_permissions(user: User, permissions: List[Permission]) -> bool:
     """Check if user has all of the specified permissions"""
-    user_permissions = get_user_permissions(user)
-    return all(perm in user_permissions for perm in permissions)
+    required = _required_mask(tuple(permissions))
+    return get_user_permission_mask(user) & required == required
 
 
 def require_permission(permission: Permission) -> Callable[[Any], Any]:
     """Decorator to require a specific permission"""
 
+    required = PERMISSION_BITS[permission]
+    denied_detail = f"Permission '{permission.value}' required"
+
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -174,10 +259,14 @@ def require_permission(permission: Permission) -> Callable[[Any], Any]:
                     detail="Authentication required",
                 )
 
-            if not has_permission(user, permission):
+            # Superadmins hold every permission; skip resolution entirely
+            if user.role == UserRole.SUPERADMIN:
+                return await func(*args, **kwargs)
+
+            if not get_user_permission_mask(user) & required:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Permission '{permission.value}' required",
+                    detail=denied_detail,
                 )
 
             return await func(*args, **kwargs)
@@ -189,6 +278,11 @@ def require_permission(permission: Permission) -> Callable[[Any], Any]:
 
 def require_any_permission(permissions: List[Permission]) -> Callable[[Any], Any]:
     """Decorator to require any of the specified permissions"""
+    required = permissions_mask(permissions)
+    denied_detail = (
+        "One of the following permissions required: "
+        f"{[p.value for p in permissions]}"
+    )
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(func)
@@ -200,13 +294,14 @@ def require_any_permission(permissions: List[Permission]) -> Callable[[Any], Any
                     detail="Authentication required",
                 )
 
-            if not has_any_permission(user, permissions):
+            # Superadmins hold every permission; skip resolution entirely
+            if user.role == UserRole.SUPERADMIN:
+                return await func(*args, **kwargs)
+
+            if not get_user_permission_mask(user) & required:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
-                    detail=(
-                        "One of the following permissions required: "
-                        f"{[p.value for p in permissions]}"
-                    ),
+                    detail=denied_detail,
                 )
 
             return await func(*args, **kwargs)
@@ -218,6 +313,11 @@ def require_any_permission(permissions: List[Permission]) -> Callable[[Any], Any
 
 def require_all_permissions(permissions: List[Permission]) -> Callable[[Any], Any]:
     """Decorator to require all of the specified permissions"""
+    required = permissions_mask(permissions)
+    denied_detail = (
+        "All of the following permissions required: "
+        f"{[p.value for p in permissions]}"
+    )
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(func)
@@ -229,13 +329,14 @@ def require_all_permissions(permissions: List[Permission]) -> Callable[[Any], An
                     detail="Authentication required",
                 )
 
-            if not has_all_permissions(user, permissions):
+            # Superadmins hold every permission; skip resolution entirely
+            if user.role == UserRole.SUPERADMIN:
+                return await func(*args, **kwargs)
+
+            if get_user_permission_mask(user) & required != required:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
-                    detail=(
-                        "All of the following permissions required: "
-                        f"{[p.value for p in permissions]}"
-                    ),
+                    detail=denied_detail,
                 )
 
             return await func(*args, **kwargs)
@@ -245,19 +346,23 @@ def require_all_permissions(permissions: List[Permission]) -> Callable[[Any], An
     return decorator
 
 
+# UserRole is a str enum, so raw column values match these members too
+_ADMIN_ROLES: FrozenSet[UserRole] = frozenset({UserRole.SUPERADMIN, UserRole.ADMIN})
+
+
 def is_superadmin(user: User) -> bool:
     """Check if user is a superadmin"""
-    return str(user.role) == UserRole.SUPERADMIN.value
+    return user.role == UserRole.SUPERADMIN
 
 
 def is_tenant_admin(user: User) -> bool:
     """Check if user is a tenant admin"""
-    return str(user.role) == UserRole.ADMIN.value
+    return user.role == UserRole.ADMIN
 
 
 def is_admin(user: User) -> bool:
     """Check if user is any type of admin"""
-    return str(user.role) in [UserRole.SUPERADMIN.value, UserRole.ADMIN.value]
+    return user.role in _ADMIN_ROLES
 
 
 def can_manage_tenant(user: User, tenant_id: str) -> bool:
@@ -0,0 +1,108 @@
+"""
+Token revocation backed by Redis
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+
+from laas.core.config import get_settings
+from laas.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationStore:
+    """Tracks revoked token ids (jti) per tenant.
+
+    Each revoked token is stored as ``revoked:tenant:{tenant_id}:{jti}`` with
+    a TTL equal to the token's remaining lifetime, so entries clean themselves
+    up. Revoked ids are memoized locally for ``token_revocation_cache_ttl``
+    seconds; "not revoked" is never cached, so a logout on one worker takes
+    effect on every other worker immediately.
+    """
+
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.enabled = self.settings.token_revocation_enabled
+        self._cache: TTLCache[str, bool] = TTLCache(
+            maxsize=self.settings.token_revocation_cache_size,
+            ttl=max(self.settings.token_revocation_cache_ttl, 1),
+        )
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def _key(tenant_id: Any, jti: str) -> str:
+        return f"revoked:tenant:{tenant_id}:{jti}"
+
+    async def revoke(self, tenant_id: Any, jti: Optional[str], exp: Any) -> None:
+        """Revoke a token until it would have expired anyway"""
+        if not self.enabled or not jti:
+            return
+
+        ttl = int(float(exp) - time.time()) if exp is not None else 0
+        if ttl <= 0:
+            return
+
+        key = self._key(tenant_id, jti)
+        with self._cache_lock:
+            self._cache[key] = True
+        try:
+            await get_redis().set(key, 1, ex=ttl)
+        except Exception as e:
+            # Fail open like the lookups; still revoked on this worker
+            logger.warning("Token revocation write failed: %s", e)
+
+    async def is_revoked(self, tenant_id: Any, jti: Optional[str]) -> bool:
+        """Check whether a token id has been revoked"""
+        if not self.enabled or not jti:
+            return False
+
+        key = self._key(tenant_id, jti)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            revoked = bool(await get_redis().exists(key))
+        except Exception as e:
+            # Fail open: signature and expiry have already been verified
+            logger.warning("Token revocation lookup failed: %s", e)
+            return False
+
+        if revoked:
+            with self._cache_lock:
+                self._cache[key] = True
+        return revoked
+
+
+# Global revocation store instance
+revocation_store = TokenRevocationStore()
+
+
+async def revoke_token(payload: Dict[str, Any]) -> None:
+    """Revoke a decoded token, and the refresh token an access token names"""
+    tenant_id = payload.get("tenant_id")
+    await revocation_store.revoke(tenant_id, payload.get("jti"), payload.get("exp"))
+
+    refresh_jti = payload.get("refresh_jti")
+    if refresh_jti:
+        # The paired refresh token expires within a full lifetime from now
+        lifetime = timedelta(
+            days=revocation_store.settings.jwt_refresh_token_expire_days
+        )
+        await revocation_store.revoke(
+            tenant_id, refresh_jti, time.time() + lifetime.total_seconds()
+        )
+
+
+async def is_token_revoked(payload: Dict[str, Any]) -> bool:
+    """Check whether a decoded token has been revoked"""
+    return await revocation_store.is_revoked(
+        payload.get("tenant_id"), payload.get("jti")
+    )
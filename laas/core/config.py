@@ -2,8 +2,10 @@
 Configuration management for LAAS Platform
 """
 
-from functools import lru_cache
-from typing import Any, List, Optional
+import fnmatch
+import re
+from functools import cached_property, lru_cache
+from typing import Any, List, Optional, Pattern
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
@@ -22,6 +24,11 @@ class Settings(BaseSettings):
     database_url: str = Field(default="sqlite:///./test.db", alias="DATABASE_URL")
     database_pool_size: int = 20
     database_max_overflow: int = 30
+    # Set when DATABASE_URL points at pgbouncer (transaction pooling); the
+    # async engine then uses NullPool and disables prepared statement caches
+    database_external_pool: bool = False
+    # Compiled SQL cache entries per engine (SQLAlchemy default is 500)
+    database_query_cache_size: int = 1200
 
     # Redis
     redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
@@ -30,17 +37,51 @@ class Settings(BaseSettings):
     # JWT
     jwt_secret_key: str = Field(default="test-secret-key", alias="JWT_SECRET_KEY")
     jwt_algorithm: str = "HS256"
+    # PEM keys for asymmetric algorithms such as EdDSA (Ed25519); HS* uses the
+    # secret key. A public key alone gives a verify-only instance.
+    jwt_private_key: Optional[str] = Field(default=None, alias="JWT_PRIVATE_KEY")
+    jwt_public_key: Optional[str] = Field(default=None, alias="JWT_PUBLIC_KEY")
     jwt_access_token_expire_minutes: int = 30
     jwt_refresh_token_expire_days: int = 7
+    # Verified-token cache (0 disables); entries never outlive the token's exp
+    jwt_cache_size: int = 0
+    jwt_cache_ttl: int = 30
+    # Redis-backed revocation of individual tokens (by jti claim)
+    token_revocation_enabled: bool = False
+    token_revocation_cache_size: int = 10000
+    token_revocation_cache_ttl: int = 30
+    # Authorization snapshot cache for authenticated users (0 disables)
+    user_cache_size: int = 0
+    user_cache_ttl: int = 30
+    # Per-worker cache of active tenants resolved by TenantMiddleware (0 disables)
+    tenant_cache_size: int = 10000
+    tenant_cache_ttl: int = 60
+    # Redis-backed authorization cache shared across workers
+    permission_cache_enabled: bool = False
+    permission_cache_ttl: int = 45
+
+    # Password hashing (Argon2id; memory cost in KiB)
+    password_argon2_memory_cost: int = 19456
+    password_argon2_time_cost: int = 2
+    password_argon2_parallelism: int = 1
+    # Concurrent hash/verify calls per process (0 = one per CPU)
+    password_hash_concurrency: int = 0
 
     # CORS
     cors_origins: List[str] = ["http://localhost:3000"]
     cors_allow_credentials: bool = True
 
-    # Rate Limiting
+    # Rate Limiting ("redis" shares limits across workers; "memory" is per
+    # process, for local development without Redis)
+    rate_limit_backend: str = "redis"
     rate_limit_requests: int = 100
     rate_limit_window: int = 60
 
+    # Audit logging (entries are queued and inserted in batches)
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 100
+    audit_flush_interval: float = 0.5
+
     # Security
     secret_key: str = Field(default="test-secret-key", alias="SECRET_KEY")
     allowed_hosts: List[str] = [
@@ -64,6 +105,12 @@ class Settings(BaseSettings):
     default_page_size: int = 20
     max_page_size: int = 100
     default_search_radius: int = 25  # miles
+    # Per-worker cache of autocomplete suggestions (0 disables). ORM commits
+    # that touch listings or categories clear the committing worker's entries;
+    # other workers and Core/bulk writes can serve stale suggestions for up to
+    # suggestion_cache_ttl seconds
+    suggestion_cache_size: int = 50000
+    suggestion_cache_ttl: int = 30
 
     # Google Cloud
     google_cloud_project_id: Optional[str] = None
@@ -74,32 +121,30 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     log_format: str = "json"
 
-    @field_validator("cors_origins", mode="before")
-    @classmethod
-    def assemble_cors_origins(cls, v: Any) -> List[str]:
-        if isinstance(v, str):
-            return [i.strip() for i in v.split(",")]
-        elif isinstance(v, list):
-            return v
-        return []
-
-    @field_validator("allowed_hosts", mode="before")
+    @field_validator(
+        "cors_origins", "allowed_hosts", "allowed_file_types", mode="before"
+    )
     @classmethod
-    def assemble_allowed_hosts(cls, v: Any) -> List[str]:
+    def _split_csv(cls, v: Any) -> List[str]:
         if isinstance(v, str):
             return [i.strip() for i in v.split(",")]
         elif isinstance(v, list):
             return v
         return []
 
-    @field_validator("allowed_file_types", mode="before")
-    @classmethod
-    def assemble_file_types(cls, v: Any) -> List[str]:
-        if isinstance(v, str):
-            return [i.strip() for i in v.split(",")]
-        elif isinstance(v, list):
-            return v
-        return []
+    @cached_property
+    def allowed_hosts_matcher(self) -> Pattern[str]:
+        """All allowed host patterns compiled into a single regex"""
+        if "*" in self.allowed_hosts:
+            return re.compile(r".*")
+        return re.compile(
+            "|".join(fnmatch.translate(host) for host in self.allowed_hosts),
+            re.IGNORECASE,
+        )
+
+    def host_allowed(self, host: str) -> bool:
+        """Check a request host (without port) against allowed_hosts"""
+        return self.allowed_hosts_matcher.match(host) is not None
 
     class Config:
         env_file = ".env"
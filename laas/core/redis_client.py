@@ -0,0 +1,32 @@
+"""
+Shared asyncio Redis client for LAAS Platform
+"""
+
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from laas.core.config import get_settings
+
+_client: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """Get the process-wide Redis client (connections are pooled lazily)"""
+    global _client
+    if _client is None:
+        settings = get_settings()
+        _client = Redis.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_pool_size,
+            decode_responses=True,
+        )
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client and its connection pool"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,10 @@
+"""
+UTC time helpers for LAAS Platform
+"""
+
+from datetime import datetime, timezone
+
+
+def utcnow_aware() -> datetime:
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(timezone.utc)
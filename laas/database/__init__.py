@@ -2,12 +2,14 @@
 Database package for LAAS Platform
 """
 
-from .connection import DatabaseManager, get_db
+from .connection import DatabaseManager, get_db, get_db_manager, get_sync_db
 from .models import Base, IndustrySchema, Listing, Tenant, User
 
 __all__ = [
     "DatabaseManager",
     "get_db",
+    "get_db_manager",
+    "get_sync_db",
     "Base",
     "Tenant",
     "User",
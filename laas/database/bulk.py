@@ -0,0 +1,216 @@
+"""
+Bulk write helpers for append-only and metric tables
+"""
+
+import enum
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import JSON, Column, Table, TypeDecorator, UniqueConstraint, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from laas.database.connection import json_dumps
+from laas.database.models import Metric, MetricEntityType
+
+# Below this many rows a multi-row INSERT is as fast as COPY
+COPY_THRESHOLD = 100
+
+# Upserts above this many rows are COPY'd into a staging table first
+STAGE_THRESHOLD = 1000
+
+
+def _copy_columns(table: Table, sample: Dict[str, Any]) -> List[Column]:
+    """Columns to send: provided values plus client-side defaults.
+
+    Columns with only a server default are left out so PostgreSQL fills them.
+    """
+    return [
+        column
+        for column in table.columns
+        if column.key in sample
+        or (column.default is not None and not column.default.is_sequence)
+    ]
+
+
+def _copy_value(column: Column, row: Dict[str, Any]) -> Any:
+    if column.key in row:
+        value = row[column.key]
+    elif column.default.is_callable:  # type: ignore[union-attr]
+        value = column.default.arg(None)  # type: ignore[union-attr]
+    elif column.default.is_clause_element:  # type: ignore[union-attr]
+        raise ValueError(f"Column {column.key} needs an explicit value for COPY")
+    else:
+        value = column.default.arg  # type: ignore[union-attr]
+
+    # COPY bypasses SQLAlchemy's bind processing (e.g. UtcDateTime)
+    if isinstance(column.type, TypeDecorator):
+        value = column.type.process_bind_param(value, None)
+    # Enum columns store member values
+    if isinstance(value, enum.Enum):
+        value = value.value
+    # asyncpg's COPY codecs take JSON documents as text
+    if value is not None and isinstance(column.type, JSON):
+        return json_dumps(value)
+    return value
+
+
+def _copy_records(
+    table: Table, rows: Sequence[Dict[str, Any]]
+) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    columns = _copy_columns(table, rows[0])
+    records = [tuple(_copy_value(column, row) for column in columns) for row in rows]
+    return [column.name for column in columns], records
+
+
+async def _driver_connection(connection: AsyncConnection) -> Any:
+    """The asyncpg connection, inside the session's transaction.
+
+    SQLAlchemy's asyncpg adapter only sends BEGIN on its first execute; raw
+    driver calls made before that would autocommit on their own.
+    """
+    raw = await connection.get_raw_connection()
+    driver = raw.driver_connection
+    if not driver.is_in_transaction():  # type: ignore[union-attr]
+        await connection.exec_driver_sql("SELECT 1")
+    return driver
+
+
+async def bulk_insert(
+    session: AsyncSession, model: Type[Any], rows: Sequence[Dict[str, Any]]
+) -> None:
+    """Insert many rows of an append-only model without loading ORM objects.
+
+    Large batches on asyncpg are streamed with COPY; smaller batches and other
+    drivers use a single executemany INSERT. Rows must share the same keys.
+    Nothing is returned; use insert(...).returning(...) when ids are needed.
+    """
+    if not rows:
+        return
+
+    table: Table = model.__table__
+    connection = await session.connection()
+    if len(rows) > COPY_THRESHOLD and connection.dialect.driver == "asyncpg":
+        columns, records = _copy_records(table, rows)
+        driver = await _driver_connection(connection)
+        await driver.copy_records_to_table(table.name, records=records, columns=columns)
+        return
+
+    await session.execute(insert(table), list(rows))
+
+
+def _conflict_columns(table: Table) -> List[str]:
+    """Columns of the table's natural key.
+
+    That is its first unique constraint, or the primary key when the table
+    has no surrogate id.
+    """
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            return [column.name for column in constraint.columns]
+    if "id" not in table.c:
+        return [column.name for column in table.primary_key.columns]
+    raise ValueError(f"Table {table.name} has no natural key to upsert on")
+
+
+def _update_columns(keys: Sequence[str], sample: Dict[str, Any]) -> List[str]:
+    # Only provided columns are overwritten; omitted ones keep their value
+    return [key for key in sample if key not in keys and key != "id"]
+
+
+async def _staged_upsert(
+    connection: AsyncConnection,
+    table: Table,
+    keys: Sequence[str],
+    rows: Sequence[Dict[str, Any]],
+) -> None:
+    """COPY rows into a temporary table, then merge them in one statement"""
+    columns, records = _copy_records(table, rows)
+    updates = _update_columns(keys, rows[0])
+    stage = f"_stage_{table.name}"
+    column_list = ", ".join(columns)
+    assignments = ", ".join(f"{name} = EXCLUDED.{name}" for name in updates)
+
+    # Create, COPY and merge all run in the caller's transaction, so the
+    # ON COMMIT DROP stage table lives until it commits
+    driver = await _driver_connection(connection)
+    await driver.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {stage} "
+        f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP"
+    )
+    await driver.execute(f"TRUNCATE {stage}")
+    await driver.copy_records_to_table(stage, records=records, columns=columns)
+    await driver.execute(
+        f"INSERT INTO {table.name} ({column_list}) "
+        f"SELECT {column_list} FROM {stage} "
+        f"ON CONFLICT ({', '.join(keys)}) "
+        + (f"DO UPDATE SET {assignments}" if assignments else "DO NOTHING")
+    )
+
+
+async def upsert_metrics(
+    session: AsyncSession, model: Type[Any], rows: Sequence[Dict[str, Any]]
+) -> None:
+    """Insert or update metric rows on the model's natural key in one round trip.
+
+    Rows must share the same keys and must not repeat a natural key within
+    the batch. Columns left out of the rows keep their stored values on
+    update. Large batches on asyncpg are staged through COPY.
+    """
+    if not rows:
+        return
+
+    table: Table = model.__table__
+    keys = _conflict_columns(table)
+    connection = await session.connection()
+    dialect = connection.dialect
+    if len(rows) > STAGE_THRESHOLD and dialect.driver == "asyncpg":
+        await _staged_upsert(connection, table, keys, rows)
+        return
+
+    stmt = (pg_insert if dialect.name == "postgresql" else sqlite_insert)(table)
+    updates = _update_columns(keys, rows[0])
+    if updates:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: stmt.excluded[name] for name in updates},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+    await session.execute(stmt, list(rows))
+
+
+async def upsert_metric(
+    session: AsyncSession,
+    tenant_id: Any,
+    date: datetime,
+    name: str,
+    value: float,
+    data: Optional[Dict[str, Any]] = None,
+    listing_id: Any = None,
+) -> None:
+    """Record one metric value, replacing any existing one.
+
+    The metric belongs to the tenant, or to ``listing_id`` when given.
+    """
+    if listing_id is None:
+        entity_type, entity_id = MetricEntityType.TENANT, tenant_id
+    else:
+        entity_type, entity_id = MetricEntityType.LISTING, listing_id
+
+    await upsert_metrics(
+        session,
+        Metric,
+        [
+            {
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "tenant_id": tenant_id,
+                "date": date,
+                "metric_name": name,
+                "metric_value": value,
+                "metric_data": data,
+            }
+        ],
+    )
@@ -3,68 +3,156 @@ Database connection and session management
 """
 
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator, Generator
-
-from sqlalchemy import create_engine, event
-from sqlalchemy.engine import Engine
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, Generator
+
+import orjson
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import NullPool, QueuePool
 
 from laas.core.config import get_settings
 
 
+def json_dumps(value: Any) -> str:
+    """Serialize a JSON/JSONB column value with orjson (drivers expect text)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class DatabaseManager:
     """Database connection manager with multi-tenant support"""
 
     def __init__(self) -> None:
         self.settings = get_settings()
+        self._db_url = self.settings.database_url
+        self._is_pg = "postgresql" in self._db_url
+        # Behind a transaction-mode pooler (e.g. pgbouncer) the app keeps no
+        # connections of its own
+        self._external_pool = self.settings.database_external_pool
         self.engine = self._create_engine()
         self.SessionLocal = sessionmaker(
             autocommit=False, autoflush=False, bind=self.engine
         )
+        self.async_engine = self._create_async_engine()
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
 
     def _create_engine(self) -> Engine:
         """Create database engine with connection pooling"""
+        connect_args: Dict[str, Any] = {}
+        if self._is_pg:
+            # Sent in the startup packet, so no per-connection SET round-trip
+            connect_args["options"] = "-c timezone=UTC"
+
+        if self._external_pool:
+            # Only schema management and legacy sync callers use this engine
+            pool_size, max_overflow = 2, 0
+        else:
+            pool_size = self.settings.database_pool_size
+            max_overflow = self.settings.database_max_overflow
+
         engine = create_engine(
-            self.settings.database_url,
+            self._db_url,
             poolclass=QueuePool,
-            pool_size=self.settings.database_pool_size,
-            max_overflow=self.settings.database_max_overflow,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
             pool_pre_ping=True,
             pool_recycle=3600,  # Recycle connections every hour
             echo=self.settings.debug,
+            query_cache_size=self.settings.database_query_cache_size,
+            json_serializer=json_dumps,
+            json_deserializer=orjson.loads,
+            connect_args=connect_args,
         )
 
-        # Add connection event listeners
-        @event.listens_for(engine, "connect")
-        def set_sqlite_pragma(dbapi_connection: Any, connection_record: Any) -> None:
-            """Set database connection parameters"""
-            if "postgresql" in self.settings.database_url:
-                # PostgreSQL specific settings
-                with dbapi_connection.cursor() as cursor:
-                    cursor.execute("SET timezone TO 'UTC'")
-
         return engine
 
+    @staticmethod
+    def _async_url(database_url: str) -> str:
+        """Swap the configured sync driver for its asyncio counterpart"""
+        url = make_url(database_url)
+        backend = url.get_backend_name()
+        if backend == "postgresql":
+            url = url.set(drivername="postgresql+asyncpg")
+        elif backend == "sqlite":
+            url = url.set(drivername="sqlite+aiosqlite")
+        return url.render_as_string(hide_password=False)
+
+    def _create_async_engine(self) -> AsyncEngine:
+        """Create asyncio engine sharing the sync engine's pool settings"""
+        async_url = self._async_url(self._db_url)
+        connect_args: Dict[str, Any] = {}
+        if async_url.startswith("postgresql+asyncpg"):
+            connect_args["server_settings"] = {"timezone": "UTC"}
+
+        if self._external_pool:
+            if "server_settings" in connect_args:
+                # Prepared statements don't survive transaction pooling
+                connect_args["statement_cache_size"] = 0
+                async_url = (
+                    make_url(async_url)
+                    .update_query_dict({"prepared_statement_cache_size": "0"})
+                    .render_as_string(hide_password=False)
+                )
+            return create_async_engine(
+                async_url,
+                poolclass=NullPool,
+                echo=self.settings.debug,
+                query_cache_size=self.settings.database_query_cache_size,
+                json_serializer=json_dumps,
+                json_deserializer=orjson.loads,
+                connect_args=connect_args,
+            )
+
+        return create_async_engine(
+            async_url,
+            pool_size=self.settings.database_pool_size,
+            max_overflow=self.settings.database_max_overflow,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            echo=self.settings.debug,
+            query_cache_size=self.settings.database_query_cache_size,
+            json_serializer=json_dumps,
+            json_deserializer=orjson.loads,
+            connect_args=connect_args,
+        )
+
     def get_session(self) -> Generator[Session, None, None]:
-        """Get database session"""
+        """Get blocking database session (schema management and legacy callers)"""
         session = self.SessionLocal()
         try:
             yield session
         finally:
             session.close()
 
-    def get_tenant_session(self, tenant_id: str) -> Generator[Session, None, None]:
-        """Get tenant-specific database session"""
-        session = self.SessionLocal()
-        try:
+    async def get_tenant_session(
+        self, tenant_id: str
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """Get tenant-specific database session.
+
+        The session runs inside one transaction that commits when the caller
+        is done. The tenant setting is transaction-local, so it is reverted
+        automatically and never leaks to the next user of the pooled
+        connection.
+        """
+        async with self.AsyncSessionLocal() as session, session.begin():
             # Set tenant context for RLS (Row Level Security)
-            from sqlalchemy import text
-
-            session.execute(text(f"SET app.current_tenant_id = '{tenant_id}'"))
+            await session.execute(
+                text("SELECT set_config('app.current_tenant_id', :tenant_id, true)"),
+                {"tenant_id": str(tenant_id)},
+            )
             yield session
-        finally:
-            session.close()
 
     def create_tables(self) -> None:
         """Create all database tables"""
@@ -79,25 +167,31 @@ class DatabaseManager:
         Base.metadata.drop_all(bind=self.engine)
 
 
-# Global database manager instance
-db_manager = DatabaseManager()
+@lru_cache(maxsize=1)
+def get_db_manager() -> DatabaseManager:
+    """Get the process-wide database manager, creating it on first use"""
+    return DatabaseManager()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session"""
-    yield from db_manager.get_session()
+    async with get_db_manager().AsyncSessionLocal() as session:
+        yield session
+
 
+def get_sync_db() -> Generator[Session, None, None]:
+    """Get a blocking database session for code that can't await"""
+    yield from get_db_manager().get_session()
 
-def get_tenant_db(tenant_id: str) -> Generator[Session, None, None]:
+
+async def get_tenant_db(tenant_id: str) -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get tenant-specific database session"""
-    yield from db_manager.get_tenant_session(tenant_id)
+    async for session in get_db_manager().get_tenant_session(tenant_id):
+        yield session
 
 
 @asynccontextmanager
-async def get_async_session() -> AsyncGenerator[Session, None]:
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Async context manager for database sessions"""
-    session = db_manager.SessionLocal()
-    try:
+    async with get_db_manager().AsyncSessionLocal() as session:
         yield session
-    finally:
-        session.close()
@@ -3,16 +3,22 @@ Database models for LAAS Platform
 """
 
 import enum
+import os
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple, Type
 
+from geoalchemy2 import Geography
 from sqlalchemy import (
+    DDL,
     DECIMAL,
     JSON,
+    TIMESTAMP,
     BigInteger,
     Boolean,
     Column,
-    DateTime,
+    Computed,
     Enum,
     Float,
     ForeignKey,
@@ -21,16 +27,135 @@ from sqlalchemy import (
     String,
     Table,
     Text,
+    TypeDecorator,
     UniqueConstraint,
+    bindparam,
     event,
+    insert,
+    select,
+    text,
 )
-from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
-from sqlalchemy.orm import DeclarativeBase, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import DeclarativeBase, deferred, relationship, undefer_group
+from sqlalchemy.sql import Executable, func
+from sqlalchemy.sql.functions import FunctionElement
+
+from laas.core.timeutils import utcnow_aware
 
 
 class Base(DeclarativeBase):
-    pass
+    # Fetch server-generated defaults with INSERT ... RETURNING, so new
+    # objects never lazy-load them afterwards (which async sessions forbid)
+    __mapper_args__ = {"eager_defaults": True}
+
+
+def uuid7() -> uuid.UUID:
+    """Generate a time-ordered UUIDv7 (48-bit Unix ms timestamp + random bits).
+
+    Ids created close together sort together, so primary key inserts append
+    to the right edge of the B-tree instead of touching random pages.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10))
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+class UtcDateTime(TypeDecorator):
+    """UTC instant stored as a plain ``timestamp`` (no timezone).
+
+    Aware datetimes are converted to naive UTC on the way in and loaded back
+    as aware UTC, so Python code only ever sees aware values while the
+    database skips timestamptz normalization.
+    """
+
+    impl = TIMESTAMP(timezone=False)
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[datetime], dialect: Any) -> Any:
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value: Optional[datetime], dialect: Any) -> Any:
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
+# Trigram operator classes back the substring (ILIKE '%...%') name indexes;
+# pgcrypto provides digest() for the slug_key unique indexes
+for _extension in ("pg_trgm", "pgcrypto"):
+    event.listen(
+        Base.metadata,
+        "before_create",
+        DDL(f"CREATE EXTENSION IF NOT EXISTS {_extension}").execute_if(
+            dialect="postgresql"
+        ),
+    )
+
+
+# JSONB on PostgreSQL (indexable, binary), plain JSON elsewhere (e.g. SQLite)
+JSONBType = JSON().with_variant(JSONB(), "postgresql")
+
+# Empty JSON defaults applied by the database, so inserts (ORM or COPY) can
+# leave these columns out entirely
+_EMPTY_OBJECT = text("'{}'")
+_EMPTY_ARRAY = text("'[]'")
+
+
+def value_enum(enum_class: Type[enum.Enum]) -> Enum:
+    """Native enum type that stores member values ("active"), not names.
+
+    Rows are mapped back to members through SQLAlchemy's value lookup table,
+    so loading never goes through Enum.__call__.
+    """
+    return Enum(
+        enum_class,
+        native_enum=True,
+        values_callable=lambda members: [member.value for member in members],
+        validate_strings=False,
+    )
+
+
+class PostgresComputed(Computed):
+    """Generated column expression that only PostgreSQL can evaluate.
+
+    Other dialects get a plain nullable column instead.
+    """
+
+    inherit_cache = True
+
+
+@compiles(PostgresComputed)
+def _compile_postgres_computed(element: Computed, compiler: Any, **kw: Any) -> str:
+    if compiler.dialect.name != "postgresql":
+        return ""
+    return compiler.visit_computed_column(element, **kw)
+
+
+class slug_key(FunctionElement):
+    """Fixed-width lookup key for a slug: ``digest(slug, 'sha1')`` on PostgreSQL.
+
+    Slug uniqueness is enforced on this 20-byte key instead of the raw text.
+    Other dialects use the slug itself. Compare ``slug_key(Model.slug)`` with
+    ``slug_key(literal(value))`` so lookups hit the unique index.
+    """
+
+    name = "slug_key"
+    inherit_cache = True
+
+
+@compiles(slug_key)
+def _compile_slug_key(element: slug_key, compiler: Any, **kw: Any) -> str:
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(slug_key, "postgresql")
+def _compile_slug_key_postgresql(element: slug_key, compiler: Any, **kw: Any) -> str:
+    # The cast picks digest(text, text) for untyped bind parameters too
+    return f"digest(CAST({compiler.process(element.clauses, **kw)} AS TEXT), 'sha1')"
 
 
 # Enums
@@ -73,7 +198,9 @@ listing_categories = Table(
     Column(
         "category_id", UUID(as_uuid=True), ForeignKey("categories.id"), primary_key=True
     ),
-    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("created_at", UtcDateTime, server_default=func.now()),
+    # The primary key leads with listing_id; category filters go the other way
+    Index("idx_listing_categories_category_id", "category_id", "listing_id"),
 )
 
 listing_tags = Table(
@@ -83,7 +210,8 @@ listing_tags = Table(
         "listing_id", UUID(as_uuid=True), ForeignKey("listings.id"), primary_key=True
     ),
     Column("tag_id", UUID(as_uuid=True), ForeignKey("tags.id"), primary_key=True),
-    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("created_at", UtcDateTime, server_default=func.now()),
+    Index("idx_listing_tags_tag_id", "tag_id", "listing_id"),
 )
 
 user_favorites = Table(
@@ -93,7 +221,8 @@ user_favorites = Table(
     Column(
         "listing_id", UUID(as_uuid=True), ForeignKey("listings.id"), primary_key=True
     ),
-    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("created_at", UtcDateTime, server_default=func.now()),
+    Index("idx_user_favorites_listing_id", "listing_id"),
 )
 
 
@@ -102,7 +231,7 @@ class Tenant(Base):
 
     __tablename__ = "tenants"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     name = Column(String(255), nullable=False)
     subdomain = Column(String(100), unique=True, nullable=False)
     domain = Column(String(255), nullable=True)
@@ -113,12 +242,12 @@ class Tenant(Base):
     plan = Column(String(50), default="starter", nullable=False)
 
     # Configuration
-    settings = Column(JSON, default=dict)
-    branding = Column(JSON, default=dict)
+    settings = Column(JSONBType, nullable=False, server_default=_EMPTY_OBJECT)
+    branding = Column(JSONBType, nullable=False, server_default=_EMPTY_OBJECT)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(UtcDateTime, server_default=func.now())
+    updated_at = Column(UtcDateTime, onupdate=func.now())
 
     # Relationships
     users = relationship("User", back_populates="tenant", cascade="all, delete-orphan")
@@ -135,15 +264,19 @@ class Tenant(Base):
     api_keys = relationship(
         "APIKey", back_populates="tenant", cascade="all, delete-orphan"
     )
-    analytics = relationship(
-        "Analytics", back_populates="tenant", cascade="all, delete-orphan"
-    )
+    metrics = relationship("Metric", back_populates="tenant", passive_deletes=True)
 
     # Indexes
     __table_args__ = (
         Index("idx_tenant_subdomain", "subdomain"),
         Index("idx_tenant_industry", "industry"),
         Index("idx_tenant_status", "status"),
+        Index(
+            "idx_tenant_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
 
@@ -152,7 +285,7 @@ class User(Base):
 
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
 
     # Authentication
@@ -162,23 +295,23 @@ class User(Base):
     # Profile information
     first_name = Column(String(100), nullable=True)
     last_name = Column(String(100), nullable=True)
-    avatar_url = Column(String(500), nullable=True)
+    avatar_url = Column(String(320), nullable=True)
 
     # Role and permissions
-    role = Column(Enum(UserRole), default=UserRole.USER, nullable=False)
-    permissions = Column(JSON, default=list)
+    role = Column(value_enum(UserRole), default=UserRole.USER, nullable=False)
+    permissions = Column(JSONBType, nullable=False, server_default=_EMPTY_ARRAY)
 
     # Status
     status = Column(String(50), default="active", nullable=False)
     email_verified = Column(Boolean, default=False, nullable=False)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    last_login = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(UtcDateTime, server_default=func.now())
+    updated_at = Column(UtcDateTime, onupdate=func.now())
+    last_login = Column(UtcDateTime, nullable=True)
 
     # Relationships
-    tenant = relationship("Tenant", back_populates="users")
+    tenant = relationship("Tenant", back_populates="users", lazy="raise_on_sql")
     listings = relationship(
         "Listing", back_populates="owner", cascade="all, delete-orphan"
     )
@@ -200,11 +333,19 @@ class User(Base):
 
     # Constraints and indexes
     __table_args__ = (
+        # Emails are stored lowercased so these stay plain b-tree lookups
         UniqueConstraint("tenant_id", "email", name="uq_user_tenant_email"),
         Index("idx_user_tenant_id", "tenant_id"),
-        Index("idx_user_email", "email"),
+        Index("idx_user_email_status", "email", "status"),
+        Index("idx_user_tenant_id_status", "tenant_id", "id", "status"),
         Index("idx_user_role", "role"),
         Index("idx_user_status", "status"),
+        Index(
+            "idx_user_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
 
@@ -213,7 +354,7 @@ class IndustrySchema(Base):
 
     __tablename__ = "industry_schemas"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
 
     # Schema information
@@ -223,21 +364,23 @@ class IndustrySchema(Base):
     description = Column(Text, nullable=True)
 
     # Schema definition
-    fields = Column(JSON, nullable=False)  # List of field definitions
-    searchable_fields = Column(JSON, default=list)
-    required_fields = Column(JSON, default=list)
-    business_rules = Column(JSON, default=dict)
+    fields = Column(JSONBType, nullable=False)  # List of field definitions
+    searchable_fields = Column(JSONBType, nullable=False, server_default=_EMPTY_ARRAY)
+    required_fields = Column(JSONBType, nullable=False, server_default=_EMPTY_ARRAY)
+    business_rules = Column(JSONBType, nullable=False, server_default=_EMPTY_OBJECT)
 
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
     is_default = Column(Boolean, default=False, nullable=False)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(UtcDateTime, server_default=func.now())
+    updated_at = Column(UtcDateTime, onupdate=func.now())
 
     # Relationships
-    tenant = relationship("Tenant", back_populates="industry_schemas")
+    tenant = relationship(
+        "Tenant", back_populates="industry_schemas", lazy="raise_on_sql"
+    )
     listings = relationship("Listing", back_populates="schema")
 
     # Constraints and indexes
@@ -248,15 +391,31 @@ class IndustrySchema(Base):
         Index("idx_schema_tenant_id", "tenant_id"),
         Index("idx_schema_industry", "industry"),
         Index("idx_schema_active", "is_active"),
+        Index(
+            "idx_schema_business_rules_gin",
+            "business_rules",
+            postgresql_using="gin",
+            postgresql_ops={"business_rules": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
 
+# Numeric keys of Listing.data that searches range-filter and sort on. GIN
+# does not serve ->> comparisons, so each gets a B-tree expression index over
+# published listings; queries must use the same (data->>'key')::numeric form
+LISTING_NUMERIC_DATA_FIELDS = ("year_built", "square_feet")
+
+# Keys of Listing.data promoted to generated Listing columns. Only PostgreSQL
+# computes them; elsewhere the columns stay NULL and data must be queried
+LISTING_GENERATED_DATA_FIELDS = ("property_type", "bedrooms", "bathrooms")
+
+
 class Listing(Base):
     """Generic listing model with dynamic fields"""
 
     __tablename__ = "listings"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     schema_id = Column(
@@ -264,12 +423,16 @@ class Listing(Base):
     )
 
     # Core listing information
+    # Large body columns are deferred as one "detail" group: list queries skip
+    # them, and the first access (or undefer_group("detail")) loads all three
     title = Column(String(255), nullable=False)
-    description = Column(Text, nullable=True)
+    description = deferred(Column(Text, nullable=True), group="detail")
     slug = Column(String(255), nullable=False)
 
-    # Dynamic fields (industry-specific)
-    data = Column(JSON, default=dict)  # All custom fields stored here
+    # Dynamic fields (industry-specific); all custom fields stored here
+    data = deferred(
+        Column(JSONBType, nullable=False, server_default=_EMPTY_OBJECT), group="detail"
+    )
 
     # Location information
     address = Column(String(500), nullable=True)
@@ -279,9 +442,22 @@ class Listing(Base):
     postal_code = Column(String(20), nullable=True)
     latitude = Column(DECIMAL(10, 8), nullable=True)
     longitude = Column(DECIMAL(11, 8), nullable=True)
+    # PostGIS point derived from latitude/longitude for indexed radius search
+    location = Column(
+        Geography(geometry_type="POINT", srid=4326, spatial_index=False).with_variant(
+            Text(), "sqlite"
+        ),
+        PostgresComputed(
+            "ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography",
+            persisted=True,
+        ),
+        nullable=True,
+    )
 
     # Status and visibility
-    status = Column(Enum(ListingStatus), default=ListingStatus.DRAFT, nullable=False)
+    status = Column(
+        value_enum(ListingStatus), default=ListingStatus.DRAFT, nullable=False
+    )
     is_verified = Column(Boolean, default=False, nullable=False)
     is_featured = Column(Boolean, default=False, nullable=False)
     is_public = Column(Boolean, default=True, nullable=False)
@@ -291,26 +467,88 @@ class Listing(Base):
     currency = Column(String(3), default="USD", nullable=False)
 
     # Metadata
-    listing_metadata = Column(JSON, default=dict)
+    listing_metadata = deferred(
+        Column(JSONBType, nullable=False, server_default=_EMPTY_OBJECT), group="detail"
+    )
 
-    # Search optimization (database-specific)
-    search_vector = Column(Text, nullable=True)
+    # Hot industry fields promoted out of data (generated by PostgreSQL), so
+    # filters and sorts read typed, indexable columns; data stays the source
+    property_type = Column(
+        String(100),
+        PostgresComputed("left(data->>'property_type', 100)", persisted=True),
+        nullable=True,
+    )
+    # Whole counts only: fractional or out-of-range values yield NULL rather
+    # than being rounded or failing the write of an otherwise valid data blob
+    bedrooms = Column(
+        Integer,
+        PostgresComputed(
+            "CASE WHEN jsonb_typeof(data->'bedrooms') = 'number' "
+            "AND (data->>'bedrooms')::numeric BETWEEN 0 AND 2147483647 "
+            "AND trunc((data->>'bedrooms')::numeric) = (data->>'bedrooms')::numeric "
+            "THEN (data->>'bedrooms')::numeric::integer END",
+            persisted=True,
+        ),
+        nullable=True,
+    )
+    bathrooms = Column(
+        DECIMAL,
+        PostgresComputed(
+            "CASE WHEN jsonb_typeof(data->'bathrooms') = 'number' "
+            "THEN (data->>'bathrooms')::numeric END",
+            persisted=True,
+        ),
+        nullable=True,
+    )
+
+    # Owner/tenant fields rendered with every listing, copied here so reads
+    # skip the users and tenants joins (kept in sync by PostgreSQL triggers)
+    owner_display_name = Column(String(201), nullable=True)
+    tenant_subdomain = Column(String(100), nullable=True)
+    tenant_plan = Column(String(50), nullable=True)
+
+    # Full-text search document, maintained by PostgreSQL; only used in SQL
+    search_vector = deferred(
+        Column(
+            TSVECTOR().with_variant(Text(), "sqlite"),
+            PostgresComputed(
+                "to_tsvector('english', "
+                "coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || "
+                "coalesce(address, '') || ' ' || coalesce(city, '') || ' ' || "
+                "coalesce(state, '') || ' ' || coalesce(country, ''))",
+                persisted=True,
+            ),
+            nullable=True,
+        )
+    )
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    published_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(UtcDateTime, server_default=func.now())
+    updated_at = Column(UtcDateTime, onupdate=func.now())
+    published_at = Column(UtcDateTime, nullable=True)
 
     # Relationships
-    tenant = relationship("Tenant", back_populates="listings")
-    owner = relationship("User", back_populates="listings")
-    schema = relationship("IndustrySchema", back_populates="listings")
+    # Scalar parents must be eager-loaded explicitly; lazy SQL raises.
+    # Small collections shown with every listing load via SELECT ... IN.
+    tenant = relationship("Tenant", back_populates="listings", lazy="raise_on_sql")
+    owner = relationship("User", back_populates="listings", lazy="raise_on_sql")
+    schema = relationship(
+        "IndustrySchema", back_populates="listings", lazy="raise_on_sql"
+    )
     categories = relationship(
-        "Category", secondary=listing_categories, back_populates="listings"
+        "Category",
+        secondary=listing_categories,
+        back_populates="listings",
+        lazy="selectin",
+    )
+    tags = relationship(
+        "Tag", secondary=listing_tags, back_populates="listings", lazy="selectin"
     )
-    tags = relationship("Tag", secondary=listing_tags, back_populates="listings")
     media = relationship(
-        "Media", back_populates="listing", cascade="all, delete-orphan"
+        "Media",
+        back_populates="listing",
+        cascade="all, delete-orphan",
+        lazy="selectin",
     )
     reviews = relationship(
         "Review", back_populates="listing", cascade="all, delete-orphan"
@@ -318,23 +556,87 @@ class Listing(Base):
     favorited_by = relationship(
         "User", secondary=user_favorites, back_populates="favorites"
     )
-    analytics = relationship(
-        "ListingAnalytics", back_populates="listing", cascade="all, delete-orphan"
+    # One-row aggregate shown on every listing card; a primary key lookup
+    review_stats = relationship(
+        "ListingReviewStats", uselist=False, viewonly=True, lazy="joined"
     )
 
     # Constraints and indexes
     __table_args__ = (
-        UniqueConstraint("tenant_id", "slug", name="uq_listing_tenant_slug"),
-        Index("idx_listing_tenant_id", "tenant_id"),
+        Index(
+            "uq_listing_tenant_slug", "tenant_id", slug_key(text("slug")), unique=True
+        ),
+        # Tenant-scoped listing by status, newest first (any status; the
+        # partial index below covers the public feed). Also serves plain
+        # tenant_id lookups, so there is no separate tenant_id index
+        Index(
+            "idx_listing_tenant_status_pub",
+            "tenant_id",
+            "status",
+            published_at.desc(),
+        ),
         Index("idx_listing_owner_id", "owner_id"),
         Index("idx_listing_schema_id", "schema_id"),
-        Index("idx_listing_status", "status"),
-        Index("idx_listing_public", "is_public"),
-        Index("idx_listing_verified", "is_verified"),
-        Index("idx_listing_location", "latitude", "longitude"),
+        # Covers the public-listing hot path: tenant's published listings by
+        # publish date, answered by an index-only scan
+        Index(
+            "idx_listing_tenant_published_hot",
+            "tenant_id",
+            "published_at",
+            postgresql_where=text("status = 'published' AND is_public = true"),
+            postgresql_include=["id", "title", "slug", "price", "is_featured"],
+        ),
+        # Same feed in SearchEngine's default (newest first) and price orders
+        Index(
+            "idx_listing_tenant_published_created",
+            "tenant_id",
+            created_at.desc(),
+            postgresql_where=text("status = 'published' AND is_public = true"),
+            postgresql_include=["id", "title", "price"],
+        ),
+        Index(
+            "idx_listing_tenant_published_price",
+            "tenant_id",
+            price.desc(),
+            postgresql_where=text("status = 'published' AND is_public = true"),
+        ),
+        Index("idx_listing_location_gist", "location", postgresql_using="gist").ddl_if(
+            dialect="postgresql"
+        ),
         Index("idx_listing_city_state", "city", "state"),
+        Index(
+            "idx_listing_property_type_bedrooms",
+            "tenant_id",
+            "property_type",
+            "bedrooms",
+            postgresql_where=text("status = 'published'"),
+        ),
         Index("idx_listing_created_at", "created_at"),
         Index("idx_listing_published_at", "published_at"),
+        Index(
+            "idx_listing_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "idx_listing_search_vector", "search_vector", postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        # jsonb_path_ops: smaller index, serves @> containment on dynamic fields
+        Index(
+            "idx_listing_data_gin",
+            "data",
+            postgresql_using="gin",
+            postgresql_ops={"data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        *[
+            Index(
+                f"idx_listing_data_{field}",
+                text(f"((data->>'{field}')::numeric)"),
+                postgresql_where=text("status = 'published'"),
+            ).ddl_if(dialect="postgresql")
+            for field in LISTING_NUMERIC_DATA_FIELDS
+        ],
     )
 
 
@@ -343,7 +645,7 @@ class AuditLog(Base):
 
     __tablename__ = "audit_logs"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
 
@@ -354,27 +656,47 @@ class AuditLog(Base):
 
     # Request information
     ip_address = Column(String(45), nullable=True)
-    user_agent = Column(Text, nullable=True)
+    user_agent = deferred(Column(Text, nullable=True), group="payload")
     request_id = Column(String(255), nullable=True)
 
-    # Change details
-    old_values = Column(JSON, nullable=True)
-    new_values = Column(JSON, nullable=True)
-
-    # Timestamp
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Change details (deferred with user_agent; audit listings rarely need them)
+    old_values = deferred(Column(JSONBType, nullable=True), group="payload")
+    new_values = deferred(Column(JSONBType, nullable=True), group="payload")
+
+    # Timestamp (partition key, so part of the primary key)
+    created_at = Column(
+        UtcDateTime,
+        primary_key=True,
+        # Client-side so the ORM knows the full primary key after insert
+        default=utcnow_aware,
+        server_default=func.now(),
+    )
 
-    # Relationships
-    tenant = relationship("Tenant")
-    user = relationship("User")
+    # Relationships (audit rows are listed in bulk; never lazy-load parents)
+    tenant = relationship("Tenant", lazy="raise_on_sql")
+    user = relationship("User", lazy="raise_on_sql")
 
     # Indexes
+    # Append-only, so created_at follows physical order: a BRIN index covers
+    # time-range scans at a fraction of a B-tree's size
     __table_args__ = (
         Index("idx_audit_tenant_id", "tenant_id"),
         Index("idx_audit_user_id", "user_id"),
         Index("idx_audit_action", "action"),
         Index("idx_audit_resource", "resource_type", "resource_id"),
-        Index("idx_audit_created_at", "created_at"),
+        Index(
+            "idx_audit_created_at_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+        Index(
+            "idx_audit_new_values_gin",
+            "new_values",
+            postgresql_using="gin",
+            postgresql_ops={"new_values": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
 
@@ -383,7 +705,7 @@ class Category(Base):
 
     __tablename__ = "categories"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     parent_id = Column(UUID(as_uuid=True), ForeignKey("categories.id"), nullable=True)
 
@@ -403,23 +725,33 @@ class Category(Base):
     is_featured = Column(Boolean, default=False, nullable=False)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(UtcDateTime, server_default=func.now())
+    updated_at = Column(UtcDateTime, onupdate=func.now())
 
     # Relationships
-    tenant = relationship("Tenant", back_populates="categories")
-    parent = relationship("Category", remote_side=[id], backref="children")
+    tenant = relationship("Tenant", back_populates="categories", lazy="raise_on_sql")
+    parent = relationship(
+        "Category", remote_side=[id], backref="children", lazy="raise_on_sql"
+    )
     listings = relationship(
         "Listing", secondary=listing_categories, back_populates="categories"
     )
 
     # Constraints and indexes
     __table_args__ = (
-        UniqueConstraint("tenant_id", "slug", name="uq_category_tenant_slug"),
+        Index(
+            "uq_category_tenant_slug", "tenant_id", slug_key(text("slug")), unique=True
+        ),
         Index("idx_category_tenant_id", "tenant_id"),
         Index("idx_category_parent_id", "parent_id"),
         Index("idx_category_active", "is_active"),
         Index("idx_category_level", "level"),
+        Index(
+            "idx_category_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
 
@@ -428,7 +760,7 @@ class Tag(Base):
 
     __tablename__ = "tags"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
 
     # Tag information
@@ -438,25 +770,32 @@ class Tag(Base):
     color = Column(String(7), nullable=True)  # Hex color code
 
     # Usage statistics
+    # Maintained by a trigger on listing_tags (PostgreSQL); never set by the app
     usage_count = Column(Integer, default=0, nullable=False)
 
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(UtcDateTime, server_default=func.now())
+    updated_at = Column(UtcDateTime, onupdate=func.now())
 
     # Relationships
-    tenant = relationship("Tenant", back_populates="tags")
+    tenant = relationship("Tenant", back_populates="tags", lazy="raise_on_sql")
     listings = relationship("Listing", secondary=listing_tags, back_populates="tags")
 
     # Constraints and indexes
     __table_args__ = (
-        UniqueConstraint("tenant_id", "slug", name="uq_tag_tenant_slug"),
+        Index("uq_tag_tenant_slug", "tenant_id", slug_key(text("slug")), unique=True),
         Index("idx_tag_tenant_id", "tenant_id"),
         Index("idx_tag_active", "is_active"),
         Index("idx_tag_usage", "usage_count"),
+        Index(
+            "idx_tag_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
 
@@ -465,17 +804,17 @@ class Media(Base):
 
     __tablename__ = "media"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     listing_id = Column(UUID(as_uuid=True), ForeignKey("listings.id"), nullable=False)
 
     # Media information
-    filename = Column(String(255), nullable=False)
+    filename = Column(String(190), nullable=False)
     original_filename = Column(String(255), nullable=False)
-    file_path = Column(String(500), nullable=False)
-    file_url = Column(String(500), nullable=False)
+    file_path = Column(String(320), nullable=False)
+    file_url = Column(String(320), nullable=False)
     file_size = Column(BigInteger, nullable=False)
     mime_type = Column(String(100), nullable=False)
-    media_type = Column(Enum(MediaType), nullable=False)
+    media_type = Column(value_enum(MediaType), nullable=False)
 
     # Image specific fields
     width = Column(Integer, nullable=True)
@@ -490,11 +829,11 @@ class Media(Base):
     is_active = Column(Boolean, default=True, nullable=False)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(UtcDateTime, server_default=func.now())
+    updated_at = Column(UtcDateTime, onupdate=func.now())
 
     # Relationships
-    listing = relationship("Listing", back_populates="media")
+    listing = relationship("Listing", back_populates="media", lazy="raise_on_sql")
 
     # Constraints and indexes
     __table_args__ = (
@@ -510,7 +849,7 @@ class Review(Base):
 
     __tablename__ = "reviews"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     listing_id = Column(UUID(as_uuid=True), ForeignKey("listings.id"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
@@ -520,23 +859,33 @@ class Review(Base):
     content = Column(Text, nullable=True)
 
     # Status
-    status = Column(Enum(ReviewStatus), default=ReviewStatus.PENDING, nullable=False)
+    status = Column(
+        value_enum(ReviewStatus), default=ReviewStatus.PENDING, nullable=False
+    )
     is_verified = Column(Boolean, default=False, nullable=False)
 
     # Moderation
     moderated_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
-    moderated_at = Column(DateTime(timezone=True), nullable=True)
+    moderated_at = Column(UtcDateTime, nullable=True)
     moderation_notes = Column(Text, nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(UtcDateTime, server_default=func.now())
+    updated_at = Column(UtcDateTime, onupdate=func.now())
 
     # Relationships
-    listing = relationship("Listing", back_populates="reviews")
-    user = relationship("User", back_populates="reviews", foreign_keys=[user_id])
+    listing = relationship("Listing", back_populates="reviews", lazy="raise_on_sql")
+    user = relationship(
+        "User",
+        back_populates="reviews",
+        foreign_keys=[user_id],
+        lazy="raise_on_sql",
+    )
     moderator = relationship(
-        "User", back_populates="moderated_reviews", foreign_keys=[moderated_by]
+        "User",
+        back_populates="moderated_reviews",
+        foreign_keys=[moderated_by],
+        lazy="raise_on_sql",
     )
 
     # Constraints and indexes
@@ -547,111 +896,404 @@ class Review(Base):
         Index("idx_review_status", "status"),
         Index("idx_review_rating", "rating"),
         Index("idx_review_created_at", "created_at"),
+        Index(
+            "idx_review_approved",
+            "listing_id",
+            "rating",
+            postgresql_where=text("status = 'approved'"),
+        ),
     )
 
 
+class ListingReviewStats(Base):
+    """Approved-review count and average rating per listing (read-only).
+
+    Maintained on PostgreSQL by a trigger on ``reviews`` that recomputes the
+    affected listing's row, so reads never aggregate over reviews.
+    """
+
+    __tablename__ = "listing_review_stats"
+
+    listing_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("listings.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    review_count = Column(Integer, default=0, nullable=False)
+    avg_rating = Column(DECIMAL(3, 2), nullable=True)
+
+    # Relationships
+    listing = relationship("Listing", foreign_keys=[listing_id], viewonly=True)
+
+
 class APIKey(Base):
     """API keys for programmatic access"""
 
     __tablename__ = "api_keys"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
 
     # Key information
     name = Column(String(255), nullable=False)
-    key_hash = Column(String(255), nullable=False)  # Hashed version of the key
+    key_hash = Column(String(64), nullable=False)  # SHA-256 hex of the key
     key_prefix = Column(
         String(20), nullable=False
     )  # First few chars for identification
 
     # Permissions
-    permissions = Column(JSON, default=list)
+    permissions = Column(JSONBType, nullable=False, server_default=_EMPTY_ARRAY)
     rate_limit = Column(Integer, default=1000, nullable=False)  # Requests per hour
 
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
-    last_used = Column(DateTime(timezone=True), nullable=True)
+    last_used = Column(UtcDateTime, nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    expires_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(UtcDateTime, server_default=func.now())
+    updated_at = Column(UtcDateTime, onupdate=func.now())
+    expires_at = Column(UtcDateTime, nullable=True)
 
     # Relationships
-    tenant = relationship("Tenant", back_populates="api_keys")
-    user = relationship("User", back_populates="api_keys")
+    tenant = relationship("Tenant", back_populates="api_keys", lazy="raise_on_sql")
+    user = relationship("User", back_populates="api_keys", lazy="raise_on_sql")
 
     # Constraints and indexes
     __table_args__ = (
         Index("idx_api_key_tenant_id", "tenant_id"),
         Index("idx_api_key_user_id", "user_id"),
         Index("idx_api_key_active", "is_active"),
-        Index("idx_api_key_prefix", "key_prefix"),
+        # Key verification: active keys by prefix
+        Index(
+            "idx_api_key_lookup",
+            "key_prefix",
+            postgresql_where=text("is_active = true"),
+        ),
     )
 
 
-class Analytics(Base):
-    """Tenant-level analytics and metrics"""
+class MetricEntityType(str, enum.Enum):
+    TENANT = "tenant"
+    LISTING = "listing"
 
-    __tablename__ = "analytics"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+class Metric(Base):
+    """Per-day metric values for tenants and listings.
+
+    One row per (entity, date, metric); ``entity_id`` is the tenant or
+    listing id depending on ``entity_type``. ``tenant_id`` is stored on every
+    row so tenant-wide queries and roll-ups never join back to listings.
+    """
+
+    __tablename__ = "metrics"
+
+    # Natural key (date is the partition key, so it is part of it)
+    entity_type = Column(value_enum(MetricEntityType), primary_key=True)
+    entity_id = Column(UUID(as_uuid=True), primary_key=True)
+    date = Column(UtcDateTime, primary_key=True)
+    metric_name = Column(String(100), primary_key=True)
 
-    # Date and metrics
-    date = Column(DateTime(timezone=True), nullable=False)
-    metric_name = Column(String(100), nullable=False)
+    tenant_id = Column(
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False
+    )
     metric_value = Column(Float, nullable=False)
-    metric_data = Column(JSON, nullable=True)  # Additional metric details
+    metric_data = Column(JSONBType, nullable=True)  # Additional metric details
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(UtcDateTime, server_default=func.now())
 
     # Relationships
-    tenant = relationship("Tenant", back_populates="analytics")
+    tenant = relationship("Tenant", back_populates="metrics", lazy="raise_on_sql")
 
     # Constraints and indexes
     __table_args__ = (
-        UniqueConstraint(
-            "tenant_id", "date", "metric_name", name="uq_analytics_tenant_date_metric"
+        Index("idx_metric_tenant_id", "tenant_id"),
+        Index(
+            "idx_metric_date_brin",
+            "date",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
         ),
-        Index("idx_analytics_tenant_id", "tenant_id"),
-        Index("idx_analytics_date", "date"),
-        Index("idx_analytics_metric", "metric_name"),
+        {"postgresql_partition_by": "RANGE (date)"},
     )
 
 
-class ListingAnalytics(Base):
-    """Listing-specific analytics and metrics"""
+def _add_default_partition(table: Table) -> None:
+    """Give a range-partitioned table a catch-all partition.
+
+    PostgreSQL rejects rows that match no partition; monthly partitions are
+    created ahead of time by the database's partition maintenance (see
+    database/init.sql) and rows outside them land in the default one.
+    """
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE TABLE IF NOT EXISTS {table.name}_default "
+            f"PARTITION OF {table.name} DEFAULT"
+        ).execute_if(dialect="postgresql"),
+    )
 
-    __tablename__ = "listing_analytics"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    listing_id = Column(UUID(as_uuid=True), ForeignKey("listings.id"), nullable=False)
+for _partitioned in (AuditLog, Metric):
+    _add_default_partition(_partitioned.__table__)
+
+
+# Daily roll-ups of metrics per entity. Refresh periodically with
+# REFRESH MATERIALIZED VIEW CONCURRENTLY metrics_daily (see database/init.sql).
+_METRICS_DAILY_DDL = (
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS metrics_daily AS
+    SELECT tenant_id, entity_type, entity_id, metric_name,
+           date_trunc('day', date) AS bucket,
+           count(*) AS samples,
+           sum(metric_value) AS sum_value,
+           avg(metric_value) AS avg_value,
+           max(metric_value) AS max_value
+    FROM metrics
+    GROUP BY tenant_id, entity_type, entity_id, metric_name, bucket
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_metrics_daily
+    ON metrics_daily (entity_type, entity_id, metric_name, bucket)
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_metrics_daily_tenant "
+    "ON metrics_daily (tenant_id, bucket)",
+)
+for _statement in _METRICS_DAILY_DDL:
+    event.listen(
+        Metric.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+event.listen(
+    Metric.__table__,
+    "before_drop",
+    DDL("DROP MATERIALIZED VIEW IF EXISTS metrics_daily").execute_if(
+        dialect="postgresql"
+    ),
+)
 
-    # Date and metrics
-    date = Column(DateTime(timezone=True), nullable=False)
-    metric_name = Column(String(100), nullable=False)
-    metric_value = Column(Float, nullable=False)
-    metric_data = Column(JSON, nullable=True)  # Additional metric details
 
-    # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+# Keep listing_review_stats in step with approved reviews. The listing's row
+# is recomputed from idx_review_approved rather than adjusted by deltas, so
+# it cannot drift.
+_REVIEW_STATS_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION listing_review_stats_sync(target UUID)
+    RETURNS VOID AS $$
+    BEGIN
+        INSERT INTO listing_review_stats (listing_id, review_count, avg_rating)
+        SELECT target, count(*), avg(rating)::numeric(3,2)
+        FROM reviews
+        WHERE listing_id = target AND status = 'approved'
+        ON CONFLICT (listing_id) DO UPDATE
+        SET review_count = EXCLUDED.review_count,
+            avg_rating = EXCLUDED.avg_rating;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION listing_review_stats_trigger()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM listing_review_stats_sync(OLD.listing_id);
+        END IF;
+        IF TG_OP = 'INSERT' OR NEW.listing_id <> OLD.listing_id THEN
+            PERFORM listing_review_stats_sync(NEW.listing_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER reviews_listing_stats
+    AFTER INSERT OR DELETE OR UPDATE OF listing_id, rating, status ON reviews
+    FOR EACH ROW EXECUTE FUNCTION listing_review_stats_trigger()
+    """,
+)
+for _statement in _REVIEW_STATS_DDL:
+    event.listen(
+        Review.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
 
-    # Relationships
-    listing = relationship("Listing", back_populates="analytics")
 
-    # Constraints and indexes
-    __table_args__ = (
-        UniqueConstraint(
-            "listing_id",
-            "date",
-            "metric_name",
-            name="uq_listing_analytics_listing_date_metric",
-        ),
-        Index("idx_listing_analytics_listing_id", "listing_id"),
-        Index("idx_listing_analytics_date", "date"),
-        Index("idx_listing_analytics_metric", "metric_name"),
+# Keep tags.usage_count in step with listing_tags. Statement-level triggers
+# apply one aggregated increment per tag, however many rows a statement adds
+# or removes.
+_TAG_USAGE_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION listing_tags_usage_count()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE tags
+        SET usage_count = usage_count
+            + CASE WHEN TG_OP = 'INSERT' THEN delta.n ELSE -delta.n END
+        FROM (SELECT tag_id, count(*) AS n FROM changed GROUP BY tag_id) AS delta
+        WHERE tags.id = delta.tag_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER listing_tags_usage_insert
+    AFTER INSERT ON listing_tags
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION listing_tags_usage_count()
+    """,
+    """
+    CREATE TRIGGER listing_tags_usage_delete
+    AFTER DELETE ON listing_tags
+    REFERENCING OLD TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION listing_tags_usage_count()
+    """,
+)
+for _statement in _TAG_USAGE_DDL:
+    event.listen(
+        listing_tags, "after_create", DDL(_statement).execute_if(dialect="postgresql")
     )
+
+
+# Copy owner_display_name/tenant_subdomain/tenant_plan onto listings: filled
+# when a listing is written, and pushed out when the user or tenant changes.
+_LISTING_DENORM_DDL = (
+    (
+        Listing.__table__,
+        """
+        CREATE OR REPLACE FUNCTION listings_denormalize()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            SELECT nullif(concat_ws(' ', first_name, last_name), '')
+            INTO NEW.owner_display_name
+            FROM users WHERE id = NEW.owner_id;
+            SELECT subdomain, plan
+            INTO NEW.tenant_subdomain, NEW.tenant_plan
+            FROM tenants WHERE id = NEW.tenant_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+    ),
+    (
+        Listing.__table__,
+        """
+        CREATE TRIGGER listings_denormalize
+        BEFORE INSERT OR UPDATE OF owner_id, tenant_id ON listings
+        FOR EACH ROW EXECUTE FUNCTION listings_denormalize()
+        """,
+    ),
+    (
+        User.__table__,
+        """
+        CREATE OR REPLACE FUNCTION users_propagate_display_name()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE listings
+            SET owner_display_name =
+                nullif(concat_ws(' ', NEW.first_name, NEW.last_name), '')
+            WHERE owner_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+    ),
+    (
+        User.__table__,
+        """
+        CREATE TRIGGER users_propagate_display_name
+        AFTER UPDATE OF first_name, last_name ON users
+        FOR EACH ROW
+        WHEN (OLD.first_name IS DISTINCT FROM NEW.first_name
+              OR OLD.last_name IS DISTINCT FROM NEW.last_name)
+        EXECUTE FUNCTION users_propagate_display_name()
+        """,
+    ),
+    (
+        Tenant.__table__,
+        """
+        CREATE OR REPLACE FUNCTION tenants_propagate_listing_fields()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE listings
+            SET tenant_subdomain = NEW.subdomain, tenant_plan = NEW.plan
+            WHERE tenant_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+    ),
+    (
+        Tenant.__table__,
+        """
+        CREATE TRIGGER tenants_propagate_listing_fields
+        AFTER UPDATE OF subdomain, plan ON tenants
+        FOR EACH ROW
+        WHEN (OLD.subdomain IS DISTINCT FROM NEW.subdomain
+              OR OLD.plan IS DISTINCT FROM NEW.plan)
+        EXECUTE FUNCTION tenants_propagate_listing_fields()
+        """,
+    ),
+)
+for _target, _statement in _LISTING_DENORM_DDL:
+    event.listen(
+        _target, "after_create", DDL(_statement).execute_if(dialect="postgresql")
+    )
+
+
+# Raw SQL inserts (seed data, audit trigger) get the same time-ordered ids
+# when database/init.sql has installed app.uuidv7()
+for _table in Base.metadata.tables.values():
+    if "id" in _table.c and _table.c.id.default is not None:
+        event.listen(
+            _table,
+            "after_create",
+            DDL(
+                "DO $$ BEGIN "
+                "IF to_regprocedure('app.uuidv7()') IS NOT NULL THEN "
+                f"ALTER TABLE {_table.name} ALTER COLUMN id SET DEFAULT app.uuidv7(); "
+                "END IF; END $$"
+            ).execute_if(dialect="postgresql"),
+        )
+
+
+# Statements for the per-model hot paths, built once at import. Reusing the
+# same object skips statement construction per request and always hits the
+# engine's compiled cache (see database_query_cache_size).
+_STATEMENTS: Dict[Tuple[Type[Base], str], Executable] = {}
+for _model in (
+    Tenant,
+    User,
+    IndustrySchema,
+    Listing,
+    AuditLog,
+    Category,
+    Tag,
+    Media,
+    Review,
+    APIKey,
+):
+    _STATEMENTS[(_model, "get")] = select(_model).where(_model.id == bindparam("id"))
+    _STATEMENTS[(_model, "ins")] = insert(_model)
+_STATEMENTS[(Metric, "ins")] = insert(Metric)
+# A lookup by id is a detail read: load the deferred groups with the row, since
+# an async session cannot lazy-load them on first access
+_STATEMENTS[(Listing, "get")] = _STATEMENTS[(Listing, "get")].options(
+    undefer_group("detail")
+)
+_STATEMENTS[(AuditLog, "get")] = _STATEMENTS[(AuditLog, "get")].options(
+    undefer_group("payload")
+)
+
+
+def get_stmt(model: Type[Base], op: str) -> Executable:
+    """Return the prebuilt statement for a model.
+
+    ``"get"`` selects one row by ``id`` (pass ``{"id": ...}`` when executing;
+    not built for Metric, which has no id);
+    ``"ins"`` is a plain INSERT for executemany-style parameter lists.
+    """
+    return _STATEMENTS[(model, op)]
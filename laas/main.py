@@ -3,34 +3,42 @@ LAAS Platform - Main FastAPI Application
 Deployment trigger: Updated timestamp for testing
 """
 
+import logging
 import time
-import uuid
 from contextlib import asynccontextmanager
 from typing import Dict
 
+import orjson
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from laas.core.config import get_settings
-from laas.middleware.rate_limit import RateLimitMiddleware
+from laas.core.logging_config import configure_logging, shutdown_logging
+from laas.middleware.audit import audit_writer
+from laas.middleware.request import RequestMiddleware
+from laas.middleware.trusted_host import TrustedHostMiddleware
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
-    print("🚀 Starting LAAS Platform...")
+    configure_logging()
+    logger.info("Starting LAAS Platform")
 
-    print("✅ LAAS Platform started with IAM-based authentication")
+    logger.info("LAAS Platform started with IAM-based authentication")
 
     yield
 
     # Shutdown
-    print("🛑 Shutting down LAAS Platform...")
+    logger.info("Shutting down LAAS Platform")
+    await audit_writer.stop()
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -64,13 +72,14 @@ app = FastAPI(
     redoc_url="/redoc",
     openapi_url="/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Get settings
 settings = get_settings()
 
 # Add middleware
-app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.allowed_hosts)
+app.add_middleware(TrustedHostMiddleware, host_allowed=settings.host_allowed)
 
 app.add_middleware(
     CORSMiddleware,
@@ -80,15 +89,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Custom middleware
-app.add_middleware(RateLimitMiddleware)
+# Request id, timing and rate limiting (outermost, so 429s are tagged too)
+app.add_middleware(RequestMiddleware)
 
 
 # Global exception handlers
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": {
@@ -104,7 +113,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": {
@@ -120,7 +129,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": {
@@ -132,31 +141,6 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
-# Request processing middleware
-@app.middleware("http")
-async def process_request(request: Request, call_next):
-    """Process requests with timing and request ID"""
-    # Generate request ID
-    request_id = str(uuid.uuid4())
-    request.state.request_id = request_id
-
-    # Start timing
-    start_time = time.time()
-
-    # Process request
-    response = await call_next(request)
-
-    # Calculate processing time
-    process_time = time.time() - start_time
-
-    # Add headers
-    response.headers["X-Request-ID"] = request_id
-    response.headers["X-Process-Time"] = str(process_time)
-    response.headers["X-API-Version"] = "1.0.0"
-
-    return response
-
-
 # Health check endpoint
 @app.get("/health", tags=["System"])
 async def health_check():
@@ -209,7 +193,7 @@ def custom_openapi():
     )
 
     # Add security schemes
-    openapi_schema["components"]["securitySchemes"] = {
+    openapi_schema.setdefault("components", {})["securitySchemes"] = {
         "BearerAuth": {
             "type": "http",
             "scheme": "bearer",
@@ -238,6 +222,23 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 
+async def openapi_json(request: Request) -> Response:
+    """Serve the OpenAPI schema, serialized once per process"""
+    openapi_bytes = getattr(app.state, "openapi_bytes", None)
+    if openapi_bytes is None:
+        openapi_bytes = app.state.openapi_bytes = orjson.dumps(app.openapi())
+    return Response(content=openapi_bytes, media_type="application/json")
+
+
+# Replace FastAPI's schema route, which re-serializes the schema on every GET
+app.router.routes = [
+    route
+    for route in app.router.routes
+    if getattr(route, "path", None) != app.openapi_url
+]
+app.add_route(app.openapi_url, openapi_json, include_in_schema=False)
+
+
 if __name__ == "__main__":
     import uvicorn
 
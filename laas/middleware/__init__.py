@@ -3,7 +3,17 @@ Middleware package for LAAS Platform
 """
 
 from .audit import AuditMiddleware
-from .rate_limit import RateLimitMiddleware
-from .tenant import TenantMiddleware
+from .rate_limit import RateLimiter, RateLimitMiddleware
+from .request import RequestMiddleware
+from .tenant import TenantMiddleware, invalidate_tenant_cache
+from .trusted_host import TrustedHostMiddleware
 
-__all__ = ["TenantMiddleware", "RateLimitMiddleware", "AuditMiddleware"]
+__all__ = [
+    "TenantMiddleware",
+    "RateLimitMiddleware",
+    "RateLimiter",
+    "RequestMiddleware",
+    "AuditMiddleware",
+    "TrustedHostMiddleware",
+    "invalidate_tenant_cache",
+]
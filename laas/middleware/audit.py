@@ -2,130 +2,181 @@
 Audit logging middleware
 """
 
-import json
+import asyncio
+import logging
+import re
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from laas.database.connection import get_db
+from laas.core.config import get_settings
+from laas.core.timeutils import utcnow_aware
+from laas.database.bulk import bulk_insert
+from laas.database.connection import get_async_session
 from laas.database.models import AuditLog
 
+logger = logging.getLogger(__name__)
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    """Middleware for audit logging"""
+_SKIP_PATHS = ("/health", "/docs", "/redoc", "/openapi.json", "/favicon.ico")
+# "/api[/v1]/<resource>[/<id>]": the resource type and an optional id segment
+_RESOURCE_PATH = re.compile(r"^/[^/]+/(?:v\d+/)?([^/]+)(?:/([0-9A-Za-z-]+)(?:/|$))?")
 
-    def __init__(self, app):
-        super().__init__(app)
-        self.audit_enabled = True
-
-    async def dispatch(self, request: Request, call_next):
-        """Process request with audit logging"""
-
-        # Skip audit logging for certain paths
-        if self._should_skip_audit(request):
-            return await call_next(request)
 
-        # Extract audit information
-        audit_data = await self._extract_audit_data(request)
-
-        # Process request
-        response = await call_next(request)
+def _as_uuid(value: Any) -> Optional[uuid.UUID]:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
 
-        # Log audit entry
-        if self.audit_enabled and audit_data:
-            await self._log_audit_entry(audit_data, response)
 
-        return response
+class AuditLogWriter:
+    """Buffers audit entries and writes them in batches off the request path.
 
-    def _should_skip_audit(self, request: Request) -> bool:
-        """Check if audit logging should be skipped for this request"""
-        skip_paths = ["/health", "/docs", "/redoc", "/openapi.json", "/favicon.ico"]
+    Requests only enqueue a dict; a background task inserts up to
+    ``audit_batch_size`` rows per statement, waiting at most
+    ``audit_flush_interval`` seconds to fill a batch. When the queue is full
+    new entries are dropped (and counted) rather than slowing requests down.
+    """
 
-        return any(request.url.path.startswith(path) for path in skip_paths)
+    def __init__(self) -> None:
+        self.settings = get_settings()
+        self.batch_size = max(self.settings.audit_batch_size, 1)
+        self.flush_interval = self.settings.audit_flush_interval
+        self.dropped = 0
+        self._queue: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+        self._task: Optional["asyncio.Task[None]"] = None
 
-    async def _extract_audit_data(self, request: Request) -> Optional[Dict[str, Any]]:
-        """Extract audit data from request"""
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """Queue an entry for writing; False if it was dropped"""
+        if self._task is None or self._task.done():
+            self.start()
+        try:
+            self._queue.put_nowait(entry)  # type: ignore[union-attr]
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.settings.audit_queue_size)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Flush queued entries (up to ``timeout`` seconds) and stop the task"""
+        if self._task is None:
+            return
         try:
-            # Get tenant and user information
-            tenant_id = getattr(request.state, "tenant_id", None)
-            user_id = getattr(request.state, "user_id", None)
-
-            # Get request information
-            method = request.method
-            path = request.url.path
-            query_params = dict(request.query_params)
-
-            # Get client information
-            client_ip = request.client.host if request.client else None
-            user_agent = request.headers.get("user-agent")
-
-            # Get request body (for POST/PUT requests)
-            request_body = None
-            if method in ["POST", "PUT", "PATCH"]:
+            await asyncio.wait_for(self._queue.join(), timeout)  # type: ignore[union-attr]
+        except asyncio.TimeoutError:
+            logger.warning("Audit writer stopped with entries still queued")
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        queue = self._queue
+        assert queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            rows = [await queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(rows) < self.batch_size:
+                if not queue.empty():
+                    rows.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
                 try:
-                    body = await request.body()
-                    if body:
-                        request_body = json.loads(body.decode())
-                except:
-                    pass
-
-            return {
-                "tenant_id": tenant_id,
-                "user_id": user_id,
-                "action": f"{method} {path}",
-                "resource_type": self._get_resource_type(path),
-                "resource_id": self._extract_resource_id(path),
-                "ip_address": client_ip,
-                "user_agent": user_agent,
-                "request_id": getattr(request.state, "request_id", None),
-                "query_params": query_params,
-                "request_body": request_body,
-            }
+                    rows.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(rows)
 
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            async with get_async_session() as session:
+                await bulk_insert(session, AuditLog, rows)
+                await session.commit()
         except Exception as e:
-            print(f"Error extracting audit data: {e}")
-            return None
+            logger.warning("Failed to write %d audit entries: %s", len(rows), e)
+        finally:
+            for _ in rows:
+                self._queue.task_done()  # type: ignore[union-attr]
 
-    def _get_resource_type(self, path: str) -> str:
-        """Extract resource type from path"""
-        path_parts = path.strip("/").split("/")
-        if len(path_parts) >= 2:
-            return path_parts[1]  # e.g., "listings", "users", etc.
-        return "unknown"
-
-    def _extract_resource_id(self, path: str) -> Optional[str]:
-        """Extract resource ID from path"""
-        path_parts = path.strip("/").split("/")
-        if len(path_parts) >= 3 and path_parts[2].replace("-", "").isalnum():
-            return path_parts[2]
-        return None
 
-    async def _log_audit_entry(self, audit_data: Dict[str, Any], response: Response):
-        """Log audit entry to database"""
-        try:
-            db = next(get_db())
-
-            audit_log = AuditLog(
-                tenant_id=audit_data.get("tenant_id"),
-                user_id=audit_data.get("user_id"),
-                action=audit_data.get("action"),
-                resource_type=audit_data.get("resource_type"),
-                resource_id=audit_data.get("resource_id"),
-                ip_address=audit_data.get("ip_address"),
-                user_agent=audit_data.get("user_agent"),
-                request_id=audit_data.get("request_id"),
-                old_values=None,  # Would be populated for update operations
-                new_values=audit_data.get("request_body"),
-            )
-
-            db.add(audit_log)
-            db.commit()
+# Global audit writer instance
+audit_writer = AuditLogWriter()
 
-        except Exception as e:
-            print(f"Error logging audit entry: {e}")
+
+def record_audit(request: Request, payload: BaseModel, **dump_options: Any) -> None:
+    """Attach a validated request model as the audit entry's ``new_values``.
+
+    ``dump_options`` go to ``model_dump``, e.g. ``exclude={"password"}``.
+    """
+    request.state.audit_payload = payload.model_dump(mode="json", **dump_options)
+
+
+class AuditMiddleware:
+    """Record an audit entry for each API request.
+
+    The request body is never read here; handlers that want their input
+    audited pass the validated model to ``record_audit``. Entries are handed
+    to ``audit_writer`` rather than written inline.
+    """
+
+    def __init__(self, app: ASGIApp, writer: Optional[AuditLogWriter] = None):
+        self.app = app
+        self.writer = writer or audit_writer
+        self.audit_enabled = True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.audit_enabled
+            or self._should_skip_audit(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
         finally:
-            if "db" in locals():
-                db.close()
+            entry = self._build_entry(Request(scope))
+            if entry is not None:
+                self.writer.submit(entry)
+
+    def _should_skip_audit(self, path: str) -> bool:
+        """Check if audit logging should be skipped for this path"""
+        return path.startswith(_SKIP_PATHS)
+
+    def _build_entry(self, request: Request) -> Optional[Dict[str, Any]]:
+        """Build the audit row; None when the request has no tenant"""
+        # Read after the app ran, so tenant/user set downstream are included
+        tenant_id = _as_uuid(getattr(request.state, "tenant_id", None))
+        if tenant_id is None:
+            return None
+
+        path = request.url.path
+        match = _RESOURCE_PATH.match(path)
+        resource_type, resource_id = match.groups() if match else ("unknown", None)
+        return {
+            "tenant_id": tenant_id,
+            "user_id": _as_uuid(getattr(request.state, "user_id", None)),
+            "action": f"{request.method} {path}"[:100],
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "ip_address": request.client.host if request.client else None,
+            "user_agent": request.headers.get("user-agent"),
+            "request_id": getattr(request.state, "request_id", None),
+            "old_values": None,  # Would be populated for update operations
+            "new_values": getattr(request.state, "audit_payload", None),
+            "created_at": utcnow_aware(),
+        }
@@ -2,138 +2,173 @@
 Rate limiting middleware
 """
 
+import logging
+import math
 import time
-from typing import Dict, Optional
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
 
-from fastapi import HTTPException, Request, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from laas.core.config import get_settings
+from laas.core.redis_client import get_redis
 
+logger = logging.getLogger(__name__)
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware with Redis backend"""
+_SKIP_PATHS = ("/health", "/docs", "/redoc", "/openapi.json")
 
-    def __init__(self, app):
-        super().__init__(app)
+
+class RateLimiter:
+    """Fixed-window rate limiting shared across workers through Redis.
+
+    Each client gets one counter per window, ``rl:{client_id}:{window}``,
+    bumped with INCR and expired with the window; a request costs one
+    pipelined round trip. If Redis is unreachable requests are let through.
+
+    With ``rate_limit_backend = "memory"`` limits are kept per process instead,
+    as a sliding window of request timestamps per client.
+    """
+
+    def __init__(self):
         self.settings = get_settings()
         self.rate_limit_requests = self.settings.rate_limit_requests
-        self.rate_limit_window = self.settings.rate_limit_window
-
-        # In-memory rate limiting (for development)
-        # In production, this should use Redis
-        self.rate_limit_store: Dict[str, Dict[str, int]] = {}
-
-    async def dispatch(self, request: Request, call_next):
-        """Process request with rate limiting"""
-
-        # Skip rate limiting for certain paths
-        if self._should_skip_rate_limiting(request):
-            return await call_next(request)
-
-        # Get client identifier
-        client_id = self._get_client_identifier(request)
-
-        # Check rate limit
-        if not self._check_rate_limit(client_id):
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail={
-                    "error": {
-                        "type": "rate_limit_exceeded",
-                        "message": f"Rate limit exceeded. Maximum {self.rate_limit_requests} requests per {self.rate_limit_window} seconds",
-                        "retry_after": self.rate_limit_window,
-                    }
-                },
-                headers={
-                    "Retry-After": str(self.rate_limit_window),
-                    "X-RateLimit-Limit": str(self.rate_limit_requests),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int(time.time()) + self.rate_limit_window),
-                },
-            )
-
-        # Process request
-        response = await call_next(request)
-
-        # Add rate limit headers
-        remaining = self._get_remaining_requests(client_id)
-        reset_time = int(time.time()) + self.rate_limit_window
-
-        response.headers["X-RateLimit-Limit"] = str(self.rate_limit_requests)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(reset_time)
-
-        return response
-
-    def _should_skip_rate_limiting(self, request: Request) -> bool:
-        """Check if rate limiting should be skipped for this request"""
-        skip_paths = ["/health", "/docs", "/redoc", "/openapi.json"]
-
-        return any(request.url.path.startswith(path) for path in skip_paths)
-
-    def _get_client_identifier(self, request: Request) -> str:
+        self.rate_limit_window = max(self.settings.rate_limit_window, 1)
+        self.use_redis = self.settings.rate_limit_backend != "memory"
+        self.rate_limit_store: Dict[str, Deque[float]] = defaultdict(deque)
+        self._next_sweep = 0.0
+
+    def should_skip(self, path: str) -> bool:
+        """Check if rate limiting should be skipped for this path"""
+        return path.startswith(_SKIP_PATHS)
+
+    def get_client_identifier(self, scope: Scope) -> str:
         """Get unique client identifier for rate limiting"""
         # Try to get tenant ID first
-        tenant_id = getattr(request.state, "tenant_id", None)
+        tenant_id = scope.get("state", {}).get("tenant_id")
         if tenant_id:
             return f"tenant:{tenant_id}"
 
         # Fall back to IP address
-        forwarded_for = request.headers.get("X-Forwarded-For")
+        forwarded_for = Headers(scope=scope).get("x-forwarded-for")
         if forwarded_for:
             # Take the first IP in the chain
             client_ip = forwarded_for.split(",")[0].strip()
         else:
-            client_ip = request.client.host if request.client else "unknown"
+            client = scope.get("client")
+            client_ip = client[0] if client else "unknown"
 
         return f"ip:{client_ip}"
 
-    def _check_rate_limit(self, client_id: str) -> bool:
-        """Check if client has exceeded rate limit"""
-        current_time = int(time.time())
-        window_start = current_time - self.rate_limit_window
-
-        # Clean up old entries
-        if client_id in self.rate_limit_store:
-            self.rate_limit_store[client_id] = {
-                timestamp: count
-                for timestamp, count in self.rate_limit_store[client_id].items()
-                if int(timestamp) > window_start
-            }
-        else:
-            self.rate_limit_store[client_id] = {}
-
-        # Count requests in current window
-        current_requests = sum(self.rate_limit_store[client_id].values())
-
-        # Check if limit exceeded
-        if current_requests >= self.rate_limit_requests:
-            return False
-
-        # Increment request count
-        timestamp_str = str(current_time)
-        if timestamp_str in self.rate_limit_store[client_id]:
-            self.rate_limit_store[client_id][timestamp_str] += 1
-        else:
-            self.rate_limit_store[client_id][timestamp_str] = 1
-
-        return True
-
-    def _get_remaining_requests(self, client_id: str) -> int:
-        """Get remaining requests for client"""
-        current_time = int(time.time())
-        window_start = current_time - self.rate_limit_window
-
-        if client_id not in self.rate_limit_store:
-            return self.rate_limit_requests
-
-        # Count requests in current window
-        current_requests = sum(
-            count
-            for timestamp, count in self.rate_limit_store[client_id].items()
-            if int(timestamp) > window_start
+    def headers(self, remaining: int, reset_time: int) -> Dict[str, str]:
+        """X-RateLimit-* headers for an allowed request"""
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit_requests),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset_time),
+        }
+
+    def exceeded_response(self, reset_time: int) -> Response:
+        """429 response for a client that is over its limit"""
+        retry_after = max(reset_time - int(time.time()), 1)
+        return ORJSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={
+                "error": {
+                    "type": "rate_limit_exceeded",
+                    "message": f"Rate limit exceeded. Maximum {self.rate_limit_requests} requests per {self.rate_limit_window} seconds",
+                    "retry_after": retry_after,
+                }
+            },
+            headers={
+                "Retry-After": str(retry_after),
+                **self.headers(0, reset_time),
+            },
         )
 
-        return max(0, self.rate_limit_requests - current_requests)
+    async def check(self, client_id: str) -> Tuple[bool, int, int]:
+        """Count the request; returns (allowed, remaining, reset timestamp)"""
+        if not self.use_redis:
+            return self._check_local_rate_limit(client_id)
+
+        window = int(time.time()) // self.rate_limit_window
+        reset_time = (window + 1) * self.rate_limit_window
+
+        count = await self._increment(f"rl:{client_id}:{window}")
+        if count is None:
+            return True, self.rate_limit_requests, reset_time
+
+        remaining = max(0, self.rate_limit_requests - count)
+        return count <= self.rate_limit_requests, remaining, reset_time
+
+    async def _increment(self, key: str) -> Optional[int]:
+        """INCR the window counter, setting its TTL on first use"""
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.incr(key)
+            pipe.expire(key, self.rate_limit_window, nx=True)
+            count, _ = await pipe.execute()
+        except Exception as e:
+            logger.warning("Rate limit check failed: %s", e)
+            return None
+        return int(count)
+
+    def _check_local_rate_limit(self, client_id: str) -> Tuple[bool, int, int]:
+        """Sliding-window check against this process's request log"""
+        now = time.time()
+        window_start = now - self.rate_limit_window
+        if now >= self._next_sweep:
+            self._evict_idle_clients(window_start)
+            self._next_sweep = now + self.rate_limit_window
+
+        timestamps = self.rate_limit_store[client_id]
+        while timestamps and timestamps[0] <= window_start:
+            timestamps.popleft()
+
+        allowed = len(timestamps) < self.rate_limit_requests
+        if allowed:
+            timestamps.append(now)
+        oldest = timestamps[0] if timestamps else now
+        reset_time = math.ceil(oldest + self.rate_limit_window)
+        return allowed, self.rate_limit_requests - len(timestamps), reset_time
+
+    def _evict_idle_clients(self, window_start: float) -> None:
+        """Drop clients with no requests inside the current window"""
+        idle = [
+            client_id
+            for client_id, timestamps in self.rate_limit_store.items()
+            if not timestamps or timestamps[-1] <= window_start
+        ]
+        for client_id in idle:
+            del self.rate_limit_store[client_id]
+
+
+class RateLimitMiddleware:
+    """Apply a ``RateLimiter`` to HTTP requests (pure ASGI)"""
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or RateLimiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.limiter.should_skip(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        client_id = self.limiter.get_client_identifier(scope)
+        allowed, remaining, reset_time = await self.limiter.check(client_id)
+        if not allowed:
+            await self.limiter.exceeded_response(reset_time)(scope, receive, send)
+            return
+
+        headers = self.limiter.headers(remaining, reset_time)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,60 @@
+"""
+Per-request middleware: request id, timing and rate limiting in one pass
+"""
+
+import secrets
+import time
+from typing import Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from laas.middleware.rate_limit import RateLimiter
+
+API_VERSION = "1.0.0"
+
+
+class RequestMiddleware:
+    """Tag, time and rate-limit every HTTP request (pure ASGI).
+
+    Replaces a ``BaseHTTPMiddleware`` per concern: the rate limit check runs
+    before the app, and all response headers are added in a single wrapper
+    around ``send`` when the response starts.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or RateLimiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.monotonic_ns()
+        request_id = secrets.token_hex(16)
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        headers: Dict[str, str] = {
+            "X-Request-ID": request_id,
+            "X-API-Version": API_VERSION,
+        }
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.monotonic_ns() - start_ns) / 1_000_000
+                response_headers = MutableHeaders(scope=message)
+                response_headers.update(headers)
+                response_headers["X-Process-Time"] = f"{elapsed_ms:.3f}ms"
+            await send(message)
+
+        if not self.limiter.should_skip(scope["path"]):
+            client_id = self.limiter.get_client_identifier(scope)
+            allowed, remaining, reset_time = await self.limiter.check(client_id)
+            if not allowed:
+                response = self.limiter.exceeded_response(reset_time)
+                await response(scope, receive, send_with_headers)
+                return
+            headers.update(self.limiter.headers(remaining, reset_time))
+
+        await self.app(scope, receive, send_with_headers)
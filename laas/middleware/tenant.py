@@ -2,131 +2,204 @@
 Multi-tenant middleware for request routing and tenant isolation
 """
 
-import re
-from typing import Optional
-
-from fastapi import HTTPException, Request, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-
-from laas.database.connection import get_db
+import logging
+import threading
+import uuid
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from cachetools import TTLCache
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import bindparam, or_, select
+from starlette.datastructures import Headers, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from laas.core.config import get_settings
+from laas.database.connection import get_async_session
 from laas.database.models import Tenant
 
-
-class TenantMiddleware(BaseHTTPMiddleware):
-    """Middleware for multi-tenant request routing"""
-
-    def __init__(self, app, tenant_header: str = "X-Tenant-ID"):
-        super().__init__(app)
+logger = logging.getLogger(__name__)
+
+_SKIP_PATHS = ("/health", "/docs", "/redoc", "/openapi.json", "/favicon.ico")
+
+# Common subdomains that never name a tenant
+_SKIP_SUBDOMAINS = frozenset({"www", "api", "admin", "app"})
+
+_settings = get_settings()
+
+# Built once; match by ID or subdomain in a single query
+_ACTIVE_TENANT = (
+    select(Tenant)
+    .where(
+        or_(
+            Tenant.id == bindparam("tenant_uuid"),
+            Tenant.subdomain == bindparam("subdomain"),
+        ),
+        Tenant.status == "active",
+    )
+    .limit(1)
+)
+
+# Active tenant snapshots keyed by the identifier the request used (id or
+# subdomain); disabled when size is 0
+_tenant_cache: Optional[TTLCache[str, SimpleNamespace]] = (
+    TTLCache(maxsize=_settings.tenant_cache_size, ttl=_settings.tenant_cache_ttl)
+    if _settings.tenant_cache_size > 0 and _settings.tenant_cache_ttl > 0
+    else None
+)
+_tenant_cache_lock = threading.Lock()
+
+
+def _tenant_snapshot(tenant: Tenant) -> SimpleNamespace:
+    """Detached copy of the fields the request needs"""
+    return SimpleNamespace(
+        id=tenant.id,
+        name=tenant.name,
+        industry=tenant.industry,
+        plan=tenant.plan,
+        status=tenant.status,
+        # Encoded once per cache entry and appended to every response
+        response_headers=(
+            (b"x-tenant-id", str(tenant.id).encode("latin-1")),
+            (b"x-tenant-name", tenant.name.encode("latin-1", errors="replace")),
+        ),
+    )
+
+
+def invalidate_tenant_cache(tenant_id: Any) -> None:
+    """Drop cached snapshots of a tenant after it is updated or suspended"""
+    if _tenant_cache is None:
+        return
+    tenant_id = str(tenant_id)
+    with _tenant_cache_lock:
+        for key, snapshot in list(_tenant_cache.items()):
+            if str(snapshot.id) == tenant_id:
+                _tenant_cache.pop(key, None)
+
+
+class TenantMiddleware:
+    """Resolve the tenant of every HTTP request (pure ASGI).
+
+    Runs without ``BaseHTTPMiddleware``'s task group and memory streams; the
+    tenant headers are added by wrapping ``send``.
+    """
+
+    def __init__(self, app: ASGIApp, tenant_header: str = "X-Tenant-ID"):
+        self.app = app
         self.tenant_header = tenant_header
-        self.subdomain_pattern = re.compile(r"^([^.]+)\.(.+)$")
-
-    async def dispatch(self, request: Request, call_next):
-        """Process request and extract tenant information"""
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip tenant resolution for certain paths
-        if self._should_skip_tenant_resolution(request):
-            return await call_next(request)
+        if scope["type"] != "http" or self._should_skip_tenant_resolution(scope):
+            await self.app(scope, receive, send)
+            return
 
         # Extract tenant ID from request
-        tenant_id = await self._extract_tenant_id(request)
+        tenant_id = self._extract_tenant_id(scope)
 
         if not tenant_id:
-            raise HTTPException(
+            response = ORJSONResponse(
+                {"detail": "Tenant identification required"},
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Tenant identification required",
             )
+            await response(scope, receive, send)
+            return
 
         # Validate tenant exists and is active
         tenant = await self._validate_tenant(tenant_id)
 
         if not tenant:
-            raise HTTPException(
+            response = ORJSONResponse(
+                {"detail": "Tenant not found or inactive"},
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Tenant not found or inactive",
             )
+            await response(scope, receive, send)
+            return
 
         # Set tenant context
-        request.state.tenant_id = str(tenant.id)
-        request.state.tenant = tenant
+        state = scope.setdefault("state", {})
+        state["tenant_id"] = str(tenant.id)
+        state["tenant"] = tenant
 
         # Set database context for tenant isolation
-        request.state.tenant_context = {
+        state["tenant_context"] = {
             "tenant_id": str(tenant.id),
             "tenant_name": tenant.name,
             "tenant_industry": tenant.industry,
             "tenant_plan": tenant.plan,
         }
 
-        # Process request
-        response = await call_next(request)
-
-        # Add tenant information to response headers
-        response.headers["X-Tenant-ID"] = str(tenant.id)
-        response.headers["X-Tenant-Name"] = tenant.name
+        async def send_with_tenant(message: Message) -> None:
+            # Add tenant information to response headers, unless the app
+            # (or a cached upstream response) already set them
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", ())
+                if not any(name == b"x-tenant-id" for name, _ in headers):
+                    message["headers"] = [*headers, *tenant.response_headers]
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_tenant)
 
-    def _should_skip_tenant_resolution(self, request: Request) -> bool:
+    def _should_skip_tenant_resolution(self, scope: Scope) -> bool:
         """Check if tenant resolution should be skipped for this request"""
-        skip_paths = ["/health", "/docs", "/redoc", "/openapi.json", "/favicon.ico"]
-
-        return any(request.url.path.startswith(path) for path in skip_paths)
+        return scope["path"].startswith(_SKIP_PATHS)
 
-    async def _extract_tenant_id(self, request: Request) -> Optional[str]:
+    def _extract_tenant_id(self, scope: Scope) -> Optional[str]:
         """Extract tenant ID from request"""
+        headers = Headers(scope=scope)
 
         # Method 1: Check custom header
-        tenant_id = request.headers.get(self.tenant_header)
+        tenant_id = headers.get(self.tenant_header)
         if tenant_id:
             return tenant_id
 
         # Method 2: Extract from subdomain
-        host = request.headers.get("host", "")
-        if host:
-            match = self.subdomain_pattern.match(host)
-            if match:
-                subdomain = match.group(1)
-                # Skip common subdomains
-                if subdomain not in ["www", "api", "admin", "app"]:
-                    return subdomain
+        subdomain, _, domain = headers.get("host", "").partition(".")
+        if subdomain and domain and subdomain not in _SKIP_SUBDOMAINS:
+            return subdomain
 
         # Method 3: Extract from query parameter (for development)
-        tenant_id = request.query_params.get("tenant_id")
+        tenant_id = QueryParams(scope.get("query_string", b"")).get("tenant_id")
         if tenant_id:
             return tenant_id
 
         return None
 
-    async def _validate_tenant(self, tenant_identifier: str) -> Optional[Tenant]:
+    async def _validate_tenant(
+        self, tenant_identifier: str
+    ) -> Optional[SimpleNamespace]:
         """Validate tenant exists and is active"""
-        try:
-            # Get database session
-            db = next(get_db())
+        if _tenant_cache is not None:
+            with _tenant_cache_lock:
+                snapshot = _tenant_cache.get(tenant_identifier)
+            if snapshot is not None:
+                return snapshot
 
-            # Try to find tenant by ID first
-            tenant = db.query(Tenant).filter(Tenant.id == tenant_identifier).first()
+        # Only UUIDs can be IDs; NULL never matches the id column
+        try:
+            tenant_uuid: Optional[uuid.UUID] = uuid.UUID(tenant_identifier)
+        except ValueError:
+            tenant_uuid = None
 
-            # If not found by ID, try by subdomain
-            if not tenant:
+        try:
+            async with get_async_session() as db:
                 tenant = (
-                    db.query(Tenant)
-                    .filter(
-                        Tenant.subdomain == tenant_identifier, Tenant.status == "active"
+                    await db.scalars(
+                        _ACTIVE_TENANT,
+                        {"tenant_uuid": tenant_uuid, "subdomain": tenant_identifier},
                     )
-                    .first()
-                )
-
-            # Check if tenant is active
-            if tenant and tenant.status != "active":
-                return None
-
-            return tenant
+                ).first()
+                if tenant is None:
+                    return None
+                snapshot = _tenant_snapshot(tenant)
 
         except Exception as e:
             # Log error but don't expose details
-            print(f"Error validating tenant {tenant_identifier}: {e}")
+            logger.warning("Error validating tenant %s: %s", tenant_identifier, e)
             return None
-        finally:
-            if "db" in locals():
-                db.close()
+
+        if _tenant_cache is not None:
+            with _tenant_cache_lock:
+                _tenant_cache[tenant_identifier] = snapshot
+        return snapshot
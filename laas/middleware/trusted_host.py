@@ -0,0 +1,35 @@
+"""
+Trusted host middleware backed by a precompiled host matcher
+"""
+
+from typing import Callable
+
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class TrustedHostMiddleware:
+    """Reject requests whose Host header is not allowed.
+
+    Unlike Starlette's version, which loops over the configured patterns on
+    every request, hosts are checked with a single precompiled regex (see
+    Settings.host_allowed).
+    """
+
+    def __init__(self, app: ASGIApp, host_allowed: Callable[[str], bool]) -> None:
+        self.app = app
+        self.host_allowed = host_allowed
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        host = Headers(scope=scope).get("host", "").split(":")[0]
+        if self.host_allowed(host):
+            await self.app(scope, receive, send)
+            return
+
+        response = PlainTextResponse("Invalid host header", status_code=400)
+        await response(scope, receive, send)
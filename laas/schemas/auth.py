@@ -2,18 +2,43 @@
 Authentication schemas
 """
 
+import re
 from datetime import datetime
-from typing import Optional
-
-from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
+from typing import Annotated, Any, Optional
+from uuid import UUID
+
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    StringConstraints,
+    field_validator,
+)
 
 from laas.auth.rbac import UserRole
 
+# Length is checked by pydantic-core; strength rules live in PasswordManager
+NewPassword = Annotated[str, StringConstraints(min_length=8)]
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _check_email(value: str) -> str:
+    if not _EMAIL_RE.match(value):
+        raise ValueError("value is not a valid email address")
+    return value
+
+
+# Shape check only, for lookups and responses; registration keeps EmailStr's
+# full RFC and IDNA validation since that is where addresses are stored
+Email = Annotated[str, AfterValidator(_check_email)]
+
 
 class UserBase(BaseModel):
     """Base user schema"""
 
-    email: EmailStr
+    email: Email
     first_name: Optional[str] = None
     last_name: Optional[str] = None
 
@@ -21,22 +46,21 @@ class UserBase(BaseModel):
 class UserRegister(UserBase):
     """User registration schema"""
 
-    password: str
-    tenant_id: str
+    email: EmailStr
+    password: NewPassword
+    tenant_id: UUID
     role: Optional[UserRole] = UserRole.USER
 
-    @field_validator("password")
+    @field_validator("email")
     @classmethod
-    def validate_password(cls, v: str) -> str:
-        if len(v) < 8:
-            raise ValueError("Password must be at least 8 characters long")
-        return v
+    def normalize_email(cls, v: str) -> str:
+        return v.lower()
 
 
 class UserLogin(BaseModel):
     """User login schema"""
 
-    email: EmailStr
+    email: Email
     password: str
 
 
@@ -54,6 +78,11 @@ class UserResponse(UserBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("id", "tenant_id", mode="before")
+    @classmethod
+    def stringify_uuid(cls, v: Any) -> Any:
+        return str(v) if isinstance(v, UUID) else v
+
 
 class TokenResponse(BaseModel):
     """Token response schema"""
@@ -66,18 +95,11 @@ class TokenResponse(BaseModel):
 class PasswordReset(BaseModel):
     """Password reset request schema"""
 
-    email: EmailStr
+    email: Email
 
 
 class PasswordResetConfirm(BaseModel):
     """Password reset confirmation schema"""
 
     token: str
-    new_password: str
-
-    @field_validator("new_password")
-    @classmethod
-    def validate_password(cls, v: str) -> str:
-        if len(v) < 8:
-            raise ValueError("Password must be at least 8 characters long")
-        return v
+    new_password: NewPassword
@@ -2,28 +2,123 @@
 Advanced search engine with full-text search, geospatial, and faceted search
 """
 
-from typing import Any, Dict, List, Optional
+import base64
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from sqlalchemy import and_, asc, desc, func, or_, text
-from sqlalchemy.dialects.postgresql import TSVECTOR
-from sqlalchemy.orm import Session, joinedload
+import orjson
+from cachetools import TTLCache
+from geoalchemy2 import Geography
+from sqlalchemy import (
+    Numeric,
+    Select,
+    String,
+    and_,
+    asc,
+    bindparam,
+    cast,
+    desc,
+    event,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    union,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    Session,
+    joinedload,
+    raiseload,
+    selectinload,
+    undefer_group,
+)
 
+from laas.core.config import get_settings
 from laas.database.models import (
+    LISTING_GENERATED_DATA_FIELDS,
+    LISTING_NUMERIC_DATA_FIELDS,
     Category,
     Listing,
+    ListingReviewStats,
     ListingStatus,
     Media,
-    Review,
-    ReviewStatus,
     Tag,
+    listing_categories,
+    listing_tags,
+    slug_key,
+)
+
+METERS_PER_MILE = 1609.344
+
+_settings = get_settings()
+
+# Autocomplete results keyed by (tenant_id, lowercased query, limit); typeahead
+# sends the same few prefixes over and over. Disabled when size is 0.
+_suggestion_cache: Optional[TTLCache[Tuple[str, str, int], List[str]]] = (
+    TTLCache(
+        maxsize=_settings.suggestion_cache_size, ttl=_settings.suggestion_cache_ttl
+    )
+    if _settings.suggestion_cache_size > 0 and _settings.suggestion_cache_ttl > 0
+    else None
+)
+_suggestion_cache_lock = threading.Lock()
+
+
+def invalidate_suggestions(tenant_id: Any) -> None:
+    """Drop a tenant's cached suggestions after listing or category writes"""
+    if _suggestion_cache is None:
+        return
+    tenant_id = str(tenant_id)
+    with _suggestion_cache_lock:
+        for key in [key for key in _suggestion_cache if key[0] == tenant_id]:
+            _suggestion_cache.pop(key, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_suggestion_tenants(session: Session, flush_context: Any) -> None:
+    """Note tenants whose listing titles or category names were written"""
+    tenants = {
+        str(obj.tenant_id)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, (Listing, Category))
+    }
+    if tenants:
+        session.info.setdefault("suggestion_tenants", set()).update(tenants)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_suggestions(session: Session) -> None:
+    # Only this worker's cache; other workers catch up within the TTL
+    for tenant_id in session.info.pop("suggestion_tenants", ()):
+        invalidate_suggestions(tenant_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_suggestion_tenants(session: Session) -> None:
+    session.info.pop("suggestion_tenants", None)
+
+
+# A tenant's public, published listings; every query starts from this prebuilt
+# statement and is executed with {"tenant_id": ...}
+_PUBLISHED_LISTINGS = select(Listing).where(
+    Listing.tenant_id == bindparam("tenant_id"),
+    Listing.is_public == True,
+    Listing.status == ListingStatus.PUBLISHED,
 )
 
 
 class SearchEngine:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def search(
+    async def search(
         self,
         tenant_id: str,
         query: Optional[str] = None,
@@ -38,63 +133,190 @@ class SearchEngine:
         offset: int = 0,
         include_media: bool = True,
         include_reviews: bool = False,
+        include_total: bool = True,
     ) -> Dict[str, Any]:
         """
         Advanced search with multiple filter options
+
+        With ``include_total=False`` the matching rows are not counted:
+        ``total`` is None and ``has_more`` comes from peeking one row ahead.
         """
-        # Base query with relationships
-        q = self.db.query(Listing).filter(
-            Listing.tenant_id == tenant_id,
-            Listing.is_public == True,
-            Listing.status == ListingStatus.PUBLISHED,
+        q, filtered = self._build_query(
+            query, filters, categories, tags, location, price_range, sort_by, sort_order
         )
+        params = {"tenant_id": tenant_id}
+        loaders = self._loaders(include_media, include_reviews)
 
-        # Add relationships for eager loading
-        if include_media:
-            q = q.options(joinedload(Listing.media))
-        if include_reviews:
-            q = q.options(joinedload(Listing.reviews))
+        if not include_total:
+            items = list(
+                await self.db.scalars(
+                    q.options(*loaders, raiseload("*")).offset(offset).limit(limit + 1),
+                    params,
+                )
+            )
+            return {
+                "results": items[:limit],
+                "total": None,
+                "limit": limit,
+                "offset": offset,
+                "has_more": len(items) > limit,
+            }
+
+        # Fetch the page with the total from COUNT(*) OVER () in one query
+        rows = (
+            await self.db.execute(
+                q.add_columns(func.count().over().label("total_count"))
+                .options(*loaders, raiseload("*"))
+                .offset(offset)
+                .limit(limit),
+                params,
+            )
+        ).all()
+        items = [row[0] for row in rows]
+
+        if rows:
+            total = rows[0].total_count
+        elif offset == 0:
+            total = 0
+        else:
+            # Past the last page: no row carries the total
+            total = await self.db.scalar(
+                filtered.with_only_columns(func.count()).order_by(None), params
+            )
+
+        return {
+            "results": items,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "has_more": (offset + limit) < total,
+        }
+
+    async def search_after(
+        self,
+        tenant_id: str,
+        query: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        categories: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+        location: Optional[Dict[str, Any]] = None,
+        price_range: Optional[Dict[str, float]] = None,
+        sort_order: str = "desc",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        include_media: bool = True,
+        include_reviews: bool = False,
+    ) -> Dict[str, Any]:
+        """Page through listings by creation time with an opaque cursor.
+
+        Keyset pagination on ``(created_at, id)``: each page seeks past the
+        last row of the previous one, so deep pages cost the same as the
+        first and listings added between requests never shift a page. Pass
+        the returned ``next_cursor`` to fetch the following page.
+        """
+        _, q = self._build_query(
+            query,
+            filters,
+            categories,
+            tags,
+            location,
+            price_range,
+            "created_at",
+            sort_order,
+        )
+        key = tuple_(Listing.created_at, Listing.id)
+        if cursor:
+            created_at, listing_id = self._decode_cursor(cursor)
+            last = tuple_(
+                literal(created_at, Listing.created_at.type),
+                literal(listing_id, Listing.id.type),
+            )
+            q = q.where(key < last if sort_order == "desc" else key > last)
+        if sort_order == "desc":
+            q = q.order_by(Listing.created_at.desc(), Listing.id.desc())
+        else:
+            q = q.order_by(Listing.created_at.asc(), Listing.id.asc())
+
+        # One extra row tells whether another page exists, without a COUNT
+        loaders = self._loaders(include_media, include_reviews)
+        items = list(
+            await self.db.scalars(
+                q.options(*loaders, raiseload("*")).limit(limit + 1),
+                {"tenant_id": tenant_id},
+            )
+        )
+        has_more = len(items) > limit
+        items = items[:limit]
+
+        return {
+            "results": items,
+            "limit": limit,
+            "next_cursor": self._encode_cursor(items[-1]) if has_more else None,
+            "has_more": has_more,
+        }
+
+    async def stream(
+        self,
+        tenant_id: str,
+        query: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        categories: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+        location: Optional[Dict[str, Any]] = None,
+        price_range: Optional[Dict[str, float]] = None,
+        sort_by: str = "created_at",
+        sort_order: str = "desc",
+        include_media: bool = True,
+        include_reviews: bool = False,
+        batch_size: int = 100,
+    ) -> AsyncIterator[Listing]:
+        """Yield every matching listing, fetched ``batch_size`` rows at a time.
+
+        For exports and streamed responses: only one batch (and its eagerly
+        loaded relationships) is held in memory at once.
+        """
+        q, _ = self._build_query(
+            query, filters, categories, tags, location, price_range, sort_by, sort_order
+        )
+        loaders = self._loaders(include_media, include_reviews)
+        result = await self.db.stream_scalars(
+            q.options(*loaders, raiseload("*")).execution_options(yield_per=batch_size),
+            {"tenant_id": tenant_id},
+        )
+        async for listing in result:
+            yield listing
+
+    def _build_query(
+        self,
+        query: Optional[str],
+        filters: Optional[Dict[str, Any]],
+        categories: Optional[List[str]],
+        tags: Optional[List[str]],
+        location: Optional[Dict[str, Any]],
+        price_range: Optional[Dict[str, float]],
+        sort_by: str,
+        sort_order: str,
+    ) -> Tuple[Select, Select]:
+        """Sorted search statement, plus the unsorted one for counting"""
+        # Base query
+        q = _PUBLISHED_LISTINGS
 
         # Full-text search
         if query:
-            # Check if we're using PostgreSQL and can use full-text search
-            if (
-                hasattr(self.db.bind.dialect, "name")
-                and self.db.bind.dialect.name == "postgresql"
-            ):
-                try:
-                    # Try PostgreSQL full-text search first
-                    q = q.filter(Listing.search_vector.match(query))
-                except Exception:
-                    # Fallback to ILIKE search
-                    q = q.filter(
-                        or_(
-                            Listing.title.ilike(f"%{query}%"),
-                            Listing.description.ilike(f"%{query}%"),
-                            Listing.address.ilike(f"%{query}%"),
-                            Listing.city.ilike(f"%{query}%"),
-                            Listing.state.ilike(f"%{query}%"),
-                        )
-                    )
-            else:
-                # Use ILIKE search for SQLite and other databases
-                q = q.filter(
-                    or_(
-                        Listing.title.ilike(f"%{query}%"),
-                        Listing.description.ilike(f"%{query}%"),
-                        Listing.address.ilike(f"%{query}%"),
-                        Listing.city.ilike(f"%{query}%"),
-                        Listing.state.ilike(f"%{query}%"),
-                    )
-                )
+            q = q.where(self._text_match(query))
 
-        # Category filtering
+        # Category and tag filtering, as semi-joins
         if categories:
-            q = q.join(Listing.categories).filter(Category.slug.in_(categories))
-
-        # Tag filtering
+            q = q.where(
+                self._linked_to(
+                    Category,
+                    listing_categories,
+                    listing_categories.c.category_id,
+                    categories,
+                )
+            )
         if tags:
-            q = q.join(Listing.tags).filter(Tag.slug.in_(tags))
+            q = q.where(self._linked_to(Tag, listing_tags, listing_tags.c.tag_id, tags))
 
         # Location-based search
         if location:
@@ -102,9 +324,18 @@ class SearchEngine:
             lon = location.get("longitude")
             radius = location.get("radius", 25)  # Default 25 miles
 
-            if lat and lon:
+            if lat and lon and self.db.bind.dialect.name == "postgresql":
+                # Index-assisted radius search on the PostGIS location column
+                q = q.where(
+                    func.ST_DWithin(
+                        Listing.location,
+                        self._geography_point(lat, lon),
+                        radius * METERS_PER_MILE,
+                    )
+                )
+            elif lat and lon:
                 # Use simple distance calculation for SQLite compatibility
-                # This is a rough approximation - for production, consider using PostGIS
+                # This is a rough bounding-box approximation
                 lat_diff = 0.0145  # Roughly 1 mile in latitude degrees
                 lon_diff = (
                     0.0145  # Roughly 1 mile in longitude degrees (varies by latitude)
@@ -112,7 +343,7 @@ class SearchEngine:
                 radius_lat = radius * lat_diff
                 radius_lon = radius * lon_diff
 
-                q = q.filter(
+                q = q.where(
                     and_(
                         Listing.latitude.isnot(None),
                         Listing.longitude.isnot(None),
@@ -127,18 +358,16 @@ class SearchEngine:
             max_price = price_range.get("max")
 
             if min_price is not None:
-                q = q.filter(Listing.price >= min_price)
+                q = q.where(Listing.price >= min_price)
             if max_price is not None:
-                q = q.filter(Listing.price <= max_price)
+                q = q.where(Listing.price <= max_price)
 
         # Additional filters
         if filters:
-            for field, value in filters.items():
-                if hasattr(Listing, field) and value is not None:
-                    if isinstance(value, list):
-                        q = q.filter(getattr(Listing, field).in_(value))
-                    else:
-                        q = q.filter(getattr(Listing, field) == value)
+            q = self._apply_filters(q, filters)
+
+        # Filtered listings, before sort joins, for counting past the last page
+        filtered = q
 
         # Sorting
         if sort_by == "relevance" and query:
@@ -158,41 +387,190 @@ class SearchEngine:
             # Sort by distance from location
             lat = location.get("latitude")
             lon = location.get("longitude")
-            if lat and lon:
+            if lat and lon and self.db.bind.dialect.name == "postgresql":
                 q = q.order_by(
-                    text(
-                        f"ST_Distance(ST_Point(listings.longitude, listings.latitude)::geography, ST_Point({lon}, {lat})::geography)"
-                    )
+                    func.ST_Distance(
+                        Listing.location, self._geography_point(lat, lon)
+                    ).asc()
+                )
+            elif lat and lon:
+                # Planar approximation, good enough to order nearby listings
+                q = q.order_by(
+                    (
+                        (Listing.latitude - lat) * (Listing.latitude - lat)
+                        + (Listing.longitude - lon) * (Listing.longitude - lon)
+                    ).asc()
                 )
         elif sort_by == "rating":
-            # Sort by average rating
-            q = (
-                q.outerjoin(Review)
-                .filter(Review.status == ReviewStatus.APPROVED)
-                .group_by(Listing.id)
-                .order_by(desc(func.avg(Review.rating)))
+            # Sort by the maintained average rating; unreviewed listings last
+            q = q.outerjoin(
+                ListingReviewStats, ListingReviewStats.listing_id == Listing.id
+            ).order_by(desc(ListingReviewStats.avg_rating).nulls_last())
+        elif sort_by in self._numeric_data_fields():
+            number = self._data_number(sort_by)
+            q = q.order_by(
+                number.desc().nulls_last()
+                if sort_order == "desc"
+                else number.asc().nulls_last()
             )
-        elif hasattr(Listing, sort_by):
-            col = getattr(Listing, sort_by)
+        elif self._listing_column(sort_by) is not None:
+            col = self._listing_column(sort_by)
             q = q.order_by(col.desc() if sort_order == "desc" else col.asc())
         else:
             q = q.order_by(desc(Listing.created_at))
 
-        # Get total count before pagination
-        total = q.count()
+        return q, filtered
 
-        # Apply pagination
-        items = q.offset(offset).limit(limit).all()
+    @staticmethod
+    def _linked_to(model: Any, link: Any, link_column: Any, slugs: List[str]):
+        """Predicate for listings linked to any of the tenant's ``slugs``.
 
-        return {
-            "results": items,
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "has_more": (offset + limit) < total,
-        }
+        The slugs resolve to a handful of ids through the tenant's unique slug
+        index before the link table is probed, and listings linked to several
+        matches are not repeated, so pages and counts need no DISTINCT.
+        """
+        return Listing.id.in_(
+            select(link.c.listing_id)
+            .join(model, model.id == link_column)
+            .where(
+                model.tenant_id == bindparam("tenant_id"),
+                slug_key(model.slug).in_([slug_key(literal(s)) for s in slugs]),
+            )
+        )
+
+    @staticmethod
+    def _encode_cursor(listing: Listing) -> str:
+        """Opaque ``search_after`` cursor pointing just past ``listing``"""
+        key = [listing.created_at.isoformat(), listing.id.hex]
+        return base64.urlsafe_b64encode(orjson.dumps(key)).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+        try:
+            created_at, listing_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+            return datetime.fromisoformat(created_at), uuid.UUID(listing_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid pagination cursor") from e
+
+    @staticmethod
+    def _loaders(include_media: bool, include_reviews: bool) -> List[Any]:
+        # Load what result cards render; any other relationship access raises
+        # instead of issuing one query per listing. Collections use separate
+        # IN queries so pages never fan out into joined rows. The deferred
+        # detail columns come with the row: under AsyncSession their first
+        # access could not lazy-load.
+        loaders: List[Any] = [
+            undefer_group("detail"),
+            selectinload(Listing.categories),
+            selectinload(Listing.tags),
+            joinedload(Listing.review_stats),
+        ]
+        if include_media:
+            loaders.append(selectinload(Listing.media))
+        if include_reviews:
+            loaders.append(selectinload(Listing.reviews))
+        return loaders
+
+    def _text_match(self, query: str):
+        """Predicate for listings matching a free-text query.
+
+        PostgreSQL matches the GIN-indexed ``search_vector``; other databases
+        fall back to substring matching.
+        """
+        if self.db.bind.dialect.name == "postgresql":
+            return Listing.search_vector.match(query)
+        pattern = f"%{query}%"
+        return or_(
+            Listing.title.ilike(pattern),
+            Listing.description.ilike(pattern),
+            Listing.address.ilike(pattern),
+            Listing.city.ilike(pattern),
+            Listing.state.ilike(pattern),
+        )
+
+    @staticmethod
+    def _geography_point(lat: float, lon: float):
+        """A bound WGS 84 point comparable with ``Listing.location``"""
+        point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
+        return cast(point, Geography(geometry_type="POINT", srid=4326))
+
+    def _apply_filters(self, q: Select, filters: Dict[str, Any]) -> Select:
+        """Filter on listing columns, or on ``Listing.data`` for any other field.
+
+        Dynamic fields are matched by JSONB containment (``data @> {...}``) on
+        PostgreSQL so the ``jsonb_path_ops`` GIN index can serve them.
+        """
+        data_filters: Dict[str, Any] = {}
+        for field, value in filters.items():
+            if value is None:
+                continue
+            column = self._listing_column(field)
+            if isinstance(value, dict) and (
+                column is not None or field in self._numeric_data_fields()
+            ):
+                # {"min": ..., "max": ...} range over a column or numeric key
+                number = column if column is not None else self._data_number(field)
+                if value.get("min") is not None:
+                    q = q.where(number >= value["min"])
+                if value.get("max") is not None:
+                    q = q.where(number <= value["max"])
+            elif column is not None:
+                if isinstance(value, list):
+                    q = q.where(column.in_(value))
+                else:
+                    q = q.where(column == value)
+            elif isinstance(value, list):
+                q = q.where(or_(*[self._data_matches({field: v}) for v in value]))
+            else:
+                data_filters[field] = value
+
+        if data_filters:
+            q = q.where(self._data_matches(data_filters))
+        return q
+
+    def _data_matches(self, fields: Dict[str, Any]):
+        """Predicate for listings whose dynamic data contains ``fields``"""
+        if self.db.bind.dialect.name == "postgresql":
+            return Listing.data.op("@>")(literal(fields, JSONB))
+        return and_(
+            *[
+                func.json_extract(Listing.data, f'$."{field}"') == value
+                for field, value in fields.items()
+            ]
+        )
 
-    def get_facets(
+    def _listing_column(self, field: str) -> Optional[Any]:
+        """Listing attribute that filters and sorts on ``field``, if any.
+
+        Generated columns are only computed by PostgreSQL; elsewhere they stay
+        NULL, so their keys are read from ``Listing.data`` instead.
+        """
+        if (
+            field in LISTING_GENERATED_DATA_FIELDS
+            and self.db.bind.dialect.name != "postgresql"
+        ):
+            return None
+        return getattr(Listing, field, None)
+
+    def _numeric_data_fields(self) -> Tuple[str, ...]:
+        """``Listing.data`` keys that range filters and sorts read as numbers"""
+        if self.db.bind.dialect.name == "postgresql":
+            return LISTING_NUMERIC_DATA_FIELDS
+        return LISTING_NUMERIC_DATA_FIELDS + LISTING_GENERATED_DATA_FIELDS
+
+    def _data_number(self, field: str):
+        """Numeric value of an indexed ``Listing.data`` key.
+
+        Rendered with the key inline so PostgreSQL can match it to the
+        ``idx_listing_data_*`` expression index; only called for names from
+        ``_numeric_data_fields``.
+        """
+        if self.db.bind.dialect.name == "postgresql":
+            key = literal_column(f"'{field}'")
+            return cast(Listing.data.op("->>")(key), Numeric)
+        return func.json_extract(Listing.data, f'$."{field}"')
+
+    async def get_facets(
         self,
         tenant_id: str,
         query: Optional[str] = None,
@@ -202,86 +580,73 @@ class SearchEngine:
         Get search facets for filtering UI
         """
         # Base query
-        q = self.db.query(Listing).filter(
-            Listing.tenant_id == tenant_id,
-            Listing.is_public == True,
-            Listing.status == ListingStatus.PUBLISHED,
-        )
+        q = _PUBLISHED_LISTINGS
+        params = {"tenant_id": tenant_id}
 
         # Apply same filters as search
         if query:
-            if hasattr(Listing, "search_vector"):
-                q = q.filter(Listing.search_vector.match(query))
-            else:
-                q = q.filter(
-                    or_(
-                        Listing.title.ilike(f"%{query}%"),
-                        Listing.description.ilike(f"%{query}%"),
-                    )
-                )
+            q = q.where(self._text_match(query))
 
         if filters:
-            for field, value in filters.items():
-                if hasattr(Listing, field) and value is not None:
-                    q = q.filter(getattr(Listing, field) == value)
-
-        # Get category facets
-        category_facets = (
-            self.db.query(
-                Category.name, Category.slug, func.count(Listing.id).label("count")
-            )
-            .join(Listing.categories)
-            .filter(Category.tenant_id == tenant_id, Category.is_active == True)
-            .group_by(Category.id, Category.name, Category.slug)
-            .all()
-        )
+            q = self._apply_filters(q, filters)
 
-        # Get tag facets
-        tag_facets = (
-            self.db.query(Tag.name, Tag.slug, func.count(Listing.id).label("count"))
-            .join(Listing.tags)
-            .filter(Tag.tenant_id == tenant_id, Tag.is_active == True)
-            .group_by(Tag.id, Tag.name, Tag.slug)
-            .all()
-        )
+        # One round trip: the filtered listings as a CTE, then category, tag
+        # and price aggregates over it combined with UNION ALL
+        matched = q.with_only_columns(Listing.id, Listing.price).distinct()
+        filtered = matched.cte("filtered")
+        no_text = cast(literal(None), String)
+        no_number = cast(literal(None), Numeric)
 
-        # Get price range facets
-        price_stats = (
-            self.db.query(
-                func.min(Listing.price).label("min_price"),
-                func.max(Listing.price).label("max_price"),
-                func.avg(Listing.price).label("avg_price"),
-            )
-            .filter(
-                Listing.tenant_id == tenant_id,
-                Listing.is_public == True,
-                Listing.status == ListingStatus.PUBLISHED,
-                Listing.price.isnot(None),
+        def term_facet(kind: str, model, model_key) -> Select:
+            return (
+                select(
+                    literal(kind).label("kind"),
+                    model.name,
+                    model.slug,
+                    func.count().label("count"),
+                    no_number,
+                    no_number,
+                    no_number,
+                )
+                .select_from(filtered)
+                .join(model_key.table, model_key.table.c.listing_id == filtered.c.id)
+                .join(model, model.id == model_key)
+                .where(model.is_active == True)
+                .group_by(model.id, model.name, model.slug)
             )
-            .first()
+
+        price_stats = select(
+            literal("price").label("kind"),
+            no_text,
+            no_text,
+            func.count(filtered.c.price),
+            cast(func.min(filtered.c.price), Numeric),
+            cast(func.max(filtered.c.price), Numeric),
+            cast(func.avg(filtered.c.price), Numeric),
+        ).select_from(filtered)
+
+        rows = await self.db.execute(
+            union_all(
+                term_facet("categories", Category, listing_categories.c.category_id),
+                term_facet("tags", Tag, listing_tags.c.tag_id),
+                price_stats,
+            ),
+            params,
         )
 
-        return {
-            "categories": [
-                {"name": name, "slug": slug, "count": count}
-                for name, slug, count in category_facets
-            ],
-            "tags": [
-                {"name": name, "slug": slug, "count": count}
-                for name, slug, count in tag_facets
-            ],
-            "price_range": (
-                {
-                    "min": float(price_stats.min_price) if price_stats.min_price else 0,
-                    "max": float(price_stats.max_price) if price_stats.max_price else 0,
-                    "avg": float(price_stats.avg_price) if price_stats.avg_price else 0,
+        facets: Dict[str, Any] = {"categories": [], "tags": [], "price_range": None}
+        for kind, name, slug, count, min_price, max_price, avg_price in rows:
+            if kind == "price":
+                facets["price_range"] = {
+                    "min": float(min_price) if min_price else 0,
+                    "max": float(max_price) if max_price else 0,
+                    "avg": float(avg_price) if avg_price else 0,
                 }
-                if price_stats
-                else None
-            ),
-        }
+            else:
+                facets[kind].append({"name": name, "slug": slug, "count": count})
+        return facets
 
-    def get_suggestions(
+    async def get_suggestions(
         self,
         tenant_id: str,
         query: str,
@@ -290,36 +655,36 @@ class SearchEngine:
         """
         Get search suggestions based on query
         """
-        # Get suggestions from listing titles
-        title_suggestions = (
-            self.db.query(Listing.title)
-            .filter(
-                Listing.tenant_id == tenant_id,
-                Listing.is_public == True,
-                Listing.status == ListingStatus.PUBLISHED,
-                Listing.title.ilike(f"%{query}%"),
-            )
-            .limit(limit)
-            .all()
-        )
+        # lower() to agree with ILIKE; casefold() would fold "ß" into "ss"
+        key = (str(tenant_id), query.lower(), limit)
+        if _suggestion_cache is not None:
+            with _suggestion_cache_lock:
+                cached = _suggestion_cache.get(key)
+            if cached is not None:
+                return list(cached)
 
-        # Get suggestions from categories
-        category_suggestions = (
-            self.db.query(Category.name)
-            .filter(
-                Category.tenant_id == tenant_id,
-                Category.is_active == True,
-                Category.name.ilike(f"%{query}%"),
+        # Titles and category names in one trigram-indexed query; UNION
+        # removes duplicates in the database
+        pattern = f"%{query}%"
+        titles = _PUBLISHED_LISTINGS.with_only_columns(
+            Listing.title.label("suggestion")
+        ).where(Listing.title.ilike(pattern))
+        category_names = select(Category.name.label("suggestion")).where(
+            Category.tenant_id == bindparam("tenant_id"),
+            Category.is_active == True,
+            Category.name.ilike(pattern),
+        )
+        suggestions = union(titles, category_names).subquery()
+        results = list(
+            await self.db.scalars(
+                select(suggestions.c.suggestion)
+                .order_by(suggestions.c.suggestion)
+                .limit(limit),
+                {"tenant_id": tenant_id},
             )
-            .limit(limit)
-            .all()
         )
 
-        # Combine and deduplicate
-        suggestions = set()
-        for (title,) in title_suggestions:
-            suggestions.add(title)
-        for (name,) in category_suggestions:
-            suggestions.add(name)
-
-        return list(suggestions)[:limit]
+        if _suggestion_cache is not None:
+            with _suggestion_cache_lock:
+                _suggestion_cache[key] = results
+        return list(results)
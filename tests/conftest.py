@@ -2,23 +2,237 @@
 Pytest configuration and shared fixtures for LAAS Platform tests
 """
 
-import asyncio
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
+import orjson
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
 
+from laas.core.config import get_settings
+from laas.database.connection import json_dumps
+from laas.database.models import (
+    Base,
+    Category,
+    IndustrySchema,
+    Listing,
+    ListingStatus,
+    Tag,
+    Tenant,
+    User,
+)
 from laas.main import app
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+@pytest_asyncio.fixture(scope="session")
+async def engine():
+    """In-memory database with the schema created once per test session.
 
+    Each pytest-xdist worker is its own process and so gets its own database;
+    run ``pytest -n auto`` to parallelise.
+    """
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=StaticPool,
+        query_cache_size=get_settings().database_query_cache_size,
+        # Same JSON codec as the application engines
+        json_serializer=json_dumps,
+        json_deserializer=orjson.loads,
+    )
 
-@pytest.fixture(scope="function")
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work on SQLite
+        dbapi_connection.isolation_level = None
+        # Nothing here needs to survive a crash; skip journaling and syncs
+        cursor = dbapi_connection.cursor()
+        for pragma in (
+            "synchronous=OFF",
+            "journal_mode=MEMORY",
+            "temp_store=MEMORY",
+            "locking_mode=EXCLUSIVE",
+        ):
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def pg_engine():
+    """PostgreSQL engine for tests marked ``postgresql``.
+
+    Points at a throwaway database given as TEST_POSTGRES_URL (e.g.
+    ``postgresql+asyncpg://...``) where PostGIS is available; the schema is
+    recreated for the session. Tests are skipped when it is not set.
+    """
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    pytest.importorskip("asyncpg")
+    engine = create_async_engine(
+        url, json_serializer=json_dumps, json_deserializer=orjson.loads
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(engine):
+    """Session whose writes, including commits, are rolled back after the test."""
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await trans.rollback()
+
+
+@pytest.fixture
+def app_sessions(db, monkeypatch):
+    """Point ``get_async_session`` in the given modules at the test transaction.
+
+    For code that opens its own sessions (background writers, post-response
+    tasks): ``sessionmaker = app_sessions(module, ...)`` patches each module
+    and returns the factory, whose sessions share the db fixture's connection
+    so their commits are rolled back with it.
+    """
+    sessionmaker = async_sessionmaker(
+        bind=db.bind,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+    @asynccontextmanager
+    async def get_async_session():
+        async with sessionmaker() as session:
+            yield session
+
+    def _patch(*modules):
+        for module in modules:
+            monkeypatch.setattr(module, "get_async_session", get_async_session)
+        return sessionmaker
+
+    return _patch
+
+
+@pytest.fixture
+def queries(engine):
+    """SQL statements run on the shared engine during the test.
+
+    Lets tests bound their query count so lazy loads (N+1) fail in CI.
+    """
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        # The db fixture's SAVEPOINT bookkeeping is not the code under test
+        if not statement.startswith(("SAVEPOINT", "RELEASE", "ROLLBACK TO")):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+
+@dataclass
+class SampleData:
+    """Related rows for tests that need a populated tenant"""
+
+    tenant: Tenant
+    user: User
+    schema: IndustrySchema
+    category: Category
+    tag: Tag
+
+
+@pytest_asyncio.fixture
+async def sample_data(db) -> SampleData:
+    """A tenant with a user, an industry schema, a category and a tag.
+
+    Rows are linked through relationships and written in one flush and
+    commit rather than one round trip per object.
+    """
+    tenant = Tenant(name="Acme", subdomain="acme", industry="real_estate")
+    data = SampleData(
+        tenant=tenant,
+        user=User(tenant=tenant, email="owner@acme.test", password_hash="x"),
+        schema=IndustrySchema(
+            tenant=tenant,
+            industry="real_estate",
+            version="1",
+            name="Real Estate",
+            fields={},
+        ),
+        category=Category(tenant=tenant, name="Homes", slug="homes"),
+        tag=Tag(tenant=tenant, name="New", slug="new"),
+    )
+    db.add_all([tenant, data.user, data.schema, data.category, data.tag])
+    await db.commit()
+    return data
+
+
+@pytest.fixture
+def sample_tenant(sample_data: SampleData) -> Tenant:
+    return sample_data.tenant
+
+
+@pytest.fixture
+def sample_user(sample_data: SampleData) -> User:
+    return sample_data.user
+
+
+@pytest.fixture
+def sample_schema(sample_data: SampleData) -> IndustrySchema:
+    return sample_data.schema
+
+
+@pytest_asyncio.fixture
+async def sample_listing(db, sample_data: SampleData) -> Listing:
+    """A published, public listing owned by the sample user"""
+    listing = Listing(
+        tenant_id=sample_data.tenant.id,
+        owner_id=sample_data.user.id,
+        schema_id=sample_data.schema.id,
+        title="Sample Loft",
+        slug="sample-loft",
+        status=ListingStatus.PUBLISHED,
+        data={},
+        categories=[sample_data.category],
+        tags=[sample_data.tag],
+    )
+    db.add(listing)
+    await db.commit()
+    return listing
+
+
+@pytest.fixture(scope="session")
 def client():
     """Create a test client for the FastAPI application."""
     with TestClient(app) as test_client:
@@ -0,0 +1,92 @@
+"""
+Audit middleware tests for LAAS Platform
+"""
+
+import uuid
+
+import httpx
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import undefer_group
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from laas.database.models import AuditLog, Tenant
+from laas.middleware import audit
+
+
+@pytest.mark.asyncio
+async def test_audit_entries_record_payload_in_one_batch(app_sessions, queries):
+    """Test that recorded payloads are audited and entries land in one INSERT"""
+    sessionmaker = app_sessions(audit)
+
+    async with sessionmaker() as db:
+        tenant = Tenant(name="Acme", subdomain="acme", industry="real_estate")
+        db.add(tenant)
+        await db.commit()
+
+    class ListingIn(BaseModel):
+        title: str
+        secret: str = ""
+
+    async def create_listing(request: Request):
+        request.state.tenant_id = str(tenant.id)
+        listing = ListingIn.model_validate(await request.json())
+        audit.record_audit(request, listing, exclude={"secret"})
+        return JSONResponse(await request.json())
+
+    writer = audit.AuditLogWriter()
+    app = audit.AuditMiddleware(
+        Starlette(routes=[Route("/api/listings", create_listing, methods=["POST"])]),
+        writer=writer,
+    )
+
+    queries.clear()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        for i in range(3):
+            resp = await client.post(
+                "/api/listings", json={"title": f"Loft {i}", "secret": "x"}
+            )
+            assert resp.json()["title"] == f"Loft {i}"
+    await writer.stop()
+
+    async with sessionmaker() as db:
+        rows = (
+            await db.scalars(select(AuditLog).options(undefer_group("payload")))
+        ).all()
+        assert len(rows) == 3
+        assert sorted((row.new_values for row in rows), key=str) == [
+            {"title": "Loft 0"},
+            {"title": "Loft 1"},
+            {"title": "Loft 2"},
+        ]
+        assert rows[0].action == "POST /api/listings"
+        assert rows[0].resource_type == "listings"
+    assert len([s for s in queries if s.startswith("INSERT")]) == 1
+
+
+@pytest.mark.asyncio
+async def test_full_audit_queue_drops_entries(monkeypatch):
+    """Test that a full queue drops entries instead of blocking the request"""
+    monkeypatch.setattr(audit.get_settings(), "audit_queue_size", 1)
+    writer = audit.AuditLogWriter()
+
+    async def never_flush(rows):
+        pass
+
+    monkeypatch.setattr(writer, "_run", lambda: never_flush([]))
+    assert writer.submit({"tenant_id": uuid.uuid4()})
+    assert not writer.submit({"tenant_id": uuid.uuid4()})
+    assert writer.dropped == 1
+
+
+def test_resource_path_skips_api_version():
+    """Test that versioned and unversioned paths yield the same resource"""
+    match = audit._RESOURCE_PATH.match
+    assert match("/api/v1/listings/abc-123/media").groups() == ("listings", "abc-123")
+    assert match("/api/listings").groups() == ("listings", None)
+    assert match("/health") is None
@@ -0,0 +1,586 @@
+"""
+Authentication helper tests for LAAS Platform
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from cachetools import TTLCache
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from fastapi import BackgroundTasks, HTTPException, Request
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    OAuth2PasswordRequestForm,
+)
+from passlib.hash import bcrypt
+from pydantic import ValidationError
+
+from laas.api.v1.endpoints import auth as auth_endpoints
+from laas.auth import dependencies, perm_cache, revocation
+from laas.auth.api_keys import generate_api_key, verify_api_key
+from laas.auth.jwt_handler import AuthManager, jwt
+from laas.auth.loader import UserLoader
+from laas.auth.password import PasswordManager
+from laas.core.config import get_settings
+from laas.database.models import APIKey, Tenant, User, UserRole
+from laas.schemas.auth import (
+    PasswordReset,
+    PasswordResetConfirm,
+    UserLogin,
+    UserRegister,
+)
+
+
+@pytest.mark.asyncio
+async def test_async_password_hash_roundtrip():
+    """Test that threadpool hashing and verification agree"""
+    hashed = await PasswordManager.ahash_password("Str0ng!Pass")
+
+    assert await PasswordManager.averify_password("Str0ng!Pass", hashed)
+    assert not await PasswordManager.averify_password("wrong", hashed)
+    assert PasswordManager.verify_password("Str0ng!Pass", hashed)
+
+
+def test_new_hashes_use_argon2_and_bcrypt_is_upgraded():
+    """Test that Argon2id is the default and legacy bcrypt hashes get rehashed"""
+    hashed = PasswordManager.get_password_hash("Str0ng!Pass")
+    assert hashed.startswith("$argon2id$")
+    assert PasswordManager.verify_and_update("Str0ng!Pass", hashed) == (True, None)
+
+    legacy = bcrypt.using(rounds=4).hash("Str0ng!Pass")
+    verified, new_hash = PasswordManager.verify_and_update("Str0ng!Pass", legacy)
+    assert verified
+    assert new_hash is not None and new_hash.startswith("$argon2id$")
+
+
+def test_verify_token_cache_hits_and_rejects_wrong_type(monkeypatch):
+    """Test that cached payloads are reused and still type-checked"""
+    monkeypatch.setattr(get_settings(), "jwt_cache_size", 16)
+    manager = AuthManager()
+    token = manager.create_access_token({"sub": "user-1"})
+
+    calls = []
+    original_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return original_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+
+    assert manager.verify_token(token)["sub"] == "user-1"
+    assert manager.verify_token(token)["sub"] == "user-1"
+    assert len(calls) == 1
+
+    with pytest.raises(HTTPException):
+        manager.verify_token(token, token_type="refresh")
+
+
+def test_user_snapshot_cache_and_invalidation(monkeypatch):
+    """Test that user snapshots are cached per (user, tenant) and invalidated"""
+    monkeypatch.setattr(dependencies, "_user_cache", TTLCache(maxsize=8, ttl=60))
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        role=UserRole.ADMIN,
+        status="active",
+        email_verified=True,
+        permissions=["export_data"],
+    )
+
+    snapshot = dependencies.cache_user_snapshot(user)
+    key = (str(user.id), str(user.tenant_id))
+    assert dependencies._user_cache[key] == snapshot
+    assert snapshot.role is UserRole.ADMIN
+    assert snapshot.permissions == ("export_data",)
+
+    dependencies.invalidate_user_cache(user.id, user.tenant_id)
+    assert key not in dependencies._user_cache
+
+
+class _RecordingSession:
+    """Minimal AsyncSession stand-in that records how many queries were issued"""
+
+    def __init__(self, users, delay=0):
+        self.users = users
+        self.queries = 0
+        self.delay = delay
+        self.in_flight = False
+
+    async def execute(self, statement):
+        # AsyncSession rejects concurrent operations
+        assert not self.in_flight
+        self.in_flight = True
+        self.queries += 1
+        await asyncio.sleep(self.delay)
+        self.in_flight = False
+        users = self.users
+
+        class _Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return users
+
+        return _Result()
+
+
+@pytest.mark.asyncio
+async def test_user_loader_batches_concurrent_loads():
+    """Test that concurrent loads coalesce into one query and primed keys skip it"""
+    tenant_id = uuid.uuid4()
+    users = [User(id=uuid.uuid4(), tenant_id=tenant_id) for _ in range(3)]
+    primed = User(id=uuid.uuid4(), tenant_id=tenant_id)
+    db = _RecordingSession(users)
+    loader = UserLoader(db)
+    loader.prime((tenant_id, primed.id), primed)
+
+    missing = uuid.uuid4()
+    results = await asyncio.gather(
+        *(loader.load((tenant_id, u.id)) for u in users),
+        loader.load((tenant_id, primed.id)),
+        loader.load((tenant_id, missing)),
+    )
+
+    assert results == [*users, primed, None]
+    assert db.queries == 1
+    assert await loader.load((tenant_id, users[0].id)) is users[0]
+    assert db.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_user_loader_serializes_batches_on_one_session():
+    """Test a load issued while a batch is in flight waits for the session"""
+    tenant_id = uuid.uuid4()
+    first, second = (User(id=uuid.uuid4(), tenant_id=tenant_id) for _ in range(2))
+    db = _RecordingSession([first, second], delay=0.01)
+    loader = UserLoader(db)
+
+    first_load = asyncio.ensure_future(loader.load((tenant_id, first.id)))
+    await asyncio.sleep(0.001)  # first batch is now awaiting execute()
+    assert db.in_flight
+    second_load = asyncio.ensure_future(loader.load((tenant_id, second.id)))
+
+    assert await asyncio.gather(first_load, second_load) == [first, second]
+    assert db.queries == 2
+
+
+def test_verify_token_rejects_expired_token():
+    """Test that the library's exp validation surfaces as a 'Token has expired' 401"""
+    manager = AuthManager()
+    token = manager.create_access_token({"sub": "user-1"}, timedelta(seconds=-5))
+
+    with pytest.raises(HTTPException) as exc_info:
+        manager.verify_token(token)
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Token has expired"
+
+
+@pytest.mark.asyncio
+async def test_dummy_verification_never_matches():
+    """Test that the unknown-user path burns a verification but never succeeds"""
+    assert await PasswordManager.averify_dummy("dummy-do-not-match") is False
+    assert await PasswordManager.averify_dummy("Str0ng!Pass") is False
+
+
+def test_password_strength_classification():
+    """Test that each character class is detected and scored"""
+    strong = PasswordManager.validate_password_strength("Str0ng!Password")
+    assert strong["is_valid"] and strong["score"] == 6
+
+    weak = PasswordManager.validate_password_strength("abc")
+    assert not weak["is_valid"]
+    assert weak["score"] == 1
+    assert len(weak["errors"]) == 4
+
+    # Non-ASCII letters count toward the upper/lowercase requirements
+    umlauts = PasswordManager.validate_password_strength("ÄÖÜäöü1!")
+    assert umlauts["is_valid"], umlauts["errors"]
+
+
+def test_register_schema_lowercases_email():
+    """Test that emails are normalized so lookups can use plain indexes"""
+    data = UserRegister(
+        email="Jane.Doe@Example.COM", password="Str0ng!Pass", tenant_id=uuid.uuid4()
+    )
+    assert data.email == "jane.doe@example.com"
+
+
+def test_login_and_reset_schemas_check_email_shape():
+    """Test the lightweight email check on login and reset requests"""
+    assert UserLogin(email="a@example.com", password="x").email == "a@example.com"
+    assert PasswordReset(email="a@example.com").email == "a@example.com"
+    for bad in ("plainaddress", "a@b", "a b@example.com", "a@@example.com"):
+        with pytest.raises(ValidationError):
+            UserLogin(email=bad, password="x")
+
+
+def test_schemas_reject_short_passwords():
+    """Test the minimum password length on registration and reset"""
+    with pytest.raises(ValidationError):
+        UserRegister(email="a@example.com", password="short", tenant_id=uuid.uuid4())
+    with pytest.raises(ValidationError):
+        PasswordResetConfirm(token="t", new_password="short")
+    assert PasswordResetConfirm(token="t", new_password="longenough").new_password
+
+
+@pytest.mark.asyncio
+async def test_load_user_checks_tenant_and_loads_auth_columns(db):
+    """Test primary-key and load_only user lookups used by auth dependencies"""
+    tenant = Tenant(name="Acme", subdomain="acme", industry="real_estate")
+    user = User(tenant=tenant, email="a@example.com", password_hash="x")
+    db.add(user)
+    await db.commit()
+    user_id, tenant_id = str(user.id), str(tenant.id)
+    db.expunge_all()
+
+    loaded = await dependencies._load_user(db, user_id, tenant_id)
+    assert loaded.email == "a@example.com"
+    db.expunge_all()
+    principal = await dependencies._load_user(db, user_id, tenant_id, auth_only=True)
+    assert principal.role is UserRole.USER
+
+    for bad_tenant in (str(uuid.uuid4()), "not-a-uuid"):
+        with pytest.raises(HTTPException):
+            await dependencies._load_user(db, user_id, bad_tenant)
+
+
+def test_eddsa_tokens_use_preloaded_keys(monkeypatch):
+    """Test EdDSA signing with PEM keys parsed once at startup"""
+    private_key = Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    settings = get_settings()
+    monkeypatch.setattr(settings, "jwt_algorithm", "EdDSA")
+    monkeypatch.setattr(settings, "jwt_private_key", private_pem)
+
+    manager = AuthManager()
+    token = manager.create_access_token({"sub": "user-1"})
+    assert jwt.get_unverified_header(token)["alg"] == "EdDSA"
+    assert manager.verify_token(token)["sub"] == "user-1"
+
+    # A verify-only instance needs just the public key
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    monkeypatch.setattr(settings, "jwt_private_key", None)
+    monkeypatch.setattr(settings, "jwt_public_key", public_pem)
+    assert AuthManager().verify_token(token)["sub"] == "user-1"
+
+
+def test_verify_token_rejects_tampered_token():
+    """Test that signature failures map to a generic credentials 401"""
+    manager = AuthManager()
+    token = manager.create_access_token({"sub": "user-1"})
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, signature[::-1]])
+
+    with pytest.raises(HTTPException) as exc_info:
+        manager.verify_token(tampered)
+    assert exc_info.value.detail == "Could not validate credentials"
+
+
+class _FakeRedis:
+    """In-memory stand-in for the few Redis commands the auth code uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = 0
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = (value, ex)
+
+    async def exists(self, key):
+        self.calls += 1
+        return int(key in self.data)
+
+    async def get(self, key):
+        self.calls += 1
+        entry = self.data.get(key)
+        return entry[0] if entry is not None else None
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.mark.asyncio
+async def test_token_revocation_roundtrip(monkeypatch):
+    """Test that revoked jtis are stored with a TTL and only hits are memoized"""
+    fake = _FakeRedis()
+    monkeypatch.setattr(revocation, "get_redis", lambda: fake)
+    store = revocation.TokenRevocationStore()
+    store.enabled = True
+
+    manager = AuthManager()
+    payload = manager.verify_token(manager.create_access_token({"tenant_id": "t-1"}))
+    other = manager.verify_token(manager.create_access_token({"tenant_id": "t-1"}))
+    assert payload["jti"] != other["jti"]
+
+    # Misses are not cached, so a revocation elsewhere is seen at once
+    assert not await store.is_revoked("t-1", other["jti"])
+    assert not await store.is_revoked("t-1", other["jti"])
+    assert fake.calls == 2
+    await fake.set(store._key("t-1", other["jti"]), 1)
+    assert await store.is_revoked("t-1", other["jti"])
+    assert await store.is_revoked("t-1", other["jti"])
+    assert fake.calls == 3
+    fake.data.clear()
+
+    await store.revoke("t-1", payload["jti"], payload["exp"])
+    ((key, (_, ttl)),) = fake.data.items()
+    assert key == f"revoked:tenant:t-1:{payload['jti']}"
+    assert 0 < ttl <= 30 * 60
+    assert await store.is_revoked("t-1", payload["jti"])
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token_and_survives_redis_outage(monkeypatch):
+    """Test revoking an access token also revokes its paired refresh token"""
+    fake = _FakeRedis()
+    monkeypatch.setattr(revocation, "get_redis", lambda: fake)
+    store = revocation.TokenRevocationStore()
+    store.enabled = True
+    monkeypatch.setattr(revocation, "revocation_store", store)
+
+    manager = AuthManager()
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        email="a@example.com",
+        role=UserRole.USER,
+    )
+    tokens = manager.create_token_pair(user)
+    access = manager.verify_token(tokens["access_token"])
+    refresh = manager.verify_token(tokens["refresh_token"], "refresh")
+    assert access["refresh_jti"] == refresh["jti"]
+
+    await revocation.revoke_token(access)
+    assert await revocation.is_token_revoked(refresh)
+    assert len(fake.data) == 2
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(fake, "set", unavailable)
+    other = manager.verify_token(manager.create_token_pair(user)["access_token"])
+    await revocation.revoke_token(other)  # logged, not raised
+    assert await revocation.is_token_revoked(other)
+
+
+@pytest.mark.asyncio
+async def test_record_login_updates_in_its_own_session(app_sessions):
+    """Test the background login bookkeeping writes last_login and rehashes"""
+    sessionmaker = app_sessions(auth_endpoints)
+
+    async with sessionmaker() as db:
+        tenant = Tenant(name="Acme", subdomain="acme", industry="real_estate")
+        user = User(tenant=tenant, email="a@example.com", password_hash="old")
+        db.add(user)
+        await db.commit()
+
+    logged_in_at = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    await auth_endpoints.record_login(user.id, logged_in_at, "new")
+
+    async with sessionmaker() as db:
+        stored = await db.get(User, user.id)
+        assert stored.last_login == logged_in_at
+        assert stored.password_hash == "new"
+
+
+def test_password_strength_results_are_cached_but_not_shared():
+    """Test that cached strength results hand out independent copies"""
+    first = PasswordManager.validate_password_strength("abc")
+    first["errors"].clear()
+
+    second = PasswordManager.validate_password_strength("abc")
+    assert len(second["errors"]) == 4
+    assert second is not first
+
+
+@pytest.mark.asyncio
+async def test_register_returns_server_defaults_without_refresh(db, queries):
+    """Test that registration reads created_at from the INSERT, not a SELECT"""
+    tenant = Tenant(name="Acme", subdomain="acme", industry="real_estate")
+    db.add(tenant)
+    await db.commit()
+
+    queries.clear()
+    request = Request({"type": "http", "state": {}})
+    response = await auth_endpoints.register_user(
+        UserRegister(
+            email="New@Example.com",
+            password="Str0ng!Pass",
+            tenant_id=str(tenant.id),
+        ),
+        request,
+        db,
+    )
+
+    assert response.email == "new@example.com"
+    assert response.tenant_id == str(tenant.id)
+    assert response.created_at is not None
+    inserts = [s for s in queries if s.startswith("INSERT")]
+    assert len(inserts) == 1 and "RETURNING" in inserts[0]
+    assert len(queries) == 2  # duplicate-email check + INSERT ... RETURNING
+    assert response.email_verified is False
+    assert request.state.audit_payload["email"] == "new@example.com"
+    assert "password" not in request.state.audit_payload
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_checks_tenant_and_status(db):
+    """Test the prebuilt primary-key lookup still enforces tenant and status"""
+    tenant = Tenant(name="Acme", subdomain="acme", industry="real_estate")
+    user = User(tenant=tenant, email="a@example.com", password_hash="x")
+    db.add(user)
+    await db.commit()
+
+    tokens = auth_endpoints.auth_manager.create_token_pair(user)
+    response = await auth_endpoints.refresh_token(tokens["refresh_token"], db)
+    assert response.access_token
+
+    user.status = "suspended"
+    await db.commit()
+    with pytest.raises(HTTPException) as exc:
+        await auth_endpoints.refresh_token(tokens["refresh_token"], db)
+    assert exc.value.status_code == 401
+
+    user.status = "active"
+    await db.commit()
+    forged = auth_endpoints.auth_manager.create_token_pair(
+        User(id=user.id, tenant_id=uuid.uuid4(), email=user.email, role=user.role)
+    )
+    with pytest.raises(HTTPException):
+        await auth_endpoints.refresh_token(forged["refresh_token"], db)
+
+
+@pytest.mark.asyncio
+async def test_login_and_reset_tolerate_email_in_several_tenants(db):
+    """Test an email registered in two tenants does not break the lookups"""
+    password_hash = PasswordManager.get_password_hash("Str0ng!Pass")
+    for subdomain in ("acme", "globex"):
+        tenant = Tenant(name=subdomain, subdomain=subdomain, industry="real_estate")
+        db.add(User(tenant=tenant, email="a@example.com", password_hash=password_hash))
+    await db.commit()
+
+    form = OAuth2PasswordRequestForm(username="a@example.com", password="Str0ng!Pass")
+    response = await auth_endpoints.login_user(BackgroundTasks(), form, db)
+    assert response.access_token
+
+    reset = await auth_endpoints.forgot_password("a@example.com", db)
+    assert "reset link" in reset["message"]
+
+
+def test_create_token_pair_mints_distinct_typed_tokens():
+    """Test that the pair shares user claims but differs in type and jti"""
+    manager = AuthManager()
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        email="a@example.com",
+        role=UserRole.USER,
+        permissions=None,
+    )
+
+    tokens = manager.create_token_pair(user)
+    access = manager.verify_token(tokens["access_token"])
+    refresh = manager.verify_token(tokens["refresh_token"], token_type="refresh")
+
+    assert access["sub"] == refresh["sub"] == str(user.id)
+    assert access["permissions"] == []
+    assert access["jti"] != refresh["jti"]
+    assert refresh["exp"] > access["exp"]
+
+
+@pytest.mark.asyncio
+async def test_optional_current_user_returns_none_without_raising(db):
+    """Test the anonymous, invalid-token and authenticated optional-user paths"""
+    tenant = Tenant(name="Acme", subdomain="acme", industry="real_estate")
+    user = User(
+        tenant=tenant,
+        email="a@example.com",
+        password_hash="x",
+        role=UserRole.USER,
+    )
+    db.add(user)
+    await db.commit()
+
+    request = Request({"type": "http"})
+    optional_user = dependencies.get_optional_current_user
+
+    assert await optional_user(request, None, db) is None
+    garbage = HTTPAuthorizationCredentials(scheme="Bearer", credentials="x.y.z")
+    assert await optional_user(request, garbage, db) is None
+
+    token = AuthManager().create_token_pair(user)["access_token"]
+    valid = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    assert await optional_user(request, valid, db) is user
+    assert request.state.user_id == str(user.id)
+
+
+@pytest.mark.asyncio
+async def test_principal_is_shared_through_permission_cache(monkeypatch):
+    """Test that a principal cached by one worker is reused without a query"""
+    fake = _FakeRedis()
+    monkeypatch.setattr(perm_cache, "get_redis", lambda: fake)
+    cache = perm_cache.PermissionCache()
+    cache.enabled = True
+    monkeypatch.setattr(dependencies, "permission_cache", cache)
+    monkeypatch.setattr(dependencies, "_user_cache", None)
+
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        role=UserRole.MODERATOR,
+        status="active",
+        email_verified=True,
+        permissions=["export_data"],
+    )
+    snapshot = dependencies.UserSnapshot.from_user(user)
+    await cache.set(user.tenant_id, user.id, snapshot.shared_fields())
+    ((key, (_, ttl)),) = fake.data.items()
+    assert key == f"perm:tenant:{user.tenant_id}:{user.id}"
+    assert ttl == cache.ttl
+
+    token = AuthManager().create_token_pair(user)["access_token"]
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    # No session: a shared-cache hit must not touch the database
+    principal = await dependencies.get_current_principal(
+        Request({"type": "http"}), credentials, None
+    )
+    assert principal == snapshot
+
+    await cache.invalidate(user.tenant_id, user.id)
+    assert await cache.get(user.tenant_id, user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_api_key_verifies_by_prefix_and_digest(db):
+    """Test API key lookup by prefix with a constant-time digest check"""
+    key, prefix, key_hash = generate_api_key()
+    assert key.startswith(prefix + ".") and len(key_hash) == 64
+
+    tenant = Tenant(name="Acme", subdomain="acme", industry="real_estate")
+    api_key = APIKey(tenant=tenant, name="ci", key_prefix=prefix, key_hash=key_hash)
+    db.add(api_key)
+    await db.commit()
+
+    assert (await verify_api_key(db, key)).id == api_key.id
+    assert await verify_api_key(db, key + "x") is None
+    assert await verify_api_key(db, "no-separator") is None
+
+    api_key.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    await db.commit()
+    assert await verify_api_key(db, key) is None
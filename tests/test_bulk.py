@@ -0,0 +1,182 @@
+"""
+Bulk write helper tests for LAAS Platform
+"""
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from laas.database.bulk import (
+    COPY_THRESHOLD,
+    STAGE_THRESHOLD,
+    _copy_records,
+    bulk_insert,
+    upsert_metric,
+    upsert_metrics,
+)
+from laas.database.models import AuditLog, Metric, MetricEntityType, Tenant
+
+
+def test_copy_records_fill_client_defaults_and_encode_json():
+    """Test that COPY records carry generated ids and JSON as text"""
+    tenant_id = uuid.uuid4()
+    columns, records = _copy_records(
+        AuditLog.__table__,
+        [
+            {
+                "tenant_id": tenant_id,
+                "action": "POST /listings",
+                "resource_type": "listings",
+                "new_values": {"title": "Loft"},
+            }
+        ],
+    )
+    row = dict(zip(columns, records[0]))
+
+    assert isinstance(row["id"], uuid.UUID)
+    assert isinstance(row["created_at"], datetime)
+    assert row["tenant_id"] == tenant_id
+    assert json.loads(row["new_values"]) == {"title": "Loft"}
+    assert "old_values" not in row
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_falls_back_to_executemany(db, sample_tenant):
+    """Test that non-asyncpg drivers insert the batch with one statement"""
+    tenant = sample_tenant
+
+    day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    await bulk_insert(
+        db,
+        Metric,
+        [
+            {
+                "entity_type": MetricEntityType.TENANT,
+                "entity_id": tenant.id,
+                "tenant_id": tenant.id,
+                "date": day,
+                "metric_name": f"metric_{i}",
+                "metric_value": float(i),
+            }
+            for i in range(3)
+        ],
+    )
+    await bulk_insert(db, Metric, [])
+
+    assert await db.scalar(select(func.count()).select_from(Metric)) == 3
+
+
+@pytest.mark.asyncio
+async def test_upsert_metric_updates_in_place(db, sample_tenant):
+    """Test that a repeated metric replaces the value without a second row"""
+    tenant = sample_tenant
+
+    day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    listing_id = uuid.uuid4()
+    await upsert_metric(db, tenant.id, day, "views", 1.0, {"source": "web"})
+    await upsert_metric(db, tenant.id, day, "views", 5.0)
+    await upsert_metric(db, tenant.id, day, "views", 2.0, listing_id=listing_id)
+    await upsert_metrics(
+        db,
+        Metric,
+        [
+            {
+                "entity_type": MetricEntityType.TENANT,
+                "entity_id": tenant.id,
+                "tenant_id": tenant.id,
+                "date": day,
+                "metric_name": "views",
+                "metric_value": 7.0,
+            },
+        ],
+    )
+
+    stored = (await db.scalars(select(Metric).order_by(Metric.entity_type))).all()
+    assert [(m.entity_type, m.metric_value) for m in stored] == [
+        (MetricEntityType.LISTING, 2.0),
+        (MetricEntityType.TENANT, 7.0),
+    ]
+    assert stored[1].metric_data is None
+    assert {m.tenant_id for m in stored} == {tenant.id}
+
+
+def _metric_rows(tenant_id, count, value=1.0):
+    day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "entity_type": MetricEntityType.TENANT,
+            "entity_id": tenant_id,
+            "tenant_id": tenant_id,
+            "date": day,
+            "metric_name": f"metric_{i}",
+            "metric_value": value,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest_asyncio.fixture
+async def pg_tenant(pg_engine):
+    """A committed tenant on PostgreSQL, deleted (with its metrics) afterwards"""
+    async with AsyncSession(pg_engine, expire_on_commit=False) as session:
+        tenant = Tenant(
+            name="Bulk",
+            subdomain=f"bulk-{uuid.uuid4().hex[:8]}",
+            industry="real_estate",
+        )
+        session.add(tenant)
+        await session.commit()
+    yield tenant
+    async with AsyncSession(pg_engine) as session:
+        await session.execute(delete(Tenant).where(Tenant.id == tenant.id))
+        await session.commit()
+
+
+async def _metric_count(session, tenant_id):
+    return await session.scalar(
+        select(func.count()).select_from(Metric).where(Metric.tenant_id == tenant_id)
+    )
+
+
+@pytest.mark.postgresql
+@pytest.mark.asyncio
+async def test_bulk_insert_copy_rolls_back_with_the_session(pg_engine, pg_tenant):
+    """Test that COPY joins the session transaction instead of autocommitting"""
+    rows = _metric_rows(pg_tenant.id, COPY_THRESHOLD + 1)
+    async with AsyncSession(pg_engine) as session:
+        # COPY is the first statement of the transaction
+        await bulk_insert(session, Metric, rows)
+        assert await _metric_count(session, pg_tenant.id) == len(rows)
+        await session.rollback()
+
+    async with AsyncSession(pg_engine) as session:
+        assert await _metric_count(session, pg_tenant.id) == 0
+
+
+@pytest.mark.postgresql
+@pytest.mark.asyncio
+async def test_staged_upsert_merges_through_temp_table(pg_engine, pg_tenant):
+    """Test that large upserts stage, merge and roll back in one transaction"""
+    count = STAGE_THRESHOLD + 1
+    async with AsyncSession(pg_engine) as session:
+        # The stage table is created first, then reused by the second batch
+        await upsert_metrics(session, Metric, _metric_rows(pg_tenant.id, count))
+        await upsert_metrics(
+            session, Metric, _metric_rows(pg_tenant.id, count, value=2.0)
+        )
+        values = (
+            await session.scalars(
+                select(Metric.metric_value).where(Metric.tenant_id == pg_tenant.id)
+            )
+        ).all()
+        assert len(values) == count
+        assert set(values) == {2.0}
+        await session.rollback()
+
+    async with AsyncSession(pg_engine) as session:
+        assert await _metric_count(session, pg_tenant.id) == 0
@@ -1,11 +1,12 @@
-from fastapi.testclient import TestClient
+def test_untrusted_host_is_rejected(client):
+    assert client.get("/health", headers={"host": "svc.a.run.app"}).status_code == 200
+    assert client.get("/health", headers={"host": "evil.example"}).status_code == 400
 
-from laas.main import app
 
-
-def test_health_check():
-    client = TestClient(app)
-    resp = client.get("/health")
-    assert resp.status_code == 200
-    data = resp.json()
-    assert data["status"] == "healthy"
+def test_openapi_schema_is_served_from_cached_bytes(client):
+    first = client.get("/openapi.json")
+    assert first.status_code == 200
+    assert first.json()["components"]["securitySchemes"]["BearerAuth"]
+    assert client.app.state.openapi_bytes == first.content
+    assert client.get("/openapi.json").content == first.content
+    assert client.get("/docs").status_code == 200
@@ -2,44 +2,34 @@
 IAM-based endpoint tests for LAAS Platform
 """
 
-from fastapi.testclient import TestClient
-
-from laas.main import app
-
-
-def test_api_status_endpoint():
-    """Test the IAM-based API status endpoint"""
-    client = TestClient(app)
-    response = client.get("/api/v1/status")
-
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "healthy"
-    assert data["authentication"] == "iam"
-    assert "message" in data
-
-
-def test_root_endpoint():
-    """Test the root endpoint"""
-    client = TestClient(app)
-    response = client.get("/")
-
-    assert response.status_code == 200
-    data = response.json()
-    assert data["message"] == "Welcome to LAAS Platform API"
-    assert data["version"] == "1.0.0"
-    assert "docs_url" in data
-    assert "health_url" in data
-
-
-def test_health_endpoint():
-    """Test the health check endpoint"""
-    client = TestClient(app)
-    response = client.get("/health")
+import pytest
+
+
+@pytest.mark.parametrize(
+    "path, expected, required_fields",
+    [
+        (
+            "/api/v1/status",
+            {"status": "healthy", "authentication": "iam"},
+            {"message"},
+        ),
+        (
+            "/",
+            {"message": "Welcome to LAAS Platform API", "version": "1.0.0"},
+            {"docs_url", "health_url"},
+        ),
+        (
+            "/health",
+            {"status": "healthy"},
+            {"timestamp", "version", "environment"},
+        ),
+    ],
+)
+def test_endpoint_json_shape(client, path, expected, required_fields):
+    """Test the status, root and health endpoints return the expected JSON"""
+    response = client.get(path)
 
     assert response.status_code == 200
     data = response.json()
-    assert data["status"] == "healthy"
-    assert "timestamp" in data
-    assert "version" in data
-    assert "environment" in data
+    assert {key: data.get(key) for key in expected} == expected
+    assert required_fields <= data.keys()
@@ -0,0 +1,108 @@
+"""
+Model helper tests for LAAS Platform
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+
+from laas.database.models import (
+    Listing,
+    Tag,
+    Tenant,
+    User,
+    UtcDateTime,
+    uuid7,
+)
+
+
+def test_uuid7_sets_version_and_variant():
+    """Generated ids are RFC 4122 version 7 UUIDs"""
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+
+
+def test_uuid7_is_time_ordered():
+    """Ids generated in later milliseconds sort after earlier ones"""
+    first = uuid7()
+    time.sleep(0.002)
+    second = uuid7()
+    assert first < second
+    assert first.int >> 80 <= time.time_ns() // 1_000_000
+
+
+def test_utc_datetime_round_trips_as_aware_utc():
+    """Aware values are stored as naive UTC and loaded back as aware UTC"""
+    column_type = UtcDateTime()
+    local = datetime(2024, 1, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+
+    stored = column_type.process_bind_param(local, None)
+    assert stored == datetime(2024, 1, 1, 12, 0)
+
+    loaded = column_type.process_result_value(stored, None)
+    assert loaded == local
+    assert loaded.tzinfo == timezone.utc
+
+
+def test_slug_unique_index_uses_fixed_width_key_on_postgresql():
+    """Slug uniqueness is on digest(slug) for PostgreSQL, the raw slug elsewhere"""
+    (index,) = [i for i in Tag.__table__.indexes if i.name == "uq_tag_tenant_slug"]
+
+    pg = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    lite = str(CreateIndex(index).compile(dialect=sqlite.dialect()))
+    assert "(tenant_id, digest(CAST(slug AS TEXT), 'sha1'))" in pg
+    assert lite.endswith("(tenant_id, slug)")
+
+
+def test_numeric_data_keys_get_partial_expression_indexes():
+    """Indexed data keys use the (data->>'key')::numeric form search emits"""
+    (index,) = [
+        i for i in Listing.__table__.indexes if i.name == "idx_listing_data_year_built"
+    ]
+
+    pg = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    assert pg.endswith(
+        "ON listings (((data->>'year_built')::numeric)) WHERE status = 'published'"
+    )
+
+
+@pytest.mark.asyncio
+async def test_json_defaults_come_from_the_server(db):
+    """Empty JSON defaults are filled by the database and returned on insert"""
+    assert User.__table__.c.permissions.default is None
+
+    tenant = Tenant(name="Acme", subdomain="acme", industry="real_estate")
+    user = User(tenant=tenant, email="a@example.com", password_hash="x")
+    db.add(user)
+    await db.commit()
+
+    # Loaded by INSERT ... RETURNING; a lazy load here would raise
+    assert user.permissions == []
+    assert tenant.settings == {} and tenant.branding == {}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "make_duplicate",
+    [
+        lambda data: Tenant(name="Other", subdomain="acme", industry="real_estate"),
+        lambda data: User(
+            tenant_id=data.tenant.id, email="owner@acme.test", password_hash="x"
+        ),
+        lambda data: Tag(tenant_id=data.tenant.id, name="Newer", slug="new"),
+    ],
+    ids=["tenant-subdomain", "user-tenant-email", "tag-tenant-slug"],
+)
+async def test_unique_constraints(db, sample_data, make_duplicate):
+    """Duplicates fail inside a savepoint and leave the session usable"""
+    with pytest.raises(IntegrityError):
+        async with db.begin_nested():
+            db.add(make_duplicate(sample_data))
+
+    assert await db.scalar(select(func.count()).select_from(Tenant)) == 1
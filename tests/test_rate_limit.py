@@ -0,0 +1,150 @@
+"""
+Rate limiting middleware tests for LAAS Platform
+"""
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from laas.middleware import rate_limit
+from laas.middleware.request import RequestMiddleware
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def incr(self, key):
+        self.commands.append(("incr", key))
+
+    def expire(self, key, ttl, nx=False):
+        self.commands.append(("expire", key, ttl, nx))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        results = []
+        for command, key, *args in self.commands:
+            if command == "incr":
+                self.redis.counts[key] = self.redis.counts.get(key, 0) + 1
+                results.append(self.redis.counts[key])
+            else:
+                ttl, nx = args
+                if not (nx and key in self.redis.ttls):
+                    self.redis.ttls[key] = ttl
+                results.append(True)
+        return results
+
+
+class _FakeRedis:
+    """In-memory stand-in for the pipelined INCR/EXPIRE the limiter uses"""
+
+    def __init__(self):
+        self.counts = {}
+        self.ttls = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+def _make_client(monkeypatch, redis, limit=2, middleware=None):
+    settings = rate_limit.get_settings()
+    monkeypatch.setattr(settings, "rate_limit_requests", limit)
+    monkeypatch.setattr(settings, "rate_limit_window", 60)
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: redis)
+
+    async def ok(request):
+        return PlainTextResponse(getattr(request.state, "request_id", "ok"))
+
+    app = Starlette(
+        routes=[Route("/api/listings", ok), Route("/health", ok)],
+        middleware=[Middleware(middleware or rate_limit.RateLimitMiddleware)],
+    )
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://t"
+    )
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_counts_in_redis(monkeypatch):
+    """Test that requests share one expiring counter and the limit returns 429"""
+    redis = _FakeRedis()
+    async with _make_client(monkeypatch, redis) as client:
+        first = await client.get("/api/listings")
+        second = await client.get("/api/listings")
+        third = await client.get("/api/listings")
+        health = await client.get("/health")
+
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    assert second.headers["X-RateLimit-Remaining"] == "0"
+    assert third.status_code == 429
+    assert third.json()["error"]["type"] == "rate_limit_exceeded"
+    assert int(third.headers["Retry-After"]) >= 1
+    assert health.status_code == 200
+
+    ((key, count),) = redis.counts.items()
+    assert key.startswith("rl:ip:") and count == 3
+    assert redis.ttls == {key: 60}
+    assert redis.round_trips == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_fails_open_without_redis(monkeypatch):
+    """Test that requests are allowed when Redis is unreachable"""
+
+    class _BrokenRedis:
+        def pipeline(self, transaction=True):
+            raise ConnectionError("redis down")
+
+    async with _make_client(monkeypatch, _BrokenRedis(), limit=1) as client:
+        for _ in range(3):
+            resp = await client.get("/api/listings")
+            assert resp.status_code == 200
+
+
+def test_memory_rate_limit_slides_and_evicts(monkeypatch):
+    """Test the in-process window expires old hits and drops idle clients"""
+    settings = rate_limit.get_settings()
+    monkeypatch.setattr(settings, "rate_limit_backend", "memory")
+    monkeypatch.setattr(settings, "rate_limit_requests", 2)
+    monkeypatch.setattr(settings, "rate_limit_window", 60)
+    limiter = rate_limit.RateLimiter()
+
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+
+    assert limiter._check_local_rate_limit("ip:a") == (True, 1, 1060)
+    now[0] = 1030.0
+    assert limiter._check_local_rate_limit("ip:a") == (True, 0, 1060)
+    assert limiter._check_local_rate_limit("ip:a") == (False, 0, 1060)
+
+    now[0] = 1061.0
+    assert limiter._check_local_rate_limit("ip:a") == (True, 0, 1090)
+    assert limiter._check_local_rate_limit("ip:b")[0]
+
+    now[0] = 1200.0
+    limiter._check_local_rate_limit("ip:c")
+    assert set(limiter.rate_limit_store) == {"ip:c"}
+
+
+@pytest.mark.asyncio
+async def test_request_middleware_tags_times_and_limits(monkeypatch):
+    """Test that one middleware adds id, timing and limit headers, even on 429"""
+    redis = _FakeRedis()
+    async with _make_client(
+        monkeypatch, redis, limit=1, middleware=RequestMiddleware
+    ) as client:
+        ok = await client.get("/api/listings")
+        limited = await client.get("/api/listings")
+
+    assert ok.text == ok.headers["X-Request-ID"]
+    assert len(ok.headers["X-Request-ID"]) == 32
+    assert ok.headers["X-Process-Time"].endswith("ms")
+    assert ok.headers["X-RateLimit-Remaining"] == "0"
+    assert limited.status_code == 429
+    assert limited.headers["X-Request-ID"] != ok.headers["X-Request-ID"]
+    assert "X-Process-Time" in limited.headers
@@ -0,0 +1,149 @@
+"""
+Role-based access control tests for LAAS Platform
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from laas.auth.rbac import (
+    PERMISSION_BITS,
+    ROLE_PERMISSION_MASKS,
+    ROLE_PERMISSIONS,
+    Permission,
+    get_user_permission_mask,
+    get_user_permissions,
+    has_all_permissions,
+    has_any_permission,
+    has_permission,
+    invalidate_user_permissions,
+    is_admin,
+    is_superadmin,
+    is_tenant_admin,
+    permissions_mask,
+    require_all_permissions,
+    require_permission,
+)
+from laas.database.models import User, UserRole
+
+
+def test_role_permissions_are_shared_without_custom_permissions():
+    """Test that users without custom permissions get the role set itself"""
+    user = User(role=UserRole.GUEST, permissions=[])
+
+    assert get_user_permissions(user) is ROLE_PERMISSIONS[UserRole.GUEST]
+    assert has_permission(user, Permission.VIEW_LISTINGS)
+    assert not has_permission(user, Permission.CREATE_LISTINGS)
+
+
+def test_custom_permissions_extend_role_and_skip_unknown_values():
+    """Test that valid custom permissions are added and invalid ones ignored"""
+    user = User(role=UserRole.USER, permissions=["export_data", "not_a_permission"])
+    permissions = get_user_permissions(user)
+
+    assert Permission.EXPORT_DATA in permissions
+    assert permissions >= ROLE_PERMISSIONS[UserRole.USER]
+    assert len(permissions) == len(ROLE_PERMISSIONS[UserRole.USER]) + 1
+
+
+def test_every_role_has_a_permission_set():
+    """Test that ROLE_PERMISSIONS covers every UserRole"""
+    assert set(ROLE_PERMISSIONS) == set(UserRole)
+    assert not has_permission(
+        User(role=UserRole.MODERATOR, permissions=None), Permission.VIEW_LISTINGS
+    )
+    assert has_permission(
+        User(role=UserRole.MODERATOR, permissions=["publish_listings"]),
+        Permission.PUBLISH_LISTINGS,
+    )
+
+
+def test_admin_helpers_accept_enum_and_string_roles():
+    """Test role helpers for both enum members and raw column values"""
+    assert is_superadmin(User(role=UserRole.SUPERADMIN))
+    assert is_superadmin(User(role="superadmin"))
+    assert is_tenant_admin(User(role=UserRole.ADMIN))
+    assert is_admin(User(role="admin"))
+    assert not is_admin(User(role=UserRole.MODERATOR))
+
+
+def test_unknown_role_has_no_permissions():
+    """Test that an unrecognised role value resolves to no permissions"""
+    user = User(role="not_a_role", permissions=["view_listings"])
+
+    assert get_user_permissions(user) == {Permission.VIEW_LISTINGS}
+    assert get_user_permission_mask(user) == PERMISSION_BITS[Permission.VIEW_LISTINGS]
+
+
+def test_any_and_all_permission_checks():
+    """Test set-based any/all permission checks"""
+    user = User(role="user", permissions=None)
+
+    assert has_any_permission(user, [Permission.MANAGE_SYSTEM, Permission.VIEW_SCHEMAS])
+    assert not has_any_permission(user, [Permission.MANAGE_SYSTEM])
+    assert has_all_permissions(
+        user, [Permission.VIEW_LISTINGS, Permission.CREATE_LISTINGS]
+    )
+    assert not has_all_permissions(
+        user, [Permission.VIEW_LISTINGS, Permission.MANAGE_USERS]
+    )
+
+
+def test_permissions_are_memoized_until_invalidated():
+    """Test per-request memoization of resolved permissions on the user"""
+    user = User(role=UserRole.GUEST, permissions=None)
+    assert not has_permission(user, Permission.CREATE_LISTINGS)
+
+    user.role = UserRole.USER
+    assert not has_permission(user, Permission.CREATE_LISTINGS)
+
+    invalidate_user_permissions(user)
+    assert has_permission(user, Permission.CREATE_LISTINGS)
+
+
+def test_permission_masks_match_role_sets():
+    """Test that bitmask checks agree with the frozenset definitions"""
+    for role, permissions in ROLE_PERMISSIONS.items():
+        mask = get_user_permission_mask(User(role=role, permissions=None))
+        assert mask == permissions_mask(permissions)
+        for permission in Permission:
+            assert bool(mask & PERMISSION_BITS[permission]) == (
+                permission in permissions
+            )
+
+    user = User(role=UserRole.GUEST, permissions=["export_data", "bogus"])
+    assert get_user_permission_mask(user) == (
+        ROLE_PERMISSION_MASKS[UserRole.GUEST] | PERMISSION_BITS[Permission.EXPORT_DATA]
+    )
+
+
+@pytest.mark.asyncio
+async def test_require_all_permissions_decorator():
+    """Test that decorated endpoints allow or deny with a precomputed detail"""
+
+    @require_all_permissions([Permission.VIEW_LISTINGS, Permission.MANAGE_USERS])
+    async def endpoint(current_user):
+        return "ok"
+
+    admin = User(role=UserRole.ADMIN, permissions=None)
+    assert await endpoint(current_user=admin) == "ok"
+
+    with pytest.raises(HTTPException) as exc_info:
+        await endpoint(current_user=User(role=UserRole.USER, permissions=None))
+    assert exc_info.value.status_code == 403
+    assert exc_info.value.detail == (
+        "All of the following permissions required: "
+        "['view_listings', 'manage_users']"
+    )
+
+
+@pytest.mark.asyncio
+async def test_permission_decorator_skips_resolution_for_superadmin():
+    """Test that superadmins pass without resolving or memoizing permissions"""
+
+    @require_permission(Permission.MANAGE_SYSTEM)
+    async def endpoint(current_user):
+        return "ok"
+
+    superadmin = User(role=UserRole.SUPERADMIN, permissions=None)
+    assert await endpoint(current_user=superadmin) == "ok"
+    assert getattr(superadmin, "_cached_permission_mask", None) is None
@@ -0,0 +1,127 @@
+"""
+Tenant middleware tests for LAAS Platform
+"""
+
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+import pytest_asyncio
+from cachetools import TTLCache
+from starlette.responses import PlainTextResponse
+
+from laas.database.models import Tenant
+from laas.middleware import tenant as tenant_middleware
+from laas.middleware.tenant import TenantMiddleware, invalidate_tenant_cache
+
+
+@pytest_asyncio.fixture
+async def tenant_db(db, sample_tenant, monkeypatch):
+    """Active and suspended tenants with a counter of opened sessions"""
+    db.add(
+        Tenant(
+            name="Gone", subdomain="gone", industry="real_estate", status="suspended"
+        )
+    )
+    await db.commit()
+
+    sessions = []
+
+    @asynccontextmanager
+    async def get_async_session():
+        sessions.append(1)
+        yield db
+
+    monkeypatch.setattr(tenant_middleware, "get_async_session", get_async_session)
+    monkeypatch.setattr(tenant_middleware, "_tenant_cache", TTLCache(100, 60))
+    return sample_tenant.id, sessions
+
+
+@pytest.mark.asyncio
+async def test_validate_tenant_caches_snapshot(tenant_db):
+    """Test repeated lookups are served from the cache"""
+    tenant_id, sessions = tenant_db
+    middleware = TenantMiddleware(app=None)
+
+    by_subdomain = await middleware._validate_tenant("acme")
+    by_id = await middleware._validate_tenant(str(tenant_id))
+    assert by_subdomain.id == by_id.id == tenant_id
+    assert by_subdomain.name == "Acme"
+    assert by_subdomain.response_headers == (
+        (b"x-tenant-id", str(tenant_id).encode()),
+        (b"x-tenant-name", b"Acme"),
+    )
+    assert len(sessions) == 2
+
+    assert (await middleware._validate_tenant("acme")) is by_subdomain
+    assert len(sessions) == 2
+
+    invalidate_tenant_cache(tenant_id)
+    await middleware._validate_tenant("acme")
+    await middleware._validate_tenant(str(tenant_id))
+    assert len(sessions) == 4
+
+
+@pytest.mark.asyncio
+async def test_validate_tenant_rejects_inactive_and_unknown(tenant_db):
+    """Test suspended and unknown tenants are not resolved or cached"""
+    _, sessions = tenant_db
+    middleware = TenantMiddleware(app=None)
+
+    assert await middleware._validate_tenant("gone") is None
+    assert await middleware._validate_tenant("missing") is None
+    assert await middleware._validate_tenant("missing") is None
+    assert len(sessions) == 3
+
+
+@pytest.mark.parametrize(
+    "host,expected",
+    [
+        ("acme.example.com", "acme"),
+        ("acme.localhost:8000", "acme"),
+        ("www.example.com", None),
+        ("localhost:8000", None),
+        (".example.com", None),
+    ],
+)
+def test_extract_tenant_id_from_subdomain(host, expected):
+    """Test the tenant is taken from the first label of the host"""
+    scope = {
+        "type": "http",
+        "path": "/api/v1/listings",
+        "query_string": b"",
+        "headers": [(b"host", host.encode())],
+    }
+    assert TenantMiddleware(app=None)._extract_tenant_id(scope) == expected
+
+
+@pytest.mark.asyncio
+async def test_middleware_sets_state_and_headers(tenant_db):
+    """Test tenant state reaches the app and headers reach the client"""
+    tenant_id, _ = tenant_db
+
+    async def app(scope, receive, send):
+        context = scope.get("state", {}).get("tenant_context", {})
+        response = PlainTextResponse(context.get("tenant_name", ""))
+        if scope["path"] == "/api/v1/cached":
+            response.headers["X-Tenant-ID"] = "upstream"
+        await response(scope, receive, send)
+
+    transport = httpx.ASGITransport(app=TenantMiddleware(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        resp = await client.get("/api/v1/x", headers={"X-Tenant-ID": "acme"})
+        assert resp.status_code == 200
+        assert resp.text == "Acme"
+        assert resp.headers["x-tenant-id"] == str(tenant_id)
+        assert resp.headers["x-tenant-name"] == "Acme"
+
+        resp = await client.get("/api/v1/cached", headers={"X-Tenant-ID": "acme"})
+        assert resp.headers.get_list("x-tenant-id") == ["upstream"]
+        assert "x-tenant-name" not in resp.headers
+
+        resp = await client.get("/api/v1/x")
+        assert resp.status_code == 400
+        resp = await client.get("/api/v1/x", headers={"X-Tenant-ID": "gone"})
+        assert resp.status_code == 404
+        assert resp.json() == {"detail": "Tenant not found or inactive"}
+        assert (await client.get("/health")).status_code == 200